@@ -82,6 +82,10 @@ def check_social_collaboration_achievements(db, user_id):
     """Legacy function for backward compatibility."""
     return service.check_social_collaboration_achievements(db, user_id)
 
+def record_achievement_events(db, user_id, events):
+    """Evaluate only the achievements these domain events (see services.achievement_events) can unlock."""
+    return service.record_events(db, user_id, events)
+
 def get_or_create_user_stats(db, user_id):
     """Legacy function for backward compatibility."""
     return service.get_or_create_user_stats(db, user_id)
@@ -98,5 +102,5 @@ __all__ = [
     "check_album_series_achievements", "check_login_streak_achievements",
     "check_public_wip_achievements", "check_collaboration_request_achievements",
     "check_social_collaboration_achievements",
-    "get_or_create_user_stats"
+    "record_achievement_events", "get_or_create_user_stats"
 ]
\ No newline at end of file
@@ -13,6 +13,9 @@ from models import (
     Collaboration, CollaborationType, SongStatus, ActivityLog, FeatureRequest,
     AlbumSeries
 )
+from services.leaderboard_index import invalidate_leaderboard_index
+# Registers the mapper events that keep UserStats counters current
+from . import user_stats_counters  # noqa: F401
 
 
 class AchievementsRepository:
@@ -75,23 +78,36 @@ class AchievementsRepository:
             # Return None to indicate it already exists
             return None
     
-    def get_user_stats(self, db: Session, user_id: int) -> Optional[UserStats]:
-        """Get user stats record."""
-        return db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    def get_user_stats(self, db: Session, user_id: int, refresh: bool = False) -> Optional[UserStats]:
+        """Get user stats record.
+        
+        With ``refresh`` the row is re-read even if already loaded in the session,
+        so counter deltas applied by SQL since then are visible.
+        """
+        query = db.query(UserStats)
+        if refresh:
+            query = query.populate_existing()
+        return query.filter(UserStats.user_id == user_id).first()
     
     def create_user_stats(self, db: Session, user_id: int, commit: bool = True) -> UserStats:
-        """Create new user stats record.
+        """Create new user stats record, seeded with the user's current counts.
+        
+        From then on the counters are kept current incrementally (see user_stats_counters).
         
         Args:
             db: Database session
             user_id: User ID
-            commit: If True, commit the transaction. If False, caller is responsible for committing.
+            commit: If True, commit the transaction. If False, the row is flushed and
+                the caller is responsible for committing.
         """
-        stats = UserStats(user_id=user_id)
+        stats = UserStats(user_id=user_id, **self.count_user_stats(db, user_id))
         db.add(stats)
         if commit:
             db.commit()
             db.refresh(stats)
+        else:
+            # Flush now so later counter deltas in this transaction find the row
+            db.flush()
         return stats
     
     def update_user_stats(self, db: Session, stats: UserStats, commit: bool = True, **kwargs) -> UserStats:
@@ -112,6 +128,19 @@ class AchievementsRepository:
             db.commit()
         return stats
     
+    def count_user_stats(self, db: Session, user_id: int) -> Dict[str, int]:
+        """Count every recountable UserStats counter from the source tables."""
+        return {
+            "total_songs": self.count_user_songs(db, user_id),
+            "total_released": self.count_songs_by_status(db, user_id, SongStatus.released),
+            "total_future": self.count_songs_by_status(db, user_id, SongStatus.future),
+            "total_wip": self.count_songs_by_status(db, user_id, SongStatus.wip),
+            "total_packs": self.count_user_packs(db, user_id),
+            "total_collaborations": self.count_user_collaborations(db, user_id),
+            "total_spotify_imports": self.count_user_spotify_imports(db, user_id),
+            "total_feature_requests": self.count_user_feature_requests(db, user_id),
+        }
+    
     def count_songs_by_status(self, db: Session, user_id: int, status: SongStatus) -> int:
         """Count user songs by status."""
         return db.query(Song).filter(
@@ -159,6 +188,20 @@ class AchievementsRepository:
             )
         ).all()
     
+    def get_unearned_achievements_for_metrics(self, db: Session, user_id: int, metric_types: Set[str]) -> List[Achievement]:
+        """Get unearned achievements for any of the given metric types."""
+        if not metric_types:
+            return []
+        return db.query(Achievement).filter(
+            Achievement.metric_type.in_(metric_types),
+            Achievement.target_value.isnot(None),
+            ~Achievement.id.in_(
+                db.query(UserAchievement.achievement_id).filter(
+                    UserAchievement.user_id == user_id
+                )
+            )
+        ).all()
+    
     def get_all_unearned_metric_types(self, db: Session, user_id: int) -> List[str]:
         """Get all metric types that have unearned achievements."""
         metric_types = db.query(Achievement.metric_type).filter(
@@ -557,6 +600,7 @@ class AchievementsRepository:
             
             stats.total_points = (stats.total_points or 0) + points_to_add
             stats.updated_at = datetime.utcnow()
+            invalidate_leaderboard_index(db)
             if commit:
                 db.commit()
             
@@ -580,6 +624,7 @@ class AchievementsRepository:
             stats.total_points = actual_points
             stats.updated_at = datetime.utcnow()
             db.commit()
+            invalidate_leaderboard_index()
             
             return actual_points
             
@@ -0,0 +1,144 @@
+"""
+Incrementally maintained ``UserStats`` counters.
+
+Achievement checks read song, pack, collaboration and feature request totals
+from ``user_stats`` instead of counting them on every check. ORM inserts,
+deletes and status/owner changes apply +/- deltas here through mapper events,
+in the same transaction as the write; bulk collaboration deletes are caught by
+a ``do_orm_execute`` hook. Rows are seeded with a full count when they are
+created (``AchievementsRepository.create_user_stats``), and
+``AchievementsService.update_user_stats`` recounts from scratch to repair drift.
+"""
+
+from typing import Optional
+
+from sqlalchemy import case, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from models import Collaboration, CollaborationType, FeatureRequest, Pack, Song, SongStatus, UserStats
+
+# Collaborations counted in total_collaborations (see count_user_collaborations)
+COUNTED_COLLABORATION_TYPES = (CollaborationType.SONG_EDIT, CollaborationType.PACK_EDIT)
+
+_STATUS_COLUMNS = {
+    SongStatus.released: "total_released",
+    SongStatus.wip: "total_wip",
+    SongStatus.future: "total_future",
+}
+
+
+def _status_column(status) -> Optional[str]:
+    try:
+        return _STATUS_COLUMNS.get(SongStatus(status))
+    except ValueError:
+        return None
+
+
+def adjust_user_stats(connection, user_id, **deltas: int) -> None:
+    """
+    Add deltas to a user's stats counters, clamped at zero. ``user_id`` may be
+    a scalar subquery. Users without a stats row are skipped; their row is
+    counted from scratch when it is created.
+    """
+    table = UserStats.__table__
+    values = {}
+    for column, delta in deltas.items():
+        if delta:
+            current = func.coalesce(table.c[column], 0)
+            values[column] = case((current + delta < 0, 0), else_=current + delta)
+    if values and user_id is not None:
+        connection.execute(update(table).where(table.c.user_id == user_id).values(**values))
+
+
+def _adjust_song(connection, user_id, status, delta: int) -> None:
+    deltas = {"total_songs": delta}
+    status_column = _status_column(status)
+    if status_column:
+        deltas[status_column] = delta
+    adjust_user_stats(connection, user_id, **deltas)
+
+
+def _song_owner(song_id):
+    return select(Song.user_id).where(Song.id == song_id).scalar_subquery()
+
+
+def _counts_as_collaboration(collaboration: Collaboration) -> bool:
+    return collaboration.song_id is not None and collaboration.collaboration_type in COUNTED_COLLABORATION_TYPES
+
+
+@event.listens_for(Song, "after_insert")
+def _song_inserted(mapper, connection, target):
+    _adjust_song(connection, target.user_id, target.status, 1)
+
+
+@event.listens_for(Song, "after_delete")
+def _song_deleted(mapper, connection, target):
+    _adjust_song(connection, target.user_id, target.status, -1)
+
+
+@event.listens_for(Song, "after_update")
+def _song_updated(mapper, connection, target):
+    state = inspect(target)
+    status_history = state.attrs.status.history
+    owner_history = state.attrs.user_id.history
+    if not (status_history.has_changes() or owner_history.has_changes()):
+        return
+    old_status = status_history.deleted[0] if status_history.deleted else target.status
+    old_owner = owner_history.deleted[0] if owner_history.deleted else target.user_id
+    if old_owner == target.user_id and _status_column(old_status) == _status_column(target.status):
+        return
+    _adjust_song(connection, old_owner, old_status, -1)
+    _adjust_song(connection, target.user_id, target.status, 1)
+
+
+@event.listens_for(Pack, "after_insert")
+def _pack_inserted(mapper, connection, target):
+    adjust_user_stats(connection, target.user_id, total_packs=1)
+
+
+@event.listens_for(Pack, "after_delete")
+def _pack_deleted(mapper, connection, target):
+    adjust_user_stats(connection, target.user_id, total_packs=-1)
+
+
+@event.listens_for(Collaboration, "after_insert")
+def _collaboration_inserted(mapper, connection, target):
+    if _counts_as_collaboration(target):
+        adjust_user_stats(connection, _song_owner(target.song_id), total_collaborations=1)
+
+
+@event.listens_for(Collaboration, "after_delete")
+def _collaboration_deleted(mapper, connection, target):
+    if _counts_as_collaboration(target):
+        adjust_user_stats(connection, _song_owner(target.song_id), total_collaborations=-1)
+
+
+@event.listens_for(FeatureRequest, "after_insert")
+def _feature_request_inserted(mapper, connection, target):
+    adjust_user_stats(connection, target.user_id, total_feature_requests=1)
+
+
+@event.listens_for(FeatureRequest, "after_delete")
+def _feature_request_deleted(mapper, connection, target):
+    adjust_user_stats(connection, target.user_id, total_feature_requests=-1)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_collaboration_delete(orm_execute_state):
+    # The remove-collaborator endpoints use query.delete(), which skips the mapper events
+    if not orm_execute_state.is_delete:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not Collaboration:
+        return
+    removed = select(Song.user_id, func.count()).select_from(Collaboration).join(
+        Song, Song.id == Collaboration.song_id
+    ).where(
+        Collaboration.collaboration_type.in_(COUNTED_COLLABORATION_TYPES)
+    ).group_by(Song.user_id)
+    whereclause = orm_execute_state.statement.whereclause
+    if whereclause is not None:
+        removed = removed.where(whereclause)
+    connection = orm_execute_state.session.connection()
+    for owner_id, count in connection.execute(removed).all():
+        adjust_user_stats(connection, owner_id, total_collaborations=-count)
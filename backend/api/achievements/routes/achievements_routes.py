@@ -140,6 +140,20 @@ def get_leaderboard(
         raise HTTPException(status_code=500, detail="Failed to get leaderboard")
 
 
+@router.get("/leaderboard/around-me", response_model=LeaderboardResponse)
+def get_leaderboard_around_me(
+    radius: int = 5,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """Get the leaderboard entries ranked just above and below the current user."""
+    try:
+        return achievements_service.get_leaderboard_around_user(db, current_user.id, max(0, min(radius, 50)))
+    except Exception as e:
+        print(f"❌ Error getting leaderboard around user: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get leaderboard")
+
+
 @router.get("/points")
 def get_my_points(
     db: Session = Depends(get_db),
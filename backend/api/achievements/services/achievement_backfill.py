@@ -0,0 +1,383 @@
+"""
+Set-based retroactive achievement backfill.
+
+Instead of running the per-user checker for every user (dozens of queries
+each), ``backfill_achievements`` walks users in chunks and, per chunk:
+
+1. computes every metric for every user in the chunk with grouped queries
+   (``compute_user_metrics``),
+2. diffs the values against the chunk's ``user_achievements`` rows in memory,
+3. bulk-inserts the missing awards, adds their points to ``user_stats`` and
+   reconciles the incrementally maintained counters, in one transaction.
+
+Metric values match ``AchievementsService._bulk_calculate_metrics``.
+Backfilled awards are not announced with notifications. With ``dry_run`` nothing
+is written and the result lists what would be awarded.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, bindparam, case, func, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import (
+    Achievement, ActivityLog, AlbumSeries, Collaboration, CollaborationRequest, CollaborationType,
+    FeatureRequest, Pack, Song, SongProgress, SongStatus, User, UserAchievement, UserStats,
+)
+from services.leaderboard_index import invalidate_leaderboard_index
+from utils.cache import invalidate_leaderboard_cache, invalidate_user_caches
+from ..repositories.user_stats_counters import COUNTED_COLLABORATION_TYPES
+
+BACKFILL_CHUNK_SIZE = 500  # users per transaction
+
+# Counters recounted from the source tables (see AchievementsRepository.count_user_stats)
+RECOUNTED_COUNTERS = (
+    "total_songs", "total_released", "total_future", "total_wip", "total_packs",
+    "total_collaborations", "total_spotify_imports", "total_feature_requests",
+)
+# Lifetime counters that can only be read from user_stats
+STORED_METRICS = {
+    "total_future_created": "total_future_created",
+    "wip_creations": "total_wip_created",
+    "login_streak": "login_streak",
+}
+ALPHABET = set("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+
+def _grouped_counts(query) -> Dict[int, int]:
+    return {user_id: count or 0 for user_id, count in query.all()}
+
+
+def _song_counts(db: Session, user_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    def status_count(*condition):
+        return func.sum(case((and_(*condition), 1), else_=0))
+
+    rows = db.query(
+        Song.user_id,
+        func.count(Song.id),
+        status_count(Song.status == SongStatus.released),
+        status_count(Song.status == SongStatus.future),
+        status_count(Song.status == SongStatus.wip),
+        status_count(Song.status.in_([SongStatus.future, SongStatus.wip]), Song.is_public == True),
+    ).filter(Song.user_id.in_(user_ids)).group_by(Song.user_id).all()
+    return {
+        user_id: {
+            "total_songs": total or 0,
+            "total_released": released or 0,
+            "total_future": future or 0,
+            "total_wip": wip or 0,
+            "public_wips": public_wips or 0,
+        }
+        for user_id, total, released, future, wip, public_wips in rows
+    }
+
+
+def _diversity_metrics(db: Session, user_ids: List[int]) -> Dict[str, Dict[int, int]]:
+    released = and_(Song.user_id.in_(user_ids), Song.status == SongStatus.released)
+    unique_artists = _grouped_counts(
+        db.query(Song.user_id, func.count(func.distinct(func.lower(Song.artist))))
+        .filter(released, Song.artist.isnot(None), Song.artist != "")
+        .group_by(Song.user_id)
+    )
+
+    years = defaultdict(set)
+    for user_id, year in db.query(Song.user_id, Song.year).filter(released, Song.year.isnot(None)).distinct():
+        years[user_id].add(int(year))
+
+    letters = defaultdict(set)
+    first_letter = func.upper(func.substr(Song.title, 1, 1))
+    for user_id, letter in db.query(Song.user_id, first_letter).filter(
+        released, Song.title.isnot(None), Song.title != ""
+    ).distinct():
+        if letter in ALPHABET:
+            letters[user_id].add(letter)
+
+    return {
+        "unique_artists": unique_artists,
+        "unique_years": {user_id: len(found) for user_id, found in years.items()},
+        "unique_decades": {user_id: len({year // 10 for year in found}) for user_id, found in years.items()},
+        "alphabet_coverage": {user_id: len(found) for user_id, found in letters.items()},
+    }
+
+
+def _workflow_metrics(db: Session, user_ids: List[int]) -> Dict[str, Dict[int, int]]:
+    """wip_completions, completed_songs and completed_packs against each user's workflow steps."""
+    from services.completion_service import fetch_workflow_fields_map
+
+    metrics = {"wip_completions": defaultdict(int), "completed_songs": defaultdict(int), "completed_packs": {}}
+    try:
+        required_steps = {user_id: set(steps) for user_id, steps in fetch_workflow_fields_map(db, user_ids).items()}
+    except Exception as e:
+        print(f"⚠️ Could not load workflow steps, skipping completion metrics: {e}")
+        return metrics
+    if not required_steps:
+        return metrics
+
+    # Songs the users own, plus every song in packs they own
+    workflow_user_ids = list(required_steps)
+    relevant = or_(Song.user_id.in_(workflow_user_ids), Pack.user_id.in_(workflow_user_ids))
+    songs = db.query(Song.id, Song.user_id, Song.status, Pack.id, Pack.user_id).outerjoin(
+        Pack, Pack.id == Song.pack_id
+    ).filter(relevant).all()
+    completed_steps = defaultdict(set)
+    for song_id, step_name in db.query(SongProgress.song_id, SongProgress.step_name).join(
+        Song, Song.id == SongProgress.song_id
+    ).outerjoin(Pack, Pack.id == Song.pack_id).filter(relevant, SongProgress.is_completed == True):
+        completed_steps[song_id].add(step_name)
+
+    def is_complete(song_id, user_id):
+        steps = required_steps.get(user_id)
+        return bool(steps) and steps <= completed_steps[song_id]
+
+    pack_songs = defaultdict(list)
+    for song_id, owner_id, status, pack_id, pack_owner_id in songs:
+        if owner_id in required_steps and is_complete(song_id, owner_id):
+            metrics["completed_songs"][owner_id] += 1
+            if status == SongStatus.released:
+                metrics["wip_completions"][owner_id] += 1
+        if pack_owner_id in required_steps:
+            pack_songs[(pack_owner_id, pack_id)].append(is_complete(song_id, pack_owner_id))
+
+    completed_packs = defaultdict(int)
+    for (pack_owner_id, _), completions in pack_songs.items():
+        if all(completions):
+            completed_packs[pack_owner_id] += 1
+    metrics["completed_packs"] = completed_packs
+    return metrics
+
+
+def _series_metrics(db: Session, user_ids: List[int]) -> Dict[str, Dict[int, int]]:
+    series_created = _grouped_counts(
+        db.query(Pack.user_id, func.count(AlbumSeries.id))
+        .join(AlbumSeries, AlbumSeries.pack_id == Pack.id)
+        .filter(Pack.user_id.in_(user_ids))
+        .group_by(Pack.user_id)
+    )
+    core_songs = db.query(
+        Pack.user_id,
+        func.count(Song.id),
+        func.sum(case((Song.status == SongStatus.released, 1), else_=0)),
+    ).join(AlbumSeries, AlbumSeries.pack_id == Pack.id).join(
+        Song, Song.album_series_id == AlbumSeries.id
+    ).filter(
+        Pack.user_id.in_(user_ids),
+        or_(Song.optional.is_(False), Song.optional.is_(None)),
+    ).group_by(Pack.user_id, AlbumSeries.id)
+    completed_series = defaultdict(int)
+    for user_id, total, released in core_songs:
+        if total and released == total:
+            completed_series[user_id] += 1
+    return {"series_created": series_created, "completed_series": completed_series}
+
+
+def compute_user_metrics(db: Session, user_ids: Iterable[int], metric_types: Optional[Set[str]] = None) -> Dict[int, Dict[str, int]]:
+    """
+    Every metric (or just ``metric_types``) for every user in ``user_ids``,
+    using a fixed number of grouped queries regardless of the number of users.
+    The recounted UserStats counters are always included.
+    """
+    user_ids = list(user_ids)
+    metrics: Dict[int, Dict[str, int]] = {user_id: {} for user_id in user_ids}
+    if not user_ids:
+        return metrics
+    wanted = set(metric_types) if metric_types is not None else None
+
+    def needs(*names):
+        return wanted is None or bool(wanted.intersection(names))
+
+    def merge(values_by_metric: Dict[str, Dict[int, int]]):
+        for metric_type, values in values_by_metric.items():
+            for user_id in user_ids:
+                metrics[user_id][metric_type] = values.get(user_id, 0)
+
+    # Counters (always computed, they are reconciled by the backfill)
+    song_counts = _song_counts(db, user_ids)
+    for user_id in user_ids:
+        metrics[user_id].update(song_counts.get(user_id, {
+            "total_songs": 0, "total_released": 0, "total_future": 0, "total_wip": 0, "public_wips": 0,
+        }))
+    merge({
+        "total_packs": _grouped_counts(
+            db.query(Pack.user_id, func.count(Pack.id)).filter(Pack.user_id.in_(user_ids)).group_by(Pack.user_id)
+        ),
+        "total_collaborations": _grouped_counts(
+            db.query(Song.user_id, func.count(Collaboration.id))
+            .join(Song, Song.id == Collaboration.song_id)
+            .filter(Song.user_id.in_(user_ids), Collaboration.collaboration_type.in_(COUNTED_COLLABORATION_TYPES))
+            .group_by(Song.user_id)
+        ),
+        "total_spotify_imports": _grouped_counts(
+            db.query(ActivityLog.user_id, func.count(ActivityLog.id))
+            .filter(ActivityLog.user_id.in_(user_ids), ActivityLog.activity_type == "import_spotify")
+            .group_by(ActivityLog.user_id)
+        ),
+        "total_feature_requests": _grouped_counts(
+            db.query(FeatureRequest.user_id, func.count(FeatureRequest.id))
+            .filter(FeatureRequest.user_id.in_(user_ids))
+            .group_by(FeatureRequest.user_id)
+        ),
+    })
+
+    stored = {row.user_id: row for row in db.query(UserStats).filter(UserStats.user_id.in_(user_ids))}
+    for user_id in user_ids:
+        for metric_type, column in STORED_METRICS.items():
+            metrics[user_id][metric_type] = getattr(stored.get(user_id), column, 0) or 0
+
+    if needs("unique_artists", "unique_years", "unique_decades", "alphabet_coverage"):
+        merge(_diversity_metrics(db, user_ids))
+    if needs("wip_completions", "completed_songs", "completed_packs"):
+        merge(_workflow_metrics(db, user_ids))
+    if needs("series_created", "completed_series"):
+        merge(_series_metrics(db, user_ids))
+    if needs("collaborations_added", "collaborations_total"):
+        merge({"collaborations_added": _grouped_counts(
+            db.query(Collaboration.user_id, func.count(Collaboration.id))
+            .filter(Collaboration.user_id.in_(user_ids), Collaboration.collaboration_type == CollaborationType.SONG_EDIT)
+            .group_by(Collaboration.user_id)
+        )})
+        for user_id in user_ids:
+            metrics[user_id]["collaborations_total"] = (
+                metrics[user_id]["collaborations_added"] + metrics[user_id]["total_collaborations"]
+            )
+    if needs("collab_requests_sent"):
+        merge({"collab_requests_sent": _grouped_counts(
+            db.query(CollaborationRequest.requester_id, func.count(CollaborationRequest.id))
+            .filter(CollaborationRequest.requester_id.in_(user_ids))
+            .group_by(CollaborationRequest.requester_id)
+        )})
+    if needs("bug_reports"):
+        merge({"bug_reports": _grouped_counts(
+            db.query(FeatureRequest.user_id, func.count(FeatureRequest.id))
+            .filter(FeatureRequest.user_id.in_(user_ids), FeatureRequest.title.ilike("%bug%"))
+            .group_by(FeatureRequest.user_id)
+        )})
+    if needs("profile_pic", "personal_link", "contact_method"):
+        for user_id, image_url, website_url, contact_method in db.query(
+            User.id, User.profile_image_url, User.website_url, User.preferred_contact_method
+        ).filter(User.id.in_(user_ids)):
+            metrics[user_id].update({
+                "profile_pic": 1 if image_url else 0,
+                "personal_link": 1 if website_url else 0,
+                "contact_method": 1 if contact_method else 0,
+            })
+    return metrics
+
+
+def _diff_chunk(db: Session, user_ids: List[int], achievements: List[Achievement]):
+    """Metrics, earned achievement ids and missing awards for one chunk of users."""
+    targeted = [a for a in achievements if a.metric_type and a.target_value is not None]
+    earned = defaultdict(set)
+    for user_id, achievement_id in db.query(UserAchievement.user_id, UserAchievement.achievement_id).filter(
+        UserAchievement.user_id.in_(user_ids)
+    ):
+        earned[user_id].add(achievement_id)
+
+    # Only compute metrics someone in the chunk can still earn from
+    needed = {a.metric_type for a in targeted if any(a.id not in earned[user_id] for user_id in user_ids)}
+    metrics = compute_user_metrics(db, user_ids, needed)
+
+    missing = defaultdict(list)
+    for user_id in user_ids:
+        for achievement in targeted:
+            if achievement.id in earned[user_id]:
+                continue
+            if metrics[user_id].get(achievement.metric_type, 0) >= achievement.target_value:
+                missing[user_id].append(achievement)
+    return metrics, earned, missing
+
+
+def _write_chunk(db: Session, user_ids: List[int], metrics, earned, missing, points_by_id: Dict[int, int]):
+    now = datetime.utcnow()
+    award_rows = [
+        {"user_id": user_id, "achievement_id": achievement.id, "earned_at": now}
+        for user_id, achievements in missing.items()
+        for achievement in achievements
+    ]
+    if award_rows:
+        db.execute(insert(UserAchievement), award_rows)
+
+    table = UserStats.__table__
+    existing = {user_id for (user_id,) in db.query(UserStats.user_id).filter(UserStats.user_id.in_(user_ids))}
+    updates, inserts = [], []
+    for user_id in user_ids:
+        counters = {column: metrics[user_id][column] for column in RECOUNTED_COUNTERS}
+        new_points = sum(achievement.points or 0 for achievement in missing.get(user_id, []))
+        if user_id in existing:
+            updates.append({"b_user_id": user_id, "b_points": new_points, **{f"b_{c}": v for c, v in counters.items()}})
+        else:
+            # No cached total yet: count every earned achievement
+            earned_points = sum(points_by_id.get(achievement_id, 0) for achievement_id in earned[user_id])
+            inserts.append({"user_id": user_id, "total_points": earned_points + new_points, "updated_at": now, **counters})
+    if updates:
+        db.execute(
+            update(table).where(table.c.user_id == bindparam("b_user_id")).values(
+                total_points=func.coalesce(table.c.total_points, 0) + bindparam("b_points"),
+                updated_at=now,
+                **{column: bindparam(f"b_{column}") for column in RECOUNTED_COUNTERS},
+            ),
+            updates,
+        )
+    if inserts:
+        db.execute(insert(table), inserts)
+
+
+def backfill_achievements(
+    db: Session,
+    dry_run: bool = False,
+    chunk_size: int = BACKFILL_CHUNK_SIZE,
+    user_ids: Optional[Iterable[int]] = None,
+    verbose: bool = True,
+) -> Dict[str, object]:
+    """
+    Award every achievement users have already qualified for, ``chunk_size``
+    users per transaction. Returns totals plus the awarded codes per user.
+    """
+    achievements = db.query(Achievement).all()
+    points_by_id = {achievement.id: achievement.points or 0 for achievement in achievements}
+    only_users = sorted(set(user_ids)) if user_ids is not None else None
+
+    result = {"users": 0, "awards": 0, "points": 0, "chunks": 0, "dry_run": dry_run, "awarded": {}}
+    last_user_id = 0
+    while True:
+        if only_users is not None:
+            chunk = [user_id for user_id in only_users if user_id > last_user_id][:chunk_size]
+        else:
+            chunk = [user_id for (user_id,) in db.query(User.id).filter(User.id > last_user_id).order_by(User.id).limit(chunk_size)]
+        if not chunk:
+            break
+        last_user_id = chunk[-1]
+
+        for attempt in range(2):
+            metrics, earned, missing = _diff_chunk(db, chunk, achievements)
+            if dry_run:
+                db.rollback()
+                break
+            try:
+                _write_chunk(db, chunk, metrics, earned, missing, points_by_id)
+                db.commit()
+                break
+            except IntegrityError:
+                # An award was granted concurrently; diff the chunk again
+                db.rollback()
+                if attempt:
+                    raise
+
+        chunk_awards = sum(len(awards) for awards in missing.values())
+        result["chunks"] += 1
+        result["users"] += len(chunk)
+        result["awards"] += chunk_awards
+        result["points"] += sum(a.points or 0 for awards in missing.values() for a in awards)
+        for user_id, awards in missing.items():
+            result["awarded"][user_id] = [achievement.code for achievement in awards]
+            if not dry_run:
+                invalidate_user_caches(user_id)
+        if verbose:
+            print(f"{'🔎' if dry_run else '🏆'} Users {chunk[0]}-{chunk[-1]}: {chunk_awards} achievements {'to award' if dry_run else 'awarded'}")
+
+    if result["awards"] and not dry_run:
+        invalidate_leaderboard_cache()
+        invalidate_leaderboard_index()
+    return result
@@ -0,0 +1,72 @@
+"""
+Domain events that can unlock achievements.
+
+Writes report what happened (``record_achievement_event(db, user_id,
+SONG_RELEASED)``) instead of asking for a full recheck. ``EVENT_METRICS`` maps
+each event to the metric types it can move, and
+``AchievementsService.record_events`` evaluates only the unearned achievements
+on those metrics. Counter-backed metrics are read from ``UserStats``, which is
+kept current by ``repositories/user_stats_counters.py``.
+"""
+
+from typing import Dict, Iterable, Optional, Set
+
+from models import SongStatus
+
+SONG_RELEASED = "song_released"
+SONG_STARTED = "song_started"  # created as, or moved to, In Progress
+SONG_PLANNED = "song_planned"  # created as, or moved to, Future Plans
+SONG_DETAILS_CHANGED = "song_details_changed"  # title/artist/year of a released song
+SONG_MADE_PUBLIC = "song_made_public"
+PACK_CREATED = "pack_created"
+PACK_RELEASED = "pack_released"
+COLLABORATION_ADDED = "collaboration_added"
+SPOTIFY_IMPORT = "spotify_import"
+
+DIVERSITY_METRICS = {"unique_artists", "unique_years", "unique_decades", "alphabet_coverage"}
+RELEASE_METRICS = {
+    "total_released", "wip_completions", "completed_songs", "completed_packs", "completed_series",
+} | DIVERSITY_METRICS
+
+EVENT_METRICS: Dict[str, Set[str]] = {
+    SONG_RELEASED: RELEASE_METRICS,
+    SONG_STARTED: {"wip_creations", "public_wips"},
+    SONG_PLANNED: {"total_future_created", "public_wips"},
+    SONG_DETAILS_CHANGED: DIVERSITY_METRICS,
+    SONG_MADE_PUBLIC: {"public_wips"},
+    PACK_CREATED: {"total_packs"},
+    PACK_RELEASED: RELEASE_METRICS | {"total_packs"},
+    COLLABORATION_ADDED: {"total_collaborations", "collaborations_added", "collaborations_total"},
+    SPOTIFY_IMPORT: {"total_spotify_imports", "total_future_created", "wip_creations", "total_released"},
+}
+
+# UserStats counters an event moves that no mapper event sees (imports are
+# only recorded in the activity log, which may be written asynchronously)
+EVENT_COUNTER_DELTAS: Dict[str, Dict[str, int]] = {
+    SPOTIFY_IMPORT: {"total_spotify_imports": 1},
+}
+
+_STATUS_EVENTS = {
+    SongStatus.released: SONG_RELEASED,
+    SongStatus.wip: SONG_STARTED,
+    SongStatus.future: SONG_PLANNED,
+}
+
+
+def song_status_event(status) -> Optional[str]:
+    """The event for a song entering ``status`` (a SongStatus or its value)."""
+    try:
+        return _STATUS_EVENTS.get(SongStatus(status))
+    except ValueError:
+        return None
+
+
+def metrics_for_events(events: Iterable[str]) -> Set[str]:
+    """Metric types that any of ``events`` can move."""
+    metrics = set()
+    for event in events:
+        if event not in EVENT_METRICS:
+            print(f"⚠️ Unknown achievement event: {event}")
+            continue
+        metrics |= EVENT_METRICS[event]
+    return metrics
@@ -5,8 +5,10 @@ Achievements service - contains business logic for achievement operations.
 from typing import List, Optional, Dict, Any, Set
 from sqlalchemy.orm import Session
 
-from models import Achievement, UserAchievement, UserStats, SongStatus
+from models import Achievement, UserAchievement, UserStats
 from ..repositories.achievements_repository import AchievementsRepository
+from ..repositories.user_stats_counters import adjust_user_stats
+from .achievement_events import EVENT_COUNTER_DELTAS, metrics_for_events
 from ..validators.achievements_validators import (
     AchievementResponse, UserAchievementResponse, AchievementProgressSummary,
     UserStatsResponse, AchievementProgressResponse, AchievementProgressItem,
@@ -14,7 +16,11 @@ from ..validators.achievements_validators import (
     AchievementWithProgress
 )
 from api.notifications.services.notification_service import NotificationService
-from utils.cache import cached, cache_key_for_user_data, invalidate_user_caches, invalidate_leaderboard_cache
+from services.leaderboard_index import get_leaderboard_index
+from utils.cache import (
+    cached, cache_key_for_user_data, invalidate_user_caches, invalidate_leaderboard_cache,
+    user_tag, ACHIEVEMENTS_PROGRESS_TAG, LEADERBOARD_TAG
+)
 
 
 class AchievementsService:
@@ -39,7 +45,12 @@ class AchievementsService:
             for a in achievements
         ]
     
-    @cached(ttl=30, key_func=lambda self, db, user_id: cache_key_for_user_data(user_id, "achievements_progress"))
+    @cached(
+        ttl=30,
+        key_func=lambda self, db, user_id: cache_key_for_user_data(user_id, "achievements_progress"),
+        tags=lambda self, db, user_id: (user_tag(user_id), ACHIEVEMENTS_PROGRESS_TAG),
+        single_flight=True
+    )
     def get_all_achievements_with_progress(self, db: Session, user_id: int) -> List[AchievementWithProgress]:
         """Get all achievements with progress data for the user."""
         try:
@@ -250,36 +261,23 @@ class AchievementsService:
         return stats
 
     def update_user_stats(self, db: Session, user_id: int) -> UserStats:
-        """Update cached user stats from actual data."""
+        """Recount cached user stats from actual data.
+        
+        The counters are otherwise maintained incrementally, so this is only
+        needed to reconcile them (manual checks, retroactive tools).
+        """
         try:
             if not isinstance(user_id, int) or user_id <= 0:
                 raise ValueError(f"Invalid user_id: {user_id}")
                 
-            stats = self.get_or_create_user_stats(db, user_id)
-            
-            # Count songs by status
-            total_songs = self.repository.count_user_songs(db, user_id)
-            total_released = self.repository.count_songs_by_status(db, user_id, SongStatus.released)
-            total_future = self.repository.count_songs_by_status(db, user_id, SongStatus.future)
-            total_wip = self.repository.count_songs_by_status(db, user_id, SongStatus.wip)
-            
-            # Count other metrics
-            total_packs = self.repository.count_user_packs(db, user_id)
-            total_collaborations = self.repository.count_user_collaborations(db, user_id)
-            total_spotify_imports = self.repository.count_user_spotify_imports(db, user_id)
-            total_feature_requests = self.repository.count_user_feature_requests(db, user_id)
+            stats = self.repository.get_user_stats(db, user_id)
+            if not stats:
+                # A new row is counted as it is created
+                return self.repository.create_user_stats(db, user_id)
             
-            # Update stats
+            # Recount from scratch; repairs any drift in the incremental counters
             return self.repository.update_user_stats(
-                db, stats,
-                total_songs=total_songs,
-                total_released=total_released,
-                total_future=total_future,
-                total_wip=total_wip,
-                total_packs=total_packs,
-                total_collaborations=total_collaborations,
-                total_spotify_imports=total_spotify_imports,
-                total_feature_requests=total_feature_requests
+                db, stats, **self.repository.count_user_stats(db, user_id)
             )
             
         except Exception as e:
@@ -378,30 +376,68 @@ class AchievementsService:
                 print(f"⚠️ Invalid user_id in check_metric_based_achievements: {user_id}")
                 return
                 
-            # Get all achievements for this metric type that user hasn't earned yet
-            unearned_achievements = self.repository.get_unearned_achievements(db, user_id, metric_type)
-            
-            if not unearned_achievements:
-                return  # No achievements to check for this metric
-            
-            # Get current value for this metric
-            stats = self.update_user_stats(db, user_id)
-            if not stats:
-                print(f"⚠️ Could not get stats for user {user_id}")
-                return
-                
-            current_value = self._calculate_metric_value(metric_type, stats, db, user_id)
-            
-            # Check each achievement
-            for achievement in unearned_achievements:
-                if current_value >= achievement.target_value:
-                    awarded = self.award_achievement(db, user_id, achievement.code)
-                    if awarded:
-                        print(f"🏆 Auto-awarded {achievement.name} (metric: {metric_type}, value: {current_value}/{achievement.target_value})")
+            self.evaluate_metrics(db, user_id, {metric_type})
                         
         except Exception as e:
             print(f"❌ Error in check_metric_based_achievements for user {user_id}, metric {metric_type}: {e}")
 
+    def evaluate_metrics(self, db: Session, user_id: int, metric_types: Set[str]) -> List[str]:
+        """Award any unearned achievements on these metric types whose target is reached.
+        
+        Counter-backed metrics are read from the incrementally maintained UserStats
+        row; only the metrics that still have unearned achievements are computed.
+        Returns the codes of newly awarded achievements.
+        """
+        unearned_achievements = self.repository.get_unearned_achievements_for_metrics(db, user_id, metric_types)
+        if not unearned_achievements:
+            return []  # Nothing left to unlock on these metrics
+        
+        stats = self.repository.get_user_stats(db, user_id, refresh=True)
+        if not stats:
+            stats = self.repository.create_user_stats(db, user_id)
+        
+        needed_metrics = {achievement.metric_type for achievement in unearned_achievements}
+        metric_values = self._bulk_calculate_metrics(db, user_id, needed_metrics, stats)
+        
+        awarded_codes = []
+        for achievement in unearned_achievements:
+            current_value = metric_values.get(achievement.metric_type, 0)
+            if current_value >= achievement.target_value:
+                awarded = self.award_achievement(db, user_id, achievement.code)
+                if awarded:
+                    awarded_codes.append(achievement.code)
+                    print(f"🏆 Auto-awarded {achievement.name} (metric: {achievement.metric_type}, value: {current_value}/{achievement.target_value})")
+        return awarded_codes
+
+    def record_events(self, db: Session, user_id: int, events) -> List[str]:
+        """Handle domain events (see achievement_events) for a user.
+        
+        Applies the counter deltas the events carry, then evaluates only the
+        metrics they can move. Returns the codes of newly awarded achievements.
+        """
+        try:
+            if not isinstance(user_id, int) or user_id <= 0:
+                print(f"⚠️ Invalid user_id in record_events: {user_id}")
+                return []
+            
+            events = set(events)
+            deltas: Dict[str, int] = {}
+            for event in events:
+                for column, delta in EVENT_COUNTER_DELTAS.get(event, {}).items():
+                    deltas[column] = deltas.get(column, 0) + delta
+            if deltas:
+                if self.repository.get_user_stats(db, user_id):
+                    adjust_user_stats(db.connection(), user_id, **deltas)
+                    db.commit()
+                else:
+                    # A freshly counted row already includes these events
+                    self.repository.create_user_stats(db, user_id)
+            
+            return self.evaluate_metrics(db, user_id, metrics_for_events(events))
+        except Exception as e:
+            print(f"❌ Error recording achievement events {events} for user {user_id}: {e}")
+            return []
+
     def check_all_achievements_unified(self, db: Session, user_id: int) -> List[str]:
         """Check all achievements using unified database-driven logic."""
         try:
@@ -412,16 +448,13 @@ class AchievementsService:
             # Store current achievements
             current_achievements = self.repository.get_user_achievement_codes(db, user_id)
             
-            # Get all unique metric types that have unearned achievements
-            metric_types = self.repository.get_all_unearned_metric_types(db, user_id)
-            
-            # Check achievements for each metric type
-            for metric_type in metric_types:
-                try:
-                    self.check_metric_based_achievements(db, user_id, metric_type)
-                except Exception as e:
-                    print(f"⚠️ Error checking {metric_type} achievements for user {user_id}: {e}")
-                    continue
+            # Reconcile the counters once, then evaluate every metric with unearned achievements
+            self.update_user_stats(db, user_id)
+            metric_types = set(self.repository.get_all_unearned_metric_types(db, user_id))
+            try:
+                self.evaluate_metrics(db, user_id, metric_types)
+            except Exception as e:
+                print(f"⚠️ Error checking achievements for user {user_id}: {e}")
             
             # Also check customization achievements (they might not be in metric_types)
             try:
@@ -448,10 +481,8 @@ class AchievementsService:
     
     def check_status_achievements(self, db: Session, user_id: int):
         """Check achievements based on song status counts."""
-        self.check_metric_based_achievements(db, user_id, "total_future_created")
-        # Changed: Use lifetime WIP creations instead of concurrent WIPs
-        self.check_metric_based_achievements(db, user_id, "wip_creations") 
-        self.check_metric_based_achievements(db, user_id, "total_released")
+        # Lifetime WIP creations rather than concurrent WIPs
+        self._check_metrics(db, user_id, {"total_future_created", "wip_creations", "total_released"})
 
     def check_wip_completion_achievements(self, db: Session, user_id: int):
         """Check achievements for completing WIP songs."""
@@ -487,23 +518,15 @@ class AchievementsService:
 
     def check_diversity_achievements(self, db: Session, user_id: int):
         """Check diversity achievements."""
-        self.check_metric_based_achievements(db, user_id, "unique_artists")
-        self.check_metric_based_achievements(db, user_id, "unique_years")
-        self.check_metric_based_achievements(db, user_id, "unique_decades")
-        self.check_metric_based_achievements(db, user_id, "alphabet_coverage")
+        self._check_metrics(db, user_id, {"unique_artists", "unique_years", "unique_decades", "alphabet_coverage"})
 
     def check_quality_achievements(self, db: Session, user_id: int):
         """Check quality achievements (song completion, pack completion)."""
-        try:
-            self.check_metric_based_achievements(db, user_id, "completed_songs")
-            self.check_metric_based_achievements(db, user_id, "completed_packs")
-        except Exception as e:
-            print(f"⚠️ Error in check_quality_achievements: {e}")
+        self._check_metrics(db, user_id, {"completed_songs", "completed_packs"})
 
     def check_album_series_achievements(self, db: Session, user_id: int):
         """Check album series achievements."""
-        self.check_metric_based_achievements(db, user_id, "series_created")
-        self.check_metric_based_achievements(db, user_id, "completed_series")
+        self._check_metrics(db, user_id, {"series_created", "completed_series"})
 
     
     def check_public_wip_achievements(self, db: Session, user_id: int):
@@ -567,6 +590,16 @@ class AchievementsService:
 
     # Private helper methods
 
+    def _check_metrics(self, db: Session, user_id: int, metric_types: Set[str]):
+        """Evaluate several metric types together, logging instead of raising."""
+        try:
+            if not isinstance(user_id, int) or user_id <= 0:
+                print(f"⚠️ Invalid user_id in _check_metrics: {user_id}")
+                return
+            self.evaluate_metrics(db, user_id, metric_types)
+        except Exception as e:
+            print(f"❌ Error checking {sorted(metric_types)} achievements for user {user_id}: {e}")
+
     def _bulk_calculate_metrics(self, db: Session, user_id: int, metric_types: set, stats: UserStats) -> Dict[str, int]:
         """Bulk calculate multiple metrics in a single optimized operation."""
         metric_cache = {}
@@ -574,6 +607,7 @@ class AchievementsService:
         # Group metrics by calculation type to minimize database calls
         stats_metrics = {'total_future_created', 'total_wip', 'total_released', 'total_packs', 
                         'total_collaborations', 'total_spotify_imports', 'total_feature_requests', 'login_streak'}
+        stats_aliases = {'wip_creations': 'total_wip_created'}
         diversity_metrics = {'unique_artists', 'unique_years', 'unique_decades', 'alphabet_coverage'}
         expensive_metrics = {'wip_completions', 'completed_songs', 'completed_packs', 'completed_series'}
         simple_count_metrics = {'collaborations_added', 'series_created', 'public_wips', 'collab_requests_sent'}
@@ -586,6 +620,8 @@ class AchievementsService:
             except Exception as e:
                 print(f"⚠️ Error getting stats metric {metric_type}: {e}")
                 metric_cache[metric_type] = 0
+        for metric_type in metric_types.intersection(stats_aliases):
+            metric_cache[metric_type] = getattr(stats, stats_aliases[metric_type], 0) or 0
         
         # 2. Handle diversity metrics with optimized SQL aggregations
         diversity_needed = metric_types.intersection(diversity_metrics)
@@ -777,88 +813,67 @@ class AchievementsService:
             print(f"❌ Error in _get_achievement_progress_data: {e}")
             return {}
 
-    @cached(ttl=60, key_func=lambda self, db, current_user_id, limit=50: f"leaderboard:{limit}:{current_user_id or 'anon'}")
+    @cached(
+        ttl=60,
+        key_func=lambda self, db, current_user_id, limit=50: f"leaderboard:{limit}:{current_user_id or 'anon'}",
+        tags=(LEADERBOARD_TAG,),
+        single_flight=True,
+        stale_ttl=120
+    )
     def get_leaderboard(self, db: Session, current_user_id: Optional[int], limit: int = 50) -> LeaderboardResponse:
         """Get leaderboard with user rankings by total achievement points."""
         try:
-            # Optimized leaderboard query with proper ordering and limits
-            from sqlalchemy import func, desc
-            from models import User, UserAchievement, UserStats
-            
-            # Get top users with pagination - much more efficient
-            top_users_query = db.query(
-                User.id,
-                User.username,
-                func.coalesce(UserStats.total_points, 0).label('total_points'),
-                func.count(UserAchievement.id).label('total_achievements')
-            ).outerjoin(
-                UserStats, User.id == UserStats.user_id
-            ).outerjoin(
-                UserAchievement, User.id == UserAchievement.user_id
-            ).group_by(User.id, User.username, UserStats.total_points).having(
-                func.coalesce(UserStats.total_points, 0) > 0
-            ).order_by(
-                desc(func.coalesce(UserStats.total_points, 0)),
-                User.username
-            ).limit(limit)
-            
-            top_users = top_users_query.all()
-            
-            # Get total count efficiently (only count users with points > 0)
-            total_users = db.query(func.count(User.id)).join(
-                UserStats, User.id == UserStats.user_id
-            ).filter(UserStats.total_points > 0).scalar() or 0
-            
-            # Create leaderboard entries
-            leaderboard_data = []
-            current_user_rank = None
-            
-            for i, user_data in enumerate(top_users, 1):
-                entry = LeaderboardEntry(
-                    user_id=user_data.id,
-                    username=user_data.username,
-                    total_points=user_data.total_points,
-                    total_achievements=user_data.total_achievements,
-                    rank=i
-                )
-                leaderboard_data.append(entry)
-                
-                # Track current user's rank if in top results
-                if current_user_id and user_data.id == current_user_id:
-                    current_user_rank = i
-            
-            # If current user not in top results, get their rank separately
-            if current_user_id and current_user_rank is None:
-                current_user_rank = self._get_user_rank_optimized(db, current_user_id)
-            
+            index = get_leaderboard_index(db)
             return LeaderboardResponse(
-                leaderboard=leaderboard_data,
-                current_user_rank=current_user_rank,
-                total_users=total_users
+                leaderboard=self._leaderboard_entries(db, index.top(limit)),
+                current_user_rank=index.rank(current_user_id) if current_user_id else None,
+                total_users=len(index)
             )
             
         except Exception as e:
             print(f"❌ Error getting leaderboard: {e}")
             raise Exception("Failed to get leaderboard")
     
+    def get_leaderboard_around_user(self, db: Session, user_id: int, radius: int = 5) -> LeaderboardResponse:
+        """Get the leaderboard slice around a user (up to ``radius`` users above and below)."""
+        try:
+            index = get_leaderboard_index(db)
+            return LeaderboardResponse(
+                leaderboard=self._leaderboard_entries(db, index.around(user_id, radius)),
+                current_user_rank=index.rank(user_id),
+                total_users=len(index)
+            )
+            
+        except Exception as e:
+            print(f"❌ Error getting leaderboard around user {user_id}: {e}")
+            raise Exception("Failed to get leaderboard")
+    
+    def _leaderboard_entries(self, db: Session, ranked_users) -> List[LeaderboardEntry]:
+        """Build leaderboard entries, counting achievements for the listed users only."""
+        from sqlalchemy import func
+        
+        user_ids = [ranked.user_id for ranked in ranked_users]
+        achievement_counts = dict(
+            db.query(UserAchievement.user_id, func.count(UserAchievement.id)).filter(
+                UserAchievement.user_id.in_(user_ids)
+            ).group_by(UserAchievement.user_id).all()
+        ) if user_ids else {}
+        
+        return [
+            LeaderboardEntry(
+                user_id=ranked.user_id,
+                username=ranked.username,
+                total_points=ranked.total_points,
+                total_achievements=achievement_counts.get(ranked.user_id, 0),
+                rank=ranked.rank
+            )
+            for ranked in ranked_users
+        ]
+    
     def _get_user_rank_optimized(self, db: Session, user_id: int) -> Optional[int]:
         """Get user's rank in leaderboard efficiently."""
         try:
-            from sqlalchemy import func, text
-            
-            # Get user's points first
-            user_stats = self.repository.get_user_stats(db, user_id)
-            if not user_stats or not user_stats.total_points:
-                return None
-            
-            user_points = user_stats.total_points
-            
-            # Count users with higher points (more efficient than full sort)
-            higher_ranked_count = db.query(func.count(UserStats.user_id)).filter(
-                UserStats.total_points > user_points
-            ).scalar() or 0
-            
-            return higher_ranked_count + 1
+            return get_leaderboard_index(db).rank(user_id)
             
         except Exception as e:
             print(f"⚠️ Error getting user rank for user {user_id}: {e}")
@@ -1,10 +1,150 @@
 """
 Utility functions for logging user activities to the activity_logs table.
+
+Entries are buffered in memory and written by a background thread in bulk
+inserts on their own connection, whenever ``ACTIVITY_LOG_BATCH_SIZE`` entries
+are waiting or ``ACTIVITY_LOG_FLUSH_INTERVAL`` seconds have passed, so request
+handlers don't pay for an extra commit. The buffer is bounded: when it is full
+``log_activity`` waits briefly for room and then drops the entry (counted in
+``trackflow_activity_log_events_total{outcome="dropped"}``).
+
+Set ``ACTIVITY_LOG_MODE=sync`` to write each entry on the caller's session
+instead (tests, scripts).
 """
 from sqlalchemy.orm import Session
 from models import ActivityLog
+from utils.metrics import registry
+from datetime import datetime
+import atexit
 import json
-from typing import Optional, Dict, Any
+import os
+import queue
+import threading
+from typing import Optional, Dict, Any, List
+
+ACTIVITY_LOG_MODE = os.getenv("ACTIVITY_LOG_MODE", "buffered").lower()  # buffered | sync
+ACTIVITY_LOG_BATCH_SIZE = 200
+ACTIVITY_LOG_FLUSH_INTERVAL = 2.0  # seconds
+ACTIVITY_LOG_QUEUE_SIZE = 10_000
+ACTIVITY_LOG_ENQUEUE_TIMEOUT = 0.05  # seconds to wait for room before dropping
+
+ACTIVITY_LOG_EVENTS_TOTAL = registry.counter(
+    "trackflow_activity_log_events_total",
+    "Activity log entries by outcome (queued, written, dropped)",
+    ("outcome",),
+)
+
+
+class ActivityLogSink:
+    """
+    Bounded in-memory buffer of activity log rows with a background flusher.
+
+    Args:
+        engine: Engine to insert with (defaults to the app engine)
+        batch_size: Pending entries that trigger an early flush
+        flush_interval: Longest time an entry waits before being written
+        max_queue: Buffer size; entries beyond it are dropped
+    """
+
+    def __init__(
+        self,
+        engine=None,
+        batch_size: int = ACTIVITY_LOG_BATCH_SIZE,
+        flush_interval: float = ACTIVITY_LOG_FLUSH_INTERVAL,
+        max_queue: int = ACTIVITY_LOG_QUEUE_SIZE,
+    ):
+        self._engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # Request threads and the flusher both update these
+        self._stats_lock = threading.Lock()
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """Buffer a row for the next flush; returns False if it was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put(row, timeout=ACTIVITY_LOG_ENQUEUE_TIMEOUT)
+        except queue.Full:
+            self._record_dropped(1, "buffer full")
+            return False
+        with self._stats_lock:
+            self.queued += 1
+        ACTIVITY_LOG_EVENTS_TOTAL.inc(outcome="queued")
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """Write everything buffered so far in one bulk insert; returns the row count."""
+        with self._flush_lock:
+            rows: List[Dict[str, Any]] = []
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not rows:
+                return 0
+            try:
+                with self._get_engine().begin() as conn:
+                    conn.execute(ActivityLog.__table__.insert(), rows)
+            except Exception as e:
+                self._record_dropped(len(rows), f"insert failed: {e}")
+                return 0
+            with self._stats_lock:
+                self.written += len(rows)
+            ACTIVITY_LOG_EVENTS_TOTAL.inc(len(rows), outcome="written")
+            return len(rows)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _get_engine(self):
+        if self._engine is None:
+            from database import engine
+            self._engine = engine
+        return self._engine
+
+    def _record_dropped(self, count: int, reason: str):
+        with self._stats_lock:
+            self.dropped += count
+            dropped = self.dropped
+        ACTIVITY_LOG_EVENTS_TOTAL.inc(count, outcome="dropped")
+        print(f"⚠️ Dropped {count} activity log entries ({reason}); {dropped} dropped so far")
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="activity-log-flusher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Activity log flush failed: {e}")
+
+
+activity_log_sink = ActivityLogSink()
+atexit.register(activity_log_sink.flush)
+
+
+def flush_activity_logs() -> int:
+    """Write buffered entries now (e.g. before reading them back, or on shutdown)."""
+    return activity_log_sink.flush()
 
 
 def log_activity(
@@ -16,26 +156,37 @@ def log_activity(
 ):
     """
     Log a user activity to the database.
-    
+
     Args:
-        db: Database session
+        db: Database session (only used when ACTIVITY_LOG_MODE=sync)
         user_id: ID of the user performing the activity
         activity_type: Type of activity (e.g., "login", "create_song", "change_status", "import_spotify")
         description: Human-readable description of the activity
         metadata: Optional dictionary of additional data to store as JSON
     """
+    metadata_json = json.dumps(metadata) if metadata else None
+
+    if ACTIVITY_LOG_MODE != "sync":
+        activity_log_sink.submit({
+            "user_id": user_id,
+            "activity_type": activity_type,
+            "description": description,
+            "metadata_json": metadata_json,
+            "created_at": datetime.utcnow(),
+        })
+        return
+
     try:
         activity = ActivityLog(
             user_id=user_id,
             activity_type=activity_type,
             description=description,
-            metadata_json=json.dumps(metadata) if metadata else None
+            metadata_json=metadata_json
         )
-        
+
         db.add(activity)
         db.commit()
     except Exception as e:
         # Don't fail the request if activity logging fails
         db.rollback()
         print(f"Failed to log activity: {e}")
-
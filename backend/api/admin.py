@@ -28,6 +28,7 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 class BroadcastNotificationRequest(BaseModel):
     title: str
     message: str
+    background: bool = False  # Queue the fan-out and return immediately with a job_id
 
 def require_admin(current_user: User = Depends(get_current_user)):
     """Dependency to check if user is an admin"""
@@ -322,40 +323,32 @@ def broadcast_notification(
     if not title or not message:
         raise HTTPException(status_code=400, detail="Title and message are required")
     
-    # Get all active users
-    users = db.query(User).filter(User.is_active == True).all()
-    
-    if not users:
-        return {"message": "No active users found", "sent_count": 0}
-    
-    # Initialize notification service
     notification_service = NotificationService(db)
-    
-    sent_count = 0
-    errors = []
-    
-    for user in users:
-        try:
-            notification_service.create_general_notification(
-                user_id=user.id,
-                title=title,
-                message=message
-            )
-            sent_count += 1
-        except Exception as e:
-            errors.append(f"Failed to send to {user.username}: {str(e)}")
-    
-    result = {
-        "message": f"Broadcast notification sent to {sent_count} users",
-        "sent_count": sent_count,
-        "total_users": len(users)
-    }
-    
-    if errors:
-        result["errors"] = errors[:10]  # Limit to first 10 errors
+    result = notification_service.broadcast_notification(
+        type=NotificationType.GENERAL,
+        title=title,
+        message=message,
+        background=request.background,
+        requested_by=current_user.id,
+    )
+    if not request.background:
+        result["message"] = f"Broadcast notification sent to {result['sent_count']} users"
     
     return result
 
+@router.post("/notification-counters/reconcile")
+def reconcile_notification_counters(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Queue a recount of every user's notification badge counter (admin only)"""
+    from api.notifications.services.notification_jobs import RECONCILE_NOTIFICATION_COUNTERS_JOB
+    from services.job_queue import enqueue_job
+    
+    job = enqueue_job(db, RECONCILE_NOTIFICATION_COUNTERS_JOB, user_id=current_user.id)
+    db.commit()
+    return {"queued": True, "job_id": job.id}
+
 
 # ==================== RELEASE POST MANAGEMENT ====================
 
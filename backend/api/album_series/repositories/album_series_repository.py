@@ -7,8 +7,9 @@ from datetime import datetime
 
 from models import (
     AlbumSeries, Song, Collaboration, CollaborationType, SongStatus, 
-    User, Pack, AlbumSeriesPreexisting, AlbumSeriesOverride, RockBandDLC
+    User, Pack, AlbumSeriesPreexisting, AlbumSeriesOverride
 )
+from services.dlc_index import get_dlc_index
 
 
 class AlbumSeriesRepository:
@@ -153,11 +154,7 @@ class DLCRepository:
     
     def check_dlc_status(self, title: str, artist: str) -> bool:
         """Check if a song is already official Rock Band DLC."""
-        dlc_entry = self.db.query(RockBandDLC).filter(
-            RockBandDLC.title.ilike(title),
-            RockBandDLC.artist.ilike(artist)
-        ).first()
-        return dlc_entry is not None
+        return get_dlc_index(self.db).is_dlc(title, artist)
 
 
 class PreexistingRepository:
@@ -319,13 +316,6 @@ class SongRepository:
         """Get all songs by artist (case insensitive)."""
         return self.db.query(Song).filter(Song.artist.ilike(f"%{artist}%")).all()
     
-    def check_song_exists_in_series(self, series_id: int, title: str) -> Optional[Song]:
-        """Check if song with title exists in series."""
-        return self.db.query(Song).filter(
-            Song.album_series_id == series_id,
-            Song.title.ilike(title)
-        ).first()
-    
     def create_song(self, **kwargs) -> Song:
         """Create a new song."""
         song = Song(**kwargs)
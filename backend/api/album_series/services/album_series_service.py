@@ -4,10 +4,9 @@ import os
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
-from spotipy import Spotify
-from spotipy.oauth2 import SpotifyClientCredentials
 
 from models import AlbumSeries, Song, SongStatus, User
+from services.spotify_client import get_spotify_client
 from schemas import AlbumSeriesResponse, CreateAlbumSeriesRequest
 from ..repositories.album_series_repository import (
     AlbumSeriesRepository, DLCRepository, PreexistingRepository, 
@@ -400,10 +399,7 @@ class AlbumSeriesService:
             return
         
         try:
-            sp = Spotify(auth_manager=SpotifyClientCredentials(
-                client_id=SPOTIFY_CLIENT_ID,
-                client_secret=SPOTIFY_CLIENT_SECRET
-            ))
+            sp = get_spotify_client()
             
             search_query = f"artist:{album_series.artist_name} album:{album_series.album_name}"
             results = sp.search(q=search_query, type="album", limit=1)
@@ -437,10 +433,7 @@ class SpotifyService:
         if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
             raise ValueError("Spotify credentials not configured")
         
-        sp = Spotify(auth_manager=SpotifyClientCredentials(
-            client_id=SPOTIFY_CLIENT_ID,
-            client_secret=SPOTIFY_CLIENT_SECRET
-        ))
+        sp = get_spotify_client()
         
         search_query = f"artist:{series.artist_name} album:{series.album_name}"
         results = sp.search(q=search_query, type="album", limit=1)
@@ -470,10 +463,7 @@ class SpotifyService:
         if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
             raise ValueError("Spotify credentials not configured")
         
-        sp = Spotify(auth_manager=SpotifyClientCredentials(
-            client_id=SPOTIFY_CLIENT_ID,
-            client_secret=SPOTIFY_CLIENT_SECRET
-        ))
+        sp = get_spotify_client()
         
         updated_count = 0
         for series in series_without_art:
@@ -4,9 +4,9 @@ import os
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from spotipy import Spotify
-from spotipy.oauth2 import SpotifyClientCredentials
 
 from models import AlbumSeries, Song, SongStatus, User
+from services.spotify_client import get_spotify_client
 from ..repositories.album_series_repository import (
     AlbumSeriesRepository, DLCRepository, PreexistingRepository, 
     OverrideRepository, SongRepository, UserRepository
@@ -15,7 +15,8 @@ from ..validators.album_series_validators import (
     TracklistItem, PreexistingUpdate, IrrelevantUpdate, 
     DiscActionRequest, AddMissingRequest, OverrideRequest
 )
-from api.tools import clean_string, normalize_title, titles_similar
+from api.tools import clean_string, normalize_title
+from utils.title_matching import TitleMatcher
 
 # Spotify credentials
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
@@ -43,19 +44,16 @@ class TracklistService:
         if not SPOTIFY_CLIENT_ID or not SPOTIFY_CLIENT_SECRET:
             raise ValueError("Spotify credentials not configured")
         
-        sp = Spotify(auth_manager=SpotifyClientCredentials(
-            client_id=SPOTIFY_CLIENT_ID,
-            client_secret=SPOTIFY_CLIENT_SECRET
-        ))
+        sp = get_spotify_client()
         
         # Get Spotify album tracks
         tracks = self._search_spotify_tracks(sp, series)
         if not tracks:
             return []
         
-        # Get existing data for mapping
-        songs_map = self._build_songs_map(series_id)
-        global_songs = self._get_global_songs(series.artist_name)
+        # Get existing data for mapping (normalized and indexed once per request)
+        series_matcher = self._build_series_matcher(series_id)
+        global_matcher = self._build_global_matcher(series.artist_name)
         preexisting_map, irrelevant_map = self._build_flag_maps(series_id)
         override_map = self._build_override_map(series_id)
         
@@ -63,7 +61,7 @@ class TracklistService:
         items = []
         for t in tracks.get('items', []):
             item = self._build_tracklist_item(
-                t, series, songs_map, global_songs, 
+                t, series, series_matcher, global_matcher, 
                 preexisting_map, irrelevant_map, override_map
             )
             items.append(item)
@@ -118,10 +116,7 @@ class TracklistService:
             raise ValueError("Spotify credentials not configured")
         
         # Get tracks for the specified disc
-        sp = Spotify(auth_manager=SpotifyClientCredentials(
-            client_id=SPOTIFY_CLIENT_ID,
-            client_secret=SPOTIFY_CLIENT_SECRET
-        ))
+        sp = get_spotify_client()
         
         tracks = self._search_spotify_tracks(sp, series)
         if not tracks:
@@ -155,10 +150,7 @@ class TracklistService:
             raise ValueError("Spotify credentials not configured")
         
         # Get Spotify tracklist
-        sp = Spotify(auth_manager=SpotifyClientCredentials(
-            client_id=SPOTIFY_CLIENT_ID,
-            client_secret=SPOTIFY_CLIENT_SECRET
-        ))
+        sp = get_spotify_client()
         
         tracks = self._search_spotify_tracks(sp, series)
         if not tracks:
@@ -191,13 +183,18 @@ class TracklistService:
         if not series:
             raise ValueError("Album series not found")
         
+        series_matcher = self._build_series_matcher(series_id)
+        added_keys = set()
+        
         new_ids = []
         for track_data in request.tracks:
             title = clean_string(track_data.get('title') or '')
+            key = normalize_title(title)
             
-            # Skip if already exists in series
-            if self.song_repo.check_song_exists_in_series(series_id, title):
+            # Skip if already exists in series (same matching as the tracklist view)
+            if key in added_keys or series_matcher.match(key):
                 continue
+            added_keys.add(key)
             
             song = self.song_repo.create_song(
                 title=title,
@@ -281,17 +278,25 @@ class TracklistService:
         album = results["albums"]["items"][0]
         return sp.album_tracks(album["id"])
     
-    def _build_songs_map(self, series_id: int) -> Dict[str, Song]:
-        """Build map of normalized titles to songs for the series."""
+    def _build_series_matcher(self, series_id: int) -> TitleMatcher[Song]:
+        """Build title matcher over the songs in the series."""
         songs = self.song_repo.get_songs_by_series(series_id)
-        return {normalize_title((s.title or "")): s for s in songs}
+        return TitleMatcher(songs, lambda s: s.title)
     
-    def _get_global_songs(self, artist_name: str) -> List[Song]:
-        """Get all songs by the same artist globally."""
+    def _build_global_matcher(self, artist_name: str) -> TitleMatcher[Song]:
+        """Build title matcher over all songs by the same artist globally."""
         try:
-            return self.song_repo.get_songs_by_artist(artist_name)
+            songs = self.song_repo.get_songs_by_artist(artist_name)
         except Exception:
-            return []
+            songs = []
+        
+        normalized_series_artist = normalize_title(artist_name or "")
+        same_artist = []
+        for gs in songs:
+            gs_artist = normalize_title(gs.artist or "")
+            if normalized_series_artist in gs_artist or gs_artist in normalized_series_artist:
+                same_artist.append(gs)
+        return TitleMatcher(same_artist, lambda s: s.title)
     
     def _build_flag_maps(self, series_id: int) -> tuple:
         """Build preexisting and irrelevant flag maps."""
@@ -312,19 +317,21 @@ class TracklistService:
     def _build_override_map(self, series_id: int) -> Dict[str, Song]:
         """Build override map for manual song linkings."""
         overrides = self.override_repo.get_overrides_for_series(series_id)
+        linked_ids = [ov.linked_song_id for ov in overrides if ov.linked_song_id]
+        linked_songs = {
+            song.id: song for song in self.song_repo.get_songs_by_ids(linked_ids)
+        } if linked_ids else {}
         override_map = {}
         
         for ov in overrides:
             key = ov.spotify_track_id or (ov.title_clean or "").lower()
-            if key and ov.linked_song_id:
-                songs = self.song_repo.get_songs_by_ids([ov.linked_song_id])
-                if songs:
-                    override_map[key] = songs[0]
+            if key and ov.linked_song_id in linked_songs:
+                override_map[key] = linked_songs[ov.linked_song_id]
         
         return override_map
     
-    def _build_tracklist_item(self, track: Dict, series: AlbumSeries, songs_map: Dict, 
-                             global_songs: List[Song], preexisting_map: Dict, 
+    def _build_tracklist_item(self, track: Dict, series: AlbumSeries, series_matcher: TitleMatcher, 
+                             global_matcher: TitleMatcher, preexisting_map: Dict, 
                              irrelevant_map: Dict, override_map: Dict) -> TracklistItem:
         """Build a single tracklist item from Spotify track data."""
         raw_title = track.get('name') or ''
@@ -335,34 +342,13 @@ class TracklistService:
         # Find matching song (override first, then series, then global)
         series_song = override_map.get(spotify_id) or override_map.get(key)
         if not series_song:
-            series_song = songs_map.get(key)
-        if not series_song:
-            # Fuzzy match against existing song titles in this series
-            for cand_key, cand_song in songs_map.items():
-                if titles_similar(key, cand_key, threshold=0.92):
-                    series_song = cand_song
-                    break
+            # Exact, then fuzzy match against existing song titles in this series
+            series_song = series_matcher.match(key)
         
         # Try to recognize releases globally by the same artist
         global_song = None
-        if not series_song and global_songs:
-            normalized_series_artist = normalize_title(series.artist_name or "")
-            # Exact normalized title + artist match
-            for gs in global_songs:
-                if (normalize_title(gs.title or "") == key and 
-                    normalize_title(gs.artist or "").find(normalized_series_artist) != -1):
-                    global_song = gs
-                    break
-            
-            # Fuzzy title match with same artist
-            if not global_song:
-                for gs in global_songs:
-                    if (normalize_title(gs.artist or "").find(normalized_series_artist) == -1 and 
-                        normalized_series_artist.find(normalize_title(gs.artist or "")) == -1):
-                        continue
-                    if titles_similar(key, normalize_title(gs.title or ""), threshold=0.92):
-                        global_song = gs
-                        break
+        if not series_song:
+            global_song = global_matcher.match(key)
         
         # Check DLC status
         official = False
@@ -413,24 +399,22 @@ class TracklistService:
             return
         
         try:
-            from api.spotify import auto_enhance_song
+            from api.spotify.services.bulk_enhancement_service import BulkEnhancementService
             from api.tools import clean_string as _clean
             
-            for song_id in song_ids:
-                try:
-                    auto_enhance_song(song_id, self.db, preserve_artist_album=True)
-                    song = self.db.query(Song).get(song_id)
-                    if song:
-                        cleaned_title = _clean(song.title)
-                        cleaned_album = _clean(song.album or "")
-                        if cleaned_title != song.title or cleaned_album != song.album:
-                            song.title = cleaned_title
-                            song.album = cleaned_album
-                            self.db.add(song)
-                    self.db.commit()
-                except Exception:
-                    self.db.rollback()
-                    continue
+            results = BulkEnhancementService().enhance_songs(
+                song_ids, self.db, current_user.id, preserve_artist_album=True
+            )
+            for result in results:
+                song = result["song"]
+                if song:
+                    cleaned_title = _clean(song.title)
+                    cleaned_album = _clean(song.album or "")
+                    if cleaned_title != song.title or cleaned_album != song.album:
+                        song.title = cleaned_title
+                        song.album = cleaned_album
+                        self.db.add(song)
+            self.db.commit()
         except Exception:
             pass
         
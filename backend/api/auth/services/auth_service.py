@@ -15,6 +15,7 @@ from models import User
 from ..repositories.user_repository import UserRepository
 from .email_service import EmailService
 from auth import SECRET_KEY as GLOBAL_SECRET_KEY, ALGORITHM as GLOBAL_ALGORITHM
+from utils.metrics import record_cache_lookup
 
 # Use the same JWT configuration as the core auth module
 SECRET_KEY = GLOBAL_SECRET_KEY
@@ -94,9 +95,11 @@ class AuthService:
             if username in _user_cache:
                 user_data, timestamp = _user_cache[username]
                 if time.time() - timestamp < CACHE_TTL:
+                    record_cache_lookup("auth_user", True)
                     return user_data
                 else:
                     del _user_cache[username]
+            record_cache_lookup("auth_user", False)
             return None
     
     def cache_user_data(self, username: str, user: User):
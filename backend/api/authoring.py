@@ -302,6 +302,13 @@ def mark_all_authoring_complete(song_id: int, db: Session = Depends(get_db), cur
     db.commit()
     db.refresh(song)
     
+    # Invalidate completion cache for this song
+    try:
+        from services.completion_cache import invalidate_song_cache
+        invalidate_song_cache(song.id)
+    except Exception as e:
+        print(f"⚠️ Failed to invalidate cache for song {song.id}: {e}")
+    
     # Check achievements after marking all complete
     try:
         from api.achievements import check_quality_achievements, check_wip_completion_achievements
@@ -8,7 +8,7 @@ from models import (
 )
 from api.auth import get_current_active_user
 from api.activity_logger import log_activity
-from models import Notification
+from api.notifications.services.notification_service import NotificationService
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 from datetime import datetime
@@ -19,15 +19,13 @@ router = APIRouter(prefix="/collaboration-requests", tags=["Collaboration Reques
 def create_notification(db: Session, user_id: int, notification_type: str, title: str, message: str, metadata: dict = None):
     """Simple notification creation helper"""
     try:
-        notification = Notification(
+        return NotificationService(db).create_collaboration_request_notification(
             user_id=user_id,
-            type=notification_type,
+            notification_type=notification_type,
             title=title,
-            message=message
+            message=message,
+            related_song_id=(metadata or {}).get("song_id"),
         )
-        db.add(notification)
-        db.commit()
-        return notification
     except Exception as e:
         db.rollback()
         raise e
@@ -438,9 +436,10 @@ def respond_to_collaboration_request(
     # Check achievements if collaboration was accepted
     if response.response == "accepted":
         try:
-            from api.achievements import check_social_collaboration_achievements
-            check_social_collaboration_achievements(db, current_user.id)  # For song owner (adding collaborator)
-            check_social_collaboration_achievements(db, collab_request.requester_id)  # For collaborator (being added)
+            from api.achievements import record_achievement_events
+            from api.achievements.services.achievement_events import COLLABORATION_ADDED
+            record_achievement_events(db, current_user.id, [COLLABORATION_ADDED])  # For song owner (adding collaborator)
+            record_achievement_events(db, collab_request.requester_id, [COLLABORATION_ADDED])  # For collaborator (being added)
         except Exception as ach_err:
             pass
     
@@ -1134,9 +1133,10 @@ def respond_to_batch(
     # Check achievements if any collaborations were created
     if approved_count > 0:
         try:
-            from api.achievements import check_social_collaboration_achievements
-            check_social_collaboration_achievements(db, current_user.id)
-            check_social_collaboration_achievements(db, batch.requester_id)
+            from api.achievements import record_achievement_events
+            from api.achievements.services.achievement_events import COLLABORATION_ADDED
+            record_achievement_events(db, current_user.id, [COLLABORATION_ADDED])
+            record_achievement_events(db, batch.requester_id, [COLLABORATION_ADDED])
         except Exception as ach_err:
             print(f"⚠️ Failed to check achievements: {ach_err}")
     
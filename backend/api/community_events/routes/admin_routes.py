@@ -33,9 +33,9 @@ def create_community_event(
     # Create the event
     pack = service.create_event(event_data, current_user.id)
     
-    # Broadcast notification to all users
-    notification_count = service.broadcast_event_notification(pack)
-    print(f"📢 Broadcasted event notification to {notification_count} users")
+    # Broadcast notification to all users (bulk insert, queued in the background)
+    notification_result = service.broadcast_event_notification(pack, background=True)
+    print(f"📢 Event notification broadcast: {notification_result}")
     
     return service.build_event_response(pack, current_user.id)
 
@@ -10,6 +10,7 @@ from api.auth import get_current_active_user
 from models import User, Pack, Song, CommunityEventRegistration, SongStatus
 from schemas import SongCreate
 from api.data_access import create_song_in_db
+from api.songs.services.song_jobs import enqueue_song_enhancement
 from ..schemas import (
     CommunityEventResponse,
     CommunityEventListResponse,
@@ -310,7 +311,7 @@ def add_song_to_event(
         db.refresh(song)
     else:
         # Create new song using the standard song creation flow
-        # This includes Spotify auto-enhancement and workflow step creation
+        # This includes workflow step creation; Spotify auto-enhancement is queued
         if not request.title or not request.artist:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -337,11 +338,8 @@ def add_song_to_event(
             status=SongStatus.wip,
         )
         
-        # Use the standard song creation function (includes Spotify enhancement)
-        song = create_song_in_db(db, song_data, current_user, auto_enhance=True)
-        
-        # Refresh song to get latest data after Spotify enhancement
-        db.refresh(song)
+        # Use the standard song creation function; Spotify enhancement runs in a background job
+        song = create_song_in_db(db, song_data, current_user, auto_enhance=False)
         
         # Clean remaster tags from the newly created song
         try:
@@ -358,6 +356,9 @@ def add_song_to_event(
             print(f"⚠️ Failed to clean remaster tags for event song: {e}")
             traceback.print_exc()
             # Don't fail if cleaning fails
+        
+        enqueue_song_enhancement(db, current_user.id, [song.id])
+        db.commit()
     
     return service._build_song_response(song, pack, is_owner=True)
 
@@ -464,11 +465,10 @@ def swap_event_song(
                 status=SongStatus.wip,
             )
             
-            # Use the standard song creation function (includes Spotify enhancement)
-            new_song = create_song_in_db(db, song_data, current_user, auto_enhance=True)
-            
-            # Refresh song to get latest data after Spotify enhancement
-            db.refresh(new_song)
+            # Use the standard song creation function; Spotify enhancement runs in a
+            # background job once the swap below commits
+            new_song = create_song_in_db(db, song_data, current_user, auto_enhance=False)
+            enqueue_song_enhancement(db, current_user.id, [new_song.id])
             
             # Clean remaster tags from the newly created song
             try:
@@ -4,7 +4,7 @@ from typing import List, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from models import Pack, Song, User, CommunityEventRegistration, Notification, NotificationType
+from models import Pack, Song, User, CommunityEventRegistration, NotificationType
 from services.completion_service import fetch_workflow_fields_map, fetch_song_progress_map
 from ..schemas import (
     CommunityEventCreate,
@@ -591,23 +591,15 @@ class EventService:
         
         return result
     
-    def broadcast_event_notification(self, pack: Pack) -> int:
+    def broadcast_event_notification(self, pack: Pack, background: bool = False) -> dict:
         """Broadcast notification to all users about new event."""
-        users = self.db.query(User).filter(User.is_active == True).all()
-        
-        count = 0
-        for user in users:
-            notification = Notification(
-                user_id=user.id,
-                type=NotificationType.COMMUNITY_EVENT_STARTED.value,
-                title=f"New Community Event: {pack.event_theme}",
-                message=pack.event_description or f"A new community event '{pack.name}' has started! Head to the WIP page to participate.",
-                is_read=False,
-                created_at=datetime.utcnow(),
-            )
-            self.db.add(notification)
-            count += 1
-        
-        self.db.commit()
-        return count
+        from api.notifications.services.notification_service import NotificationService
+        
+        return NotificationService(self.db).broadcast_notification(
+            type=NotificationType.COMMUNITY_EVENT_STARTED,
+            title=f"New Community Event: {pack.event_theme}",
+            message=pack.event_description or f"A new community event '{pack.name}' has started! Head to the WIP page to participate.",
+            background=background,
+            requested_by=pack.user_id,
+        )
 
@@ -2,7 +2,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from models import Song, Collaboration, CollaborationType, User, Pack, Authoring, SongStatus
 from schemas import SongCreate, AuthoringUpdate
+from utils.normalization import song_fingerprint
 from fastapi import HTTPException
+from typing import Optional
 
 
 
@@ -164,6 +166,25 @@ def create_song_in_db(db: Session, song: SongCreate, user: User, auto_enhance: b
             db.flush()
     
     # Auto-enhance song with Spotify data (only if auto_enhance is True and user has it enabled)
+    if auto_enhance:
+        auto_enhance_new_song(db, db_song, user, auto_commit)
+    else:
+        print(f"Auto-enhancement skipped for song {db_song.id} (auto_enhance parameter is False)")
+        
+    return db_song
+
+def auto_enhance_new_song(db: Session, db_song: Song, user: User, auto_commit: bool = True,
+                          delete_duplicate: bool = True) -> Optional[Song]:
+    """
+    Enhance a newly created song with Spotify data (if the user has it enabled),
+    then clean remaster tags.
+
+    If the enhanced title/artist duplicates a song the user already has:
+    with ``delete_duplicate`` (the song has not been returned to the client
+    yet) the new song is deleted and a 400 HTTPException raised; otherwise the
+    song is kept and the existing duplicate is returned so the caller can let
+    the user decide.
+    """
     # Reload user from database to get fresh setting value (user might be from cache)
     db_user = db.query(User).filter(User.id == user.id).first()
     user_auto_enhance_enabled = True
@@ -175,92 +196,95 @@ def create_song_in_db(db: Session, song: SongCreate, user: User, auto_enhance: b
         else:
             user_auto_enhance_enabled = bool(user_auto_enhance_enabled)
     
-    if auto_enhance and user_auto_enhance_enabled:
-        print(f"🎵 Attempting auto-enhancement for song {db_song.id} ({db_song.title} by {db_song.artist})")
-        try:
-            from api.spotify import auto_enhance_song
-            enhancement_result = auto_enhance_song(db_song.id, db, preserve_artist_album=False)
-            if enhancement_result:
-                print(f"✅ Auto-enhanced song {db_song.id} with Spotify data")
-                
-                # Refresh to get updated metadata from Spotify
-                db.refresh(db_song)
-            else:
-                print(f"❌ Auto-enhancement failed for song {db_song.id} - no results found or error occurred")
-                
-            # Check for duplicates AFTER Spotify enhancement
-            print(f"Checking for post-enhancement duplicates: '{db_song.title}' by {db_song.artist}")
-            # Look for other songs with the same title/artist (excluding this one)
-            # Protect against None values that could cause crashes
-            if db_song.title and db_song.artist:
-                duplicate_song = db.query(Song).filter(
-                    Song.title.ilike(db_song.title),
-                    Song.artist.ilike(db_song.artist),
-                    Song.id != db_song.id  # Exclude the current song
-                ).first()
-            else:
-                duplicate_song = None
+    if not user_auto_enhance_enabled:
+        print(f"Auto-enhancement skipped for song {db_song.id} (user has disabled automatic Spotify fetching)")
+        return None
+    
+    print(f"🎵 Attempting auto-enhancement for song {db_song.id} ({db_song.title} by {db_song.artist})")
+    duplicate_song = None
+    try:
+        from api.spotify import auto_enhance_song
+        enhancement_result = auto_enhance_song(db_song.id, db, preserve_artist_album=False)
+        if enhancement_result:
+            print(f"✅ Auto-enhanced song {db_song.id} with Spotify data")
             
-            if duplicate_song:
-                # Check if user owns or collaborates on the duplicate
-                user_has_access = False
-                if duplicate_song.user_id == user.id:
-                    user_has_access = True
-                else:
-                    collaboration = db.query(Collaboration).filter(
-                        Collaboration.song_id == duplicate_song.id,
-                        Collaboration.user_id == user.id,
-                        Collaboration.collaboration_type == CollaborationType.SONG_EDIT
-                    ).first()
-                    if collaboration:
-                        user_has_access = True
-                
-                if user_has_access:
-                    # Delete the newly created song to prevent duplicate using proper cleanup
-                    print(f"Deleting duplicate song {db_song.id} created by Spotify enhancement")
-                    song_id_to_delete = db_song.id
-                    song_title = db_song.title
-                    song_artist = db_song.artist
-                    
-                    # Use the proper deletion function that handles related records
-                    if delete_song_from_db(db, song_id_to_delete):
-                        print(f"Successfully deleted duplicate song {song_id_to_delete}")
-                    else:
-                        print(f"Failed to delete duplicate song {song_id_to_delete}")
-                    
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Song '{song_title}' by {song_artist} already exists in your database (detected after Spotify enhancement)"
-                    )
+            # Refresh to get updated metadata from Spotify
+            db.refresh(db_song)
+        else:
+            print(f"❌ Auto-enhancement failed for song {db_song.id} - no results found or error occurred")
             
-            # Auto-clean remaster tags after enhancement (runs regardless of duplicate check)
-            try:
-                from api.tools import clean_string
-                
-                cleaned_title = clean_string(db_song.title)
-                cleaned_album = clean_string(db_song.album or "")
-                
-                if cleaned_title != db_song.title or cleaned_album != db_song.album:
-                    print(f"Cleaning remaster tags for song {db_song.id}")
-                    db_song.title = cleaned_title
-                    db_song.album = cleaned_album
-                    if auto_commit:
-                        db.commit()
-                    print(f"Cleaned song {db_song.id}: title='{cleaned_title}', album='{cleaned_album}'")
-            except Exception as clean_error:
-                print(f"Failed to clean remaster tags for song {db_song.id}: {clean_error}")
-        except Exception as e:
-            print(f"Failed to auto-enhance song {db_song.id}: {e}")
-            # Re-raise HTTPException to propagate duplicate detection errors
-            if isinstance(e, HTTPException):
-                raise e
-    else:
-        if not auto_enhance:
-            print(f"Auto-enhancement skipped for song {db_song.id} (auto_enhance parameter is False)")
-        elif not user_auto_enhance_enabled:
-            print(f"Auto-enhancement skipped for song {db_song.id} (user has disabled automatic Spotify fetching)")
+        # Check for duplicates AFTER Spotify enhancement
+        print(f"Checking for post-enhancement duplicates: '{db_song.title}' by {db_song.artist}")
+        duplicate_song = find_enhanced_duplicate(db, db_song, user)
         
-    return db_song
+        if duplicate_song and delete_duplicate:
+            # Delete the newly created song to prevent duplicate using proper cleanup
+            print(f"Deleting duplicate song {db_song.id} created by Spotify enhancement")
+            song_id_to_delete = db_song.id
+            song_title = db_song.title
+            song_artist = db_song.artist
+            
+            # Use the proper deletion function that handles related records
+            if delete_song_from_db(db, song_id_to_delete):
+                print(f"Successfully deleted duplicate song {song_id_to_delete}")
+            else:
+                print(f"Failed to delete duplicate song {song_id_to_delete}")
+            
+            raise HTTPException(
+                status_code=400,
+                detail=f"Song '{song_title}' by {song_artist} already exists in your database (detected after Spotify enhancement)"
+            )
+        
+        # Auto-clean remaster tags after enhancement (runs regardless of duplicate check)
+        try:
+            from api.tools import clean_string
+            
+            cleaned_title = clean_string(db_song.title)
+            cleaned_album = clean_string(db_song.album or "")
+            
+            if cleaned_title != db_song.title or cleaned_album != db_song.album:
+                print(f"Cleaning remaster tags for song {db_song.id}")
+                db_song.title = cleaned_title
+                db_song.album = cleaned_album
+                if auto_commit:
+                    db.commit()
+                print(f"Cleaned song {db_song.id}: title='{cleaned_title}', album='{cleaned_album}'")
+        except Exception as clean_error:
+            print(f"Failed to clean remaster tags for song {db_song.id}: {clean_error}")
+    except Exception as e:
+        print(f"Failed to auto-enhance song {db_song.id}: {e}")
+        # Re-raise HTTPException to propagate duplicate detection errors
+        if isinstance(e, HTTPException):
+            raise e
+    return duplicate_song
+
+def find_enhanced_duplicate(db: Session, db_song: Song, user: User) -> Optional[Song]:
+    """
+    Another song with the same title/artist (case-insensitive) that the user
+    owns or collaborates on, or None.
+    """
+    # Protect against None values that could cause crashes
+    if not db_song.title or not db_song.artist:
+        return None
+    
+    # Look for other songs with the same title/artist (excluding this one)
+    duplicate_song = db.query(Song).filter(
+        Song.title.ilike(db_song.title),
+        Song.artist.ilike(db_song.artist),
+        Song.id != db_song.id  # Exclude the current song
+    ).first()
+    if not duplicate_song:
+        return None
+    
+    # Check if user owns or collaborates on the duplicate
+    if duplicate_song.user_id == user.id:
+        return duplicate_song
+    collaboration = db.query(Collaboration).filter(
+        Collaboration.song_id == duplicate_song.id,
+        Collaboration.user_id == user.id,
+        Collaboration.collaboration_type == CollaborationType.SONG_EDIT
+    ).first()
+    return duplicate_song if collaboration else None
 
 def get_authoring_by_song_id(db: Session, song_id: int):
     return db.query(Authoring).filter(Authoring.song_id == song_id).first()
@@ -320,31 +344,30 @@ def check_song_duplicate_for_user(db: Session, title: str, artist: str, current_
     """
     Check if a song already exists for the current user (as owner or collaborator).
     Returns True if the user already has access to this song, False otherwise.
-    Uses case-insensitive matching to prevent duplicates with different capitalization.
+    Matches on the normalized song fingerprint, so capitalization, punctuation
+    and remaster tags don't produce duplicates.
     """
     # Protect against None values that could cause crashes
     if not title or not artist:
         return False
     
-    # Check if user owns this song (case-insensitive)
-    existing_song = db.query(Song).filter(
-        Song.title.ilike(title),
-        Song.artist.ilike(artist)
+    fingerprint = song_fingerprint(title, artist)
+    
+    # Check if user owns this song
+    owned = db.query(Song.id).filter(
+        Song.fingerprint == fingerprint,
+        Song.user_id == current_user.id
     ).first()
+    if owned:
+        return True
     
-    if existing_song:
-        # Check if user owns this song
-        if existing_song.user_id == current_user.id:
-            return True
-        
-        # Check if user is a collaborator on this song
-        collaboration = db.query(Collaboration).filter(
-            Collaboration.song_id == existing_song.id,
-            Collaboration.user_id == current_user.id,
-            Collaboration.collaboration_type == CollaborationType.SONG_EDIT
-        ).first()
-        
-        if collaboration:
-            return True
+    # Check if user is a collaborator on this song
+    collaboration = db.query(Collaboration.id).join(
+        Song, Collaboration.song_id == Song.id
+    ).filter(
+        Song.fingerprint == fingerprint,
+        Collaboration.user_id == current_user.id,
+        Collaboration.collaboration_type == CollaborationType.SONG_EDIT
+    ).first()
     
-    return False
+    return collaboration is not None
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from database import get_db
+from models import BackgroundJob, BackgroundJobStatus
+from schemas import BackgroundJobOut
+from api.auth import get_current_active_user
+from typing import List, Optional
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+@router.get("", response_model=List[BackgroundJobOut])
+def get_my_jobs(
+    status: Optional[BackgroundJobStatus] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """Recent background jobs queued for the current user, newest first."""
+    query = db.query(BackgroundJob).filter(BackgroundJob.user_id == current_user.id)
+    if status is not None:
+        query = query.filter(BackgroundJob.status == status.value)
+    return query.order_by(BackgroundJob.id.desc()).limit(limit).all()
+
+@router.get("/{job_id}", response_model=BackgroundJobOut)
+def get_job_status(job_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_active_user)):
+    """Status of one of the current user's background jobs."""
+    job = db.query(BackgroundJob).filter(
+        BackgroundJob.id == job_id,
+        BackgroundJob.user_id == current_user.id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
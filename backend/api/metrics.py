@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from models import User
+from utils.metrics import registry
+from .admin import require_admin
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(current_user: User = Depends(require_admin)):
+    """
+    Prometheus text exposition of request latency, DB pool and cache metrics.
+    Admin only.
+    """
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,160 @@
+"""
+Counter-backed notification counts.
+
+Each user's unread/total counts live in ``notification_counters`` so the badge
+poll is a primary-key lookup (and usually a cache hit) instead of two
+``COUNT(*)`` queries. Rows are seeded from the notifications table on first
+read. ORM inserts, deletes and read-state changes adjust them through mapper
+events in the same transaction; bulk statements adjust them explicitly via
+this repository. ``reconcile`` repairs any drift.
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import case, event, func, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+
+from models import Notification, NotificationCounter
+from utils.cache import cache, invalidate_after_commit
+
+NOTIFICATION_COUNTS_TTL = 60  # seconds; counters are invalidated on change, the TTL bounds races
+NOTIFICATION_COUNTS_TAG = "notification_counts"
+
+
+def notification_counts_key(user_id: int) -> str:
+    return f"notification_counts:{user_id}"
+
+
+_ADJUST_SQL = text("""
+    UPDATE notification_counters
+    SET unread_count = CASE WHEN unread_count + :unread < 0 THEN 0 ELSE unread_count + :unread END,
+        total_count = CASE WHEN total_count + :total < 0 THEN 0 ELSE total_count + :total END,
+        updated_at = :now
+    WHERE user_id = :user_id
+""")
+
+
+def adjust_counter(session: Optional[Session], connection, user_id: int, unread: int = 0, total: int = 0) -> None:
+    """
+    Apply a delta to a user's counter row (if it has been seeded) and drop the
+    cached counts once ``session`` commits. Unseeded users are counted from
+    scratch on their next read.
+    """
+    if unread or total:
+        connection.execute(_ADJUST_SQL, {
+            "unread": unread, "total": total, "now": datetime.utcnow(), "user_id": user_id
+        })
+    invalidate_after_commit(session, keys=[notification_counts_key(user_id)])
+
+
+class NotificationCounterRepository:
+    """Repository for per-user notification counters"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_counts(self, user_id: int) -> Tuple[int, int]:
+        """Unread and total notification counts for a user"""
+        key = notification_counts_key(user_id)
+        counts = cache.get(key)
+        if counts is not None:
+            return counts
+
+        counter = self.db.get(NotificationCounter, user_id)
+        if counter is None:
+            counter = self._seed(user_id)
+        counts = (counter.unread_count, counter.total_count)
+        cache.set(key, counts, ttl=NOTIFICATION_COUNTS_TTL, tags=[NOTIFICATION_COUNTS_TAG])
+        return counts
+
+    def _seed(self, user_id: int) -> NotificationCounter:
+        unread_count, total_count = self.count_notifications(user_id)
+        counter = NotificationCounter(user_id=user_id, unread_count=unread_count, total_count=total_count)
+        self.db.add(counter)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Another request seeded it first
+            self.db.rollback()
+            counter = self.db.get(NotificationCounter, user_id)
+        return counter
+
+    def count_notifications(self, user_id: int) -> Tuple[int, int]:
+        """Count a user's notifications directly (the source of truth)"""
+        unread_count, total_count = self.db.query(
+            func.coalesce(func.sum(case((Notification.is_read == False, 1), else_=0)), 0),
+            func.count(Notification.id),
+        ).filter(Notification.user_id == user_id).one()
+        return int(unread_count), int(total_count)
+
+    def add_to_users(self, user_ids_query, unread: int, total: int) -> None:
+        """Apply the same delta to every seeded user in ``user_ids_query`` (a select of user ids)"""
+        self.db.query(NotificationCounter).filter(
+            NotificationCounter.user_id.in_(user_ids_query)
+        ).update({
+            NotificationCounter.unread_count: NotificationCounter.unread_count + unread,
+            NotificationCounter.total_count: NotificationCounter.total_count + total,
+            NotificationCounter.updated_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        # Broadcasts touch many users; dropping every cached count is cheaper than listing them
+        invalidate_after_commit(self.db, tags=[NOTIFICATION_COUNTS_TAG])
+
+    def mark_all_read(self, user_id: int) -> None:
+        """Zero a user's unread counter after a bulk mark-as-read"""
+        self.db.query(NotificationCounter).filter(
+            NotificationCounter.user_id == user_id
+        ).update({
+            NotificationCounter.unread_count: 0,
+            NotificationCounter.updated_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        invalidate_after_commit(self.db, keys=[notification_counts_key(user_id)])
+
+    def reconcile(self, user_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recount seeded counters from the notifications table and fix any that
+        drifted. Returns the number of counters corrected.
+        """
+        counters_query = self.db.query(NotificationCounter)
+        actual_query = self.db.query(
+            Notification.user_id,
+            func.sum(case((Notification.is_read == False, 1), else_=0)),
+            func.count(Notification.id),
+        )
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            counters_query = counters_query.filter(NotificationCounter.user_id.in_(user_ids))
+            actual_query = actual_query.filter(Notification.user_id.in_(user_ids))
+        actual = {
+            user_id: (int(unread or 0), int(total))
+            for user_id, unread, total in actual_query.group_by(Notification.user_id).all()
+        }
+
+        fixed = 0
+        for counter in counters_query.all():
+            expected = actual.get(counter.user_id, (0, 0))
+            if (counter.unread_count, counter.total_count) != expected:
+                counter.unread_count, counter.total_count = expected
+                counter.updated_at = datetime.utcnow()
+                invalidate_after_commit(self.db, keys=[notification_counts_key(counter.user_id)])
+                fixed += 1
+        self.db.commit()
+        return fixed
+
+
+@event.listens_for(Notification, "after_insert")
+def _notification_inserted(mapper, connection, target):
+    adjust_counter(object_session(target), connection, target.user_id, unread=0 if target.is_read else 1, total=1)
+
+
+@event.listens_for(Notification, "after_delete")
+def _notification_deleted(mapper, connection, target):
+    adjust_counter(object_session(target), connection, target.user_id, unread=0 if target.is_read else -1, total=-1)
+
+
+@event.listens_for(Notification, "after_update")
+def _notification_updated(mapper, connection, target):
+    # Bulk query.update() callers adjust the counters themselves
+    if inspect(target).attrs.is_read.history.has_changes():
+        adjust_counter(object_session(target), connection, target.user_id, unread=-1 if target.is_read else 1)
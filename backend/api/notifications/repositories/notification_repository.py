@@ -1,14 +1,16 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, desc, func
+from sqlalchemy import and_, desc, func, insert, literal, select, Boolean, DateTime, String, Text
 from models import Notification, User, Achievement, FeatureRequest, FeatureRequestComment
 from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
+from .notification_counter_repository import NotificationCounterRepository
 
 class NotificationRepository:
     """Repository for notification data access operations"""
     
     def __init__(self, db: Session):
         self.db = db
+        self.counters = NotificationCounterRepository(db)
     
     def create_notification(
         self, 
@@ -37,6 +39,52 @@ class NotificationRepository:
         self.db.refresh(notification)
         return notification
     
+    def create_notifications_for_active_users(
+        self,
+        type: str,
+        title: str,
+        message: str,
+        exclude_user_ids: Optional[List[int]] = None,
+        related_song_id: Optional[int] = None,
+    ) -> int:
+        """
+        Create the same notification for every active user with a single
+        INSERT ... SELECT. Returns the number of notifications created.
+        """
+        now = datetime.utcnow()
+        recipient_ids = select(User.id).where(User.is_active == True)
+        if exclude_user_ids:
+            recipient_ids = recipient_ids.where(User.id.notin_(exclude_user_ids))
+        recipients = select(
+            User.id,
+            literal(type, String),
+            literal(title, String),
+            literal(message, Text),
+            literal(False, Boolean),
+            literal(related_song_id),
+            literal(now, DateTime),
+        ).where(User.is_active == True)
+        if exclude_user_ids:
+            recipients = recipients.where(User.id.notin_(exclude_user_ids))
+        
+        result = self.db.execute(
+            insert(Notification).from_select(
+                ["user_id", "type", "title", "message", "is_read", "related_song_id", "created_at"],
+                recipients,
+            )
+        )
+        # Bulk inserts skip the mapper events, so bump the counters in the same transaction
+        self.counters.add_to_users(recipient_ids, unread=1, total=1)
+        self.db.commit()
+        return result.rowcount
+    
+    def count_active_users(self, exclude_user_ids: Optional[List[int]] = None) -> int:
+        """Number of active users a broadcast targets"""
+        query = self.db.query(func.count(User.id)).filter(User.is_active == True)
+        if exclude_user_ids:
+            query = query.filter(User.id.notin_(exclude_user_ids))
+        return query.scalar()
+    
     def get_user_notifications(
         self, 
         user_id: int, 
@@ -88,38 +136,25 @@ class NotificationRepository:
     
     def mark_all_read(self, user_id: int) -> int:
         """Mark all unread notifications as read for a user"""
-        unread_notifications = self.db.query(Notification).filter(
+        count = self.db.query(Notification).filter(
             and_(
                 Notification.user_id == user_id,
                 Notification.is_read == False
             )
-        ).all()
+        ).update({
+            Notification.is_read: True,
+            Notification.read_at: datetime.utcnow(),
+        }, synchronize_session="fetch")
         
-        count = 0
-        for notification in unread_notifications:
-            notification.is_read = True
-            notification.read_at = datetime.utcnow()
-            count += 1
-            
         if count > 0:
+            self.counters.mark_all_read(user_id)
             self.db.commit()
         
         return count
     
     def get_notification_counts(self, user_id: int) -> Tuple[int, int]:
-        """Get unread and total notification counts for a user"""
-        unread_count = self.db.query(Notification).filter(
-            and_(
-                Notification.user_id == user_id,
-                Notification.is_read == False
-            )
-        ).count()
-        
-        total_count = self.db.query(Notification).filter(
-            Notification.user_id == user_id
-        ).count()
-        
-        return unread_count, total_count
+        """Get unread and total notification counts for a user (served from the counter)"""
+        return self.counters.get_counts(user_id)
     
     def delete_notification(self, notification_id: int, user_id: int) -> bool:
         """Delete a notification (if it belongs to the user)"""
@@ -133,13 +168,19 @@ class NotificationRepository:
     def cleanup_old_notifications(self, days_old: int = 30) -> int:
         """Clean up old read notifications (for maintenance)"""
         cutoff_date = datetime.utcnow() - timedelta(days=days_old)
+        criteria = and_(
+            Notification.is_read == True,
+            Notification.created_at < cutoff_date
+        )
         
-        deleted = self.db.query(Notification).filter(
-            and_(
-                Notification.is_read == True,
-                Notification.created_at < cutoff_date
-            )
-        ).delete()
+        # Bulk deletes skip the mapper events; remember whose counters to recount
+        user_ids = [
+            user_id for (user_id,) in
+            self.db.query(Notification.user_id).filter(criteria).distinct().all()
+        ]
+        deleted = self.db.query(Notification).filter(criteria).delete()
         
         self.db.commit()
-        return deleted
\ No newline at end of file
+        if deleted:
+            self.counters.reconcile(user_ids)
+        return deleted
@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from database import get_db
-from auth import get_current_user
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from database import get_db, SessionLocal
+from auth import get_current_user, verify_token
 from models import User
 from ..services.notification_service import NotificationService
+from ..services.notification_stream import (
+    NOTIFICATION_STREAM_TICKET_TTL,
+    StreamLimitReached,
+    create_stream_ticket,
+    notification_event_stream,
+    notification_hub,
+    redeem_stream_ticket,
+)
 from ..validators.notification_validators import (
     NotificationListOut, 
     NotificationCountOut, 
@@ -39,13 +51,25 @@ def get_notifications(
 
 @router.get("/count", response_model=NotificationCountOut)
 def get_notification_count(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get notification count for the current user"""
+    """
+    Get notification count for the current user.
+
+    Polled by the badge, so it is served from the per-user counter and tagged
+    with a weak ETag; clients sending it back in If-None-Match get a 304.
+    """
     try:
         service = NotificationService(db)
         result = service.get_notification_counts(current_user.id)
+        etag = f'W/"{current_user.id}-{result.unread_count}-{result.total_count}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
         return result
     except Exception as e:
         print(f"❌ Error getting notification count for user {current_user.id}: {e}")
@@ -53,6 +77,72 @@ def get_notification_count(
         traceback.print_exc()
         raise
 
+@router.post("/stream-ticket", response_model=dict)
+def create_notification_stream_ticket(current_user: User = Depends(get_current_user)):
+    """
+    Short-lived, single-use ticket for opening ``/stream``. EventSource cannot
+    send headers, and the session token must not appear in URLs (access logs).
+    """
+    return {"ticket": create_stream_ticket(current_user.id), "expires_in": NOTIFICATION_STREAM_TICKET_TTL}
+
+def _authenticate_stream(request: Request, ticket: Optional[str]) -> User:
+    """
+    Resolve the streaming user from the Authorization header or a stream
+    ``?ticket=``. Uses its own short-lived session so a long-lived stream
+    doesn't hold a pooled connection.
+    """
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        payload = verify_token(authorization[7:])
+        user_filter = User.username == payload.get("sub") if payload else None
+    else:
+        user_id = redeem_stream_ticket(ticket) if ticket else None
+        user_filter = User.id == user_id if user_id is not None else None
+    if user_filter is None:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    
+    with SessionLocal() as db:
+        user = db.query(User).filter(user_filter).first()
+    if user is None:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    return user
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    ticket: Optional[str] = Query(default=None),
+    last_event_id: Optional[int] = Query(default=None),
+):
+    """
+    Server-Sent Events stream of new notifications and unread counts for the
+    current user. Reconnects replay what was missed via ``Last-Event-ID`` (or
+    ``?last_event_id=`` when reconnecting with a fresh ticket).
+    """
+    user = await run_in_threadpool(_authenticate_stream, request, ticket)
+    
+    header_event_id = request.headers.get("last-event-id")
+    if header_event_id and header_event_id.isdigit():
+        last_event_id = int(header_event_id)
+    
+    try:
+        subscription = notification_hub.subscribe(user.id)
+    except StreamLimitReached as e:
+        print(f"⚠️ Refusing notification stream for user {user.id}: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Too many open notification streams, fall back to polling",
+            headers={"Retry-After": "30"},
+        )
+    
+    return StreamingResponse(
+        notification_event_stream(subscription, last_event_id),
+        media_type="text/event-stream",
+        # An explicit Content-Encoding keeps GZipMiddleware from buffering the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
+        # Also unsubscribe if the client leaves before the stream starts
+        background=BackgroundTask(notification_hub.unsubscribe, subscription),
+    )
+
 @router.put("/{notification_id}/read", response_model=dict)
 def mark_notification_read(
     notification_id: int,
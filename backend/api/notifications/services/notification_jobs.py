@@ -0,0 +1,32 @@
+"""
+Background jobs for notifications (see services/job_queue.py).
+"""
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from services.job_queue import job_handler
+from ..repositories.notification_counter_repository import NotificationCounterRepository
+from ..repositories.notification_repository import NotificationRepository
+from .notification_stream import notification_hub
+
+BROADCAST_NOTIFICATION_JOB = "broadcast_notification"
+RECONCILE_NOTIFICATION_COUNTERS_JOB = "reconcile_notification_counters"
+
+
+@job_handler(BROADCAST_NOTIFICATION_JOB)
+def run_broadcast_notification(db: Session, user_id: Optional[int], payload: Dict[str, Any]):
+    """Bulk-insert a notification for every active user."""
+    sent_count = NotificationRepository(db).create_notifications_for_active_users(**payload)
+    # Reaches streams in this process only; under the external worker, web
+    # processes see the new counts on their next stream heartbeat
+    notification_hub.publish_all("changed", exclude_user_ids=payload.get("exclude_user_ids"))
+    print(f"📢 Broadcast '{payload['title']}' sent to {sent_count} users")
+
+
+@job_handler(RECONCILE_NOTIFICATION_COUNTERS_JOB)
+def run_reconcile_notification_counters(db: Session, user_id: Optional[int], payload: Dict[str, Any]):
+    """Recount notification counters (all of them, or ``payload["user_ids"]``) and fix drift."""
+    fixed = NotificationCounterRepository(db).reconcile(payload.get("user_ids"))
+    print(f"🔢 Reconciled notification counters, {fixed} corrected")
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional, Set
 
 from ..repositories.notification_repository import NotificationRepository
+from .notification_stream import notification_hub
 from ..validators.notification_validators import (
     NotificationOut,
     NotificationCountOut,
@@ -36,7 +37,7 @@ class NotificationService:
             related_achievement_id=achievement_id
         )
         
-        return self._format_notification_out(notification)
+        return self._publish_created(notification)
     
     def create_comment_reply_notification(
         self, 
@@ -59,7 +60,7 @@ class NotificationService:
             related_comment_id=comment_id
         )
         
-        return self._format_notification_out(notification)
+        return self._publish_created(notification)
     
     def create_feature_request_update_notification(
         self, 
@@ -92,7 +93,7 @@ class NotificationService:
             related_feature_request_id=feature_request_id
         )
         
-        return self._format_notification_out(notification)
+        return self._publish_created(notification)
     
     def create_welcome_notification(self, user_id: int) -> NotificationOut:
         """Create a welcome notification for new users"""
@@ -109,7 +110,7 @@ class NotificationService:
             message="Click Help in the navigation bar to learn about features and get started. Start creating by clicking 'Add Song' to begin your first track!"
         )
         
-        return self._format_notification_out(notification)
+        return self._publish_created(notification)
     
     def create_general_notification(
         self,
@@ -130,7 +131,7 @@ class NotificationService:
             related_song_id=related_song_id,
         )
         
-        return self._format_notification_out(notification)
+        return self._publish_created(notification)
     
     def create_potential_collaboration_notification(
         self,
@@ -159,7 +160,26 @@ class NotificationService:
             related_song_id=related_song_id,
         )
         
-        return self._format_notification_out(notification)
+        return self._publish_created(notification)
+    
+    def create_collaboration_request_notification(
+        self,
+        user_id: int,
+        notification_type: str,
+        title: str,
+        message: str,
+        related_song_id: Optional[int] = None,
+    ) -> NotificationOut:
+        """Create a notification about a collaboration request or its response"""
+        notification = self.repository.create_notification(
+            user_id=user_id,
+            type=notification_type,
+            title=title,
+            message=message,
+            related_song_id=related_song_id,
+        )
+        
+        return self._publish_created(notification)
     
     def create_pack_release_notification(
         self, 
@@ -178,45 +198,64 @@ class NotificationService:
             message=message
         )
         
-        return self._format_notification_out(notification)
+        return self._publish_created(notification)
     
-    def broadcast_pack_release_notification(self, pack_name: str, pack_owner_username: str) -> dict:
-        """Send pack release notifications to all active users"""
-        from models import User
-        
-        # Get all active users except the pack owner
-        users = self.db.query(User).filter(
-            User.is_active == True,
-            User.username != pack_owner_username
-        ).all()
-        
-        if not users:
-            return {"message": "No active users found", "sent_count": 0}
-        
-        sent_count = 0
-        errors = []
+    def broadcast_notification(
+        self,
+        type: str,
+        title: str,
+        message: str,
+        exclude_user_ids: Optional[List[int]] = None,
+        related_song_id: Optional[int] = None,
+        background: bool = False,
+        requested_by: Optional[int] = None,
+    ) -> dict:
+        """
+        Send the same notification to all active users in one bulk insert.
         
-        for user in users:
-            try:
-                self.create_pack_release_notification(
-                    user_id=user.id,
-                    pack_name=pack_name,
-                    pack_owner_username=pack_owner_username
-                )
-                sent_count += 1
-            except Exception as e:
-                errors.append(f"Failed to send to {user.username}: {str(e)}")
+        With background=True the insert is queued as a job and this returns
+        immediately with its ``job_id`` (visible to ``requested_by`` at /jobs).
+        """
+        type = type.value if isinstance(type, NotificationType) else type
+        payload = {
+            "type": type,
+            "title": title,
+            "message": message,
+            "exclude_user_ids": exclude_user_ids or [],
+            "related_song_id": related_song_id,
+        }
         
-        result = {
-            "message": f"Pack release notifications sent to {sent_count} users",
+        if background:
+            from services.job_queue import enqueue_job
+            from .notification_jobs import BROADCAST_NOTIFICATION_JOB
+            
+            job = enqueue_job(self.db, BROADCAST_NOTIFICATION_JOB, requested_by, payload)
+            self.db.commit()
+            return {"message": "Broadcast notification queued", "sent_count": 0, "job_id": job.id}
+        
+        total_users = self.repository.count_active_users(payload["exclude_user_ids"])
+        sent_count = self.repository.create_notifications_for_active_users(**payload)
+        notification_hub.publish_all("changed", exclude_user_ids=payload["exclude_user_ids"])
+        return {
+            "message": f"Notification sent to {sent_count} users",
             "sent_count": sent_count,
-            "total_users": len(users)
+            "total_users": total_users
         }
+    
+    def broadcast_pack_release_notification(self, pack_name: str, pack_owner_username: str,
+                                            background: bool = False) -> dict:
+        """Send pack release notifications to all active users except the pack owner"""
+        from models import User
         
-        if errors:
-            result["errors"] = errors[:10]  # Limit to first 10 errors
-        
-        return result
+        owner = self.db.query(User.id).filter(User.username == pack_owner_username).first()
+        return self.broadcast_notification(
+            type=NotificationType.PACK_RELEASE,
+            title=f"🎵 New Pack Released!",
+            message=f"{pack_owner_username} just released '{pack_name}' - Check out the latest releases!",
+            exclude_user_ids=[owner.id] if owner else None,
+            background=background,
+            requested_by=owner.id if owner else None,
+        )
     
     def get_user_notifications(
         self, 
@@ -250,13 +289,17 @@ class NotificationService:
     
     def mark_notification_read(self, notification_id: int, user_id: int) -> bool:
         """Mark a specific notification as read"""
-        return self.repository.mark_notification_read(notification_id, user_id)
+        marked = self.repository.mark_notification_read(notification_id, user_id)
+        if marked:
+            notification_hub.publish(user_id, "changed")
+        return marked
     
     def mark_all_notifications_read(self, user_id: int) -> NotificationMarkAllReadResponse:
         """Mark all notifications as read for a user"""
         marked_count = self.repository.mark_all_read(user_id)
         
         if marked_count > 0:
+            notification_hub.publish(user_id, "changed")
             message = f"Marked {marked_count} notification{'s' if marked_count != 1 else ''} as read"
         else:
             message = "No unread notifications to mark"
@@ -265,7 +308,10 @@ class NotificationService:
     
     def delete_notification(self, notification_id: int, user_id: int) -> bool:
         """Delete a notification"""
-        return self.repository.delete_notification(notification_id, user_id)
+        deleted = self.repository.delete_notification(notification_id, user_id)
+        if deleted:
+            notification_hub.publish(user_id, "changed")
+        return deleted
 
     def notify_potential_collaborations(
         self,
@@ -283,7 +329,7 @@ class NotificationService:
         Returns the number of notifications sent.
         """
         from models import Song, User
-        from sqlalchemy import func, or_
+        from utils.normalization import song_fingerprint
         
         # Find public songs with matching title+artist by OTHER users
         # Only consider WIP and Future Plans (not Released - those are done)
@@ -291,8 +337,7 @@ class NotificationService:
             self.db.query(Song, User)
             .join(User, Song.user_id == User.id)
             .filter(
-                func.lower(func.trim(Song.title)) == func.lower(song_title.strip()),
-                func.lower(func.trim(Song.artist)) == func.lower(song_artist.strip()),
+                Song.fingerprint == song_fingerprint(song_title, song_artist),
                 Song.user_id != actor_user_id,  # Not the actor
                 Song.is_public == True,  # Only public songs
                 Song.status.in_(["In Progress", "Future Plans"])  # Only WIP/Future
@@ -384,13 +429,14 @@ class NotificationService:
         created_count = 0
         for target_user_id in collaborator_ids:
             try:
-                self.repository.create_notification(
+                notification = self.repository.create_notification(
                     user_id=target_user_id,
                     type=notification_type,
                     title=title,
                     message=message,
                     related_song_id=song_id,
                 )
+                self._publish_created(notification)
                 created_count += 1
             except Exception as e:
                 # Don't let a single failure break others; just log
@@ -401,6 +447,14 @@ class NotificationService:
 
         return created_count
 
+    def _publish_created(self, notification) -> NotificationOut:
+        """Format a just-committed notification and push it to the user's open streams"""
+        notification_out = self._format_notification_out(notification)
+        notification_hub.publish(
+            notification.user_id, "notification", notification_out.model_dump(mode="json"), notification.id
+        )
+        return notification_out
+
     def _format_notification_out(self, notification) -> NotificationOut:
         """Convert notification model to output format with related data"""
         notification_dict = {
@@ -0,0 +1,277 @@
+"""
+Server-Sent Events push for notifications.
+
+``NotificationService`` publishes to the in-process ``notification_hub`` after
+it commits a change; every open ``/notifications/stream`` connection for that
+user receives the new notification and a fresh unread/total count, so clients
+no longer poll.
+
+Events on the wire:
+    notification - a new notification (``id:`` is the notification id)
+    count        - {"unread_count", "total_count"}
+Idle connections get a ``: keepalive`` comment every
+``NOTIFICATION_STREAM_HEARTBEAT`` seconds, which also re-reads the counter row
+(bypassing the counts cache) so changes made by other processes show up.
+
+The hub only reaches streams held by the publishing process. Broadcasts run by
+the external job worker (``notification_jobs``) publish to the worker's own,
+subscriber-less hub, so web processes pick those up on the next heartbeat.
+
+EventSource cannot send an Authorization header, and a session JWT in the URL
+would end up in access logs. Clients instead exchange their session for a
+stream ticket (``create_stream_ticket``): a signed token that is only good for
+opening one stream, expires after ``NOTIFICATION_STREAM_TICKET_TTL`` seconds,
+is not accepted as a session token, and is single-use within a process.
+
+Reconnecting clients send ``Last-Event-ID`` and the notifications they missed
+are replayed from the table. A client that falls too far behind is
+disconnected and catches up the same way.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+NOTIFICATION_STREAM_MAX_CONNECTIONS = int(os.getenv("NOTIFICATION_STREAM_MAX_CONNECTIONS", "500"))  # per process
+NOTIFICATION_STREAM_HEARTBEAT = 15  # seconds
+NOTIFICATION_STREAM_QUEUE_SIZE = 100  # undelivered events per connection before it is dropped
+NOTIFICATION_STREAM_REPLAY_LIMIT = 50
+NOTIFICATION_STREAM_RETRY_MS = 5000  # reconnect delay suggested to EventSource
+NOTIFICATION_STREAM_TICKET_TTL = 60  # seconds a stream ticket can be redeemed for
+NOTIFICATION_STREAM_TICKET_SCOPE = "notification_stream"
+
+# (event name, data, event id)
+StreamEvent = Tuple[str, Any, Optional[int]]
+
+
+class StreamLimitReached(Exception):
+    """This process already holds NOTIFICATION_STREAM_MAX_CONNECTIONS streams."""
+
+
+class NotificationSubscription:
+    """One open stream: a bounded queue fed from any thread, read on the event loop."""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[StreamEvent]" = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+        self._loop = loop
+
+    def deliver(self, event: StreamEvent):
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # Event loop already closed
+
+    def _put(self, event: StreamEvent):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class NotificationHub:
+    """In-process pub/sub of notification events, keyed by user."""
+
+    def __init__(
+        self,
+        max_connections: int = NOTIFICATION_STREAM_MAX_CONNECTIONS,
+        queue_size: int = NOTIFICATION_STREAM_QUEUE_SIZE,
+    ):
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[NotificationSubscription]] = {}
+        self._connections = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> NotificationSubscription:
+        """Open a subscription (call from the event loop); raises StreamLimitReached when full."""
+        subscription = NotificationSubscription(user_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            if self._connections >= self.max_connections:
+                raise StreamLimitReached(f"{self._connections} notification streams already open")
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            self._connections += 1
+        return subscription
+
+    def unsubscribe(self, subscription: NotificationSubscription):
+        """Close a subscription; safe to call more than once."""
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if not subscriptions or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            self._connections -= 1
+            if not subscriptions:
+                del self._subscribers[subscription.user_id]
+
+    def connection_count(self) -> int:
+        return self._connections
+
+    def publish(self, user_id: int, event: str, data: Any = None, event_id: Optional[int] = None):
+        """Send an event to every stream the user has open in this process."""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver((event, data, event_id))
+
+    def publish_all(self, event: str, data: Any = None, exclude_user_ids: Optional[Iterable[int]] = None):
+        """Send an event to every connected user (e.g. after a broadcast)."""
+        excluded = set(exclude_user_ids or ())
+        with self._lock:
+            subscriptions = [
+                subscription
+                for user_id, user_subscriptions in self._subscribers.items()
+                if user_id not in excluded
+                for subscription in user_subscriptions
+            ]
+        for subscription in subscriptions:
+            subscription.deliver((event, data, None))
+
+
+notification_hub = NotificationHub()
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """Encode one Server-Sent Event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def create_stream_ticket(user_id: int) -> str:
+    """Short-lived, single-use ticket that opens one notification stream for the user."""
+    from jose import jwt
+    from auth import ALGORITHM, SECRET_KEY
+
+    # No "sub" claim, so verify_token() never accepts a ticket as a session
+    return jwt.encode({
+        "scope": NOTIFICATION_STREAM_TICKET_SCOPE,
+        "uid": user_id,
+        "jti": uuid.uuid4().hex,
+        "exp": datetime.utcnow() + timedelta(seconds=NOTIFICATION_STREAM_TICKET_TTL),
+    }, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def redeem_stream_ticket(ticket: str) -> Optional[int]:
+    """The ticket's user id, or None if it is invalid, expired or already used."""
+    from jose import JWTError, jwt
+    from auth import ALGORITHM, SECRET_KEY
+
+    try:
+        payload = jwt.decode(ticket, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    jti = payload.get("jti")
+    if payload.get("scope") != NOTIFICATION_STREAM_TICKET_SCOPE or not jti:
+        return None
+    now = time.time()
+    with _redeemed_lock:
+        for used, expires_at in list(_redeemed_tickets.items()):
+            if expires_at < now:
+                del _redeemed_tickets[used]
+        if jti in _redeemed_tickets:
+            return None
+        _redeemed_tickets[jti] = now + NOTIFICATION_STREAM_TICKET_TTL
+    return payload.get("uid")
+
+
+# jti -> when it can be forgotten (the ticket has expired by then)
+_redeemed_tickets: Dict[str, float] = {}
+_redeemed_lock = threading.Lock()
+
+
+def _session_factory(session_factory: Optional[Callable] = None) -> Callable:
+    if session_factory is None:
+        from database import SessionLocal
+        return SessionLocal
+    return session_factory
+
+
+def _load_counts(user_id: int, session_factory: Optional[Callable] = None) -> Dict[str, int]:
+    """Read the user's counter row directly; the cached counts can lag other processes."""
+    from models import NotificationCounter
+    from ..repositories.notification_counter_repository import NotificationCounterRepository
+
+    with _session_factory(session_factory)() as db:
+        counter = db.get(NotificationCounter, user_id, populate_existing=True)
+        if counter is None:
+            unread_count, total_count = NotificationCounterRepository(db).get_counts(user_id)
+        else:
+            unread_count, total_count = counter.unread_count, counter.total_count
+    return {"unread_count": unread_count, "total_count": total_count}
+
+
+def _load_initial_state(
+    user_id: int, last_event_id: Optional[int], session_factory: Optional[Callable] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, int], Optional[int]]:
+    """Missed notifications (oldest first), current counts and the user's latest notification id."""
+    from sqlalchemy import func
+    from models import Notification
+    from .notification_service import NotificationService
+
+    with _session_factory(session_factory)() as db:
+        replay = []
+        if last_event_id is not None:
+            missed = db.query(Notification).filter(
+                Notification.user_id == user_id,
+                Notification.id > last_event_id,
+            ).order_by(Notification.id.desc()).limit(NOTIFICATION_STREAM_REPLAY_LIMIT).all()
+            service = NotificationService(db)
+            replay = [
+                service._format_notification_out(notification).model_dump(mode="json")
+                for notification in reversed(missed)
+            ]
+        latest_id = db.query(func.max(Notification.id)).filter(Notification.user_id == user_id).scalar()
+    return replay, _load_counts(user_id, session_factory), latest_id
+
+
+async def notification_event_stream(
+    subscription: NotificationSubscription,
+    last_event_id: Optional[int] = None,
+    hub: NotificationHub = notification_hub,
+    session_factory: Optional[Callable] = None,
+    heartbeat: float = NOTIFICATION_STREAM_HEARTBEAT,
+):
+    """Yield the SSE body for one subscription until the client goes away."""
+    user_id = subscription.user_id
+    try:
+        yield f"retry: {NOTIFICATION_STREAM_RETRY_MS}\n\n"
+
+        replay, counts, latest_id = await run_in_threadpool(
+            _load_initial_state, user_id, last_event_id, session_factory
+        )
+        for notification in replay:
+            yield format_sse("notification", notification, notification["id"])
+        # A first connection gets the latest id, so its reconnects replay from here
+        yield format_sse("count", counts, latest_id if last_event_id is None else None)
+
+        while True:
+            try:
+                event, data, event_id = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                event = None
+            if subscription.overflowed:
+                break
+
+            if event == "notification":
+                yield format_sse(event, data, event_id)
+            if event is None or subscription.queue.empty():
+                new_counts = await run_in_threadpool(_load_counts, user_id, session_factory)
+                if new_counts != counts:
+                    counts = new_counts
+                    yield format_sse("count", counts)
+                elif event is None:
+                    yield ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(subscription)
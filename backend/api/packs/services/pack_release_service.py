@@ -5,7 +5,7 @@ from datetime import datetime
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
-from models import Song, Pack, AlbumSeries, Collaboration, CollaborationType
+from models import Song, SongStatus, Pack, AlbumSeries, Collaboration, CollaborationType
 from ..repositories.pack_repository import PackRepository
 from ..schemas import PackReleaseData, PackResponse
 from api.songs.repositories.collaboration_repository import CollaborationRepository
@@ -113,12 +113,8 @@ class PackReleaseService:
         
         self.pack_repo.commit()
         
-        # Check pack achievements
-        try:
-            from api.achievements import check_pack_achievements
-            check_pack_achievements(self.db, user_id, pack_id)
-        except Exception as e:
-            print(f"Failed to check pack achievements: {e}")
+        # Check the achievements the release can unlock
+        self._check_release_achievements(pack_id)
         
         # Log activity
         try:
@@ -147,6 +143,22 @@ class PackReleaseService:
             show_on_homepage=pack.show_on_homepage
         )
     
+    def _check_release_achievements(self, pack_id: int):
+        """Record a pack release for every user with released songs in the pack."""
+        try:
+            from api.achievements import record_achievement_events
+            from api.achievements.services.achievement_events import PACK_RELEASED
+            owner_ids = [
+                owner_id for (owner_id,) in self.db.query(Song.user_id).filter(
+                    Song.pack_id == pack_id,
+                    Song.status == SongStatus.released
+                ).distinct().all()
+            ]
+            for owner_id in owner_ids:
+                record_achievement_events(self.db, owner_id, [PACK_RELEASED])
+        except Exception as e:
+            print(f"Failed to check pack achievements: {e}")
+    
     def update_pack_status(self, pack_id: int, status: str, user_id: int) -> PackResponse:
         """Update pack status and handle release logic."""
         # Get pack with ownership validation
@@ -209,12 +221,9 @@ class PackReleaseService:
         self.pack_repo.update_pack(pack, update_data)
         self.pack_repo.commit()
         
-        # Check pack achievements for status changes
-        try:
-            from api.achievements import check_pack_achievements
-            check_pack_achievements(self.db, user_id, pack_id)
-        except Exception as e:
-            print(f"Failed to check pack achievements: {e}")
+        # Check the achievements a release can unlock
+        if status == "Released":
+            self._check_release_achievements(pack_id)
         
         # Log activity
         try:
@@ -6,7 +6,8 @@ from datetime import datetime
 from database import get_db
 from models import Pack, Song, SongStatus, AlbumSeries
 from api.auth import get_current_active_user
-from api.achievements import check_pack_achievements
+from api.achievements import record_achievement_events
+from api.achievements.services.achievement_events import PACK_CREATED, PACK_RELEASED
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/packs", tags=["Packs"])
@@ -422,7 +423,7 @@ def create_pack(pack: PackCreate, db: Session = Depends(get_db), current_user =
     
     # Check achievements
     try:
-        check_pack_achievements(db, current_user.id)
+        record_achievement_events(db, current_user.id, [PACK_CREATED])
     except Exception as ach_err:
         print(f"⚠️ Failed to check achievements: {ach_err}")
     
@@ -843,21 +844,12 @@ def release_pack_with_metadata(
     
     # Now do post-commit operations that can fail without affecting the release
     
-    # Check pack achievements (after commit)
-    try:
-        check_pack_achievements(db, current_user.id)
-    except Exception as e:
-        print(f"Warning: Failed to check pack achievements: {e}")
-    
-    # Check WIP completion achievements (after commit)
-    if wip_completed_songs:
+    # Check the achievements the release can unlock for each song owner (after commit)
+    for owner_id in {song.user_id for song in wip_completed_songs} | {current_user.id}:
         try:
-            from api.achievements.services.achievements_service import AchievementsService
-            achievements_service = AchievementsService()
-            achievements_service.check_wip_completion_achievements(db, current_user.id)
-            print(f"🏆 Checked WIP completion achievements for user {current_user.id}")
+            record_achievement_events(db, owner_id, [PACK_RELEASED])
         except Exception as e:
-            print(f"Warning: Failed to check WIP completion achievements: {e}")
+            print(f"Warning: Failed to check pack achievements: {e}")
     
     # Send notifications to all users if not hidden from homepage (after commit)
     if not release_data.hide_from_homepage:
@@ -866,7 +858,8 @@ def release_pack_with_metadata(
             notification_service = NotificationService(db)
             notification_result = notification_service.broadcast_pack_release_notification(
                 pack_name=pack.name,
-                pack_owner_username=current_user.username
+                pack_owner_username=current_user.username,
+                background=True
             )
             print(f"🔔 Pack release notifications: {notification_result}")
         except Exception as e:
@@ -4,6 +4,7 @@ from database import get_db
 from models import User, Song, Pack, UserStats, Achievement, UserAchievement, SongStatus, Artist
 from schemas import PublicUserProfileOut, SongOut
 from api.auth import get_optional_user
+from services.leaderboard_index import get_leaderboard_index
 from typing import Optional, Dict, List
 from sqlalchemy import desc, func
 
@@ -50,26 +51,9 @@ def get_user_achievement_scores_batch(db: Session, user_ids: List[int]) -> Dict[
     return user_scores
 
 def get_user_leaderboard_rank(db: Session, user_id: int) -> Optional[int]:
-    """Calculate user's rank on the leaderboard"""
+    """Get user's rank on the leaderboard (None if they have no points yet)"""
     try:
-        # Get all users with their cached total points, sorted like the leaderboard
-        users_query = db.query(
-            User.id,
-            User.username,
-            func.coalesce(UserStats.total_points, 0).label('total_points')
-        ).outerjoin(
-            UserStats, User.id == UserStats.user_id
-        ).filter(User.is_active == True).all()
-        
-        # Sort by points (descending), then by username (ascending) - same logic as leaderboard
-        sorted_users = sorted(users_query, key=lambda x: (-x.total_points, x.username))
-        
-        # Find the user's rank
-        for i, user_data in enumerate(sorted_users, 1):
-            if user_data.id == user_id:
-                return i
-        
-        return None  # User not found
+        return get_leaderboard_index(db).rank(user_id)
     except Exception as e:
         print(f"Error calculating leaderboard rank for user {user_id}: {e}")
         return None
@@ -1,17 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, exists
+from sqlalchemy import and_, or_, func, exists, literal
 from database import get_db
 from models import Song, User, Artist, CollaborationRequest
 from api.auth import get_current_active_user
 from api.activity_logger import log_activity
 from api.public_profiles import get_artist_images_batch
+from utils.cache import cache, cache_key_for_public_songs
+from services.public_song_cache import (
+    PUBLIC_SONGS_CACHE_TAG, invalidate_public_catalog_caches, shared_connections_tag
+)
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Any
 from datetime import datetime
+import base64
+import binascii
+import json
 
 router = APIRouter(prefix="/public-songs", tags=["Public Songs"])
 
+PUBLIC_SONGS_COUNT_TTL = 60  # Totals are approximate between page turns
+SHARED_CONNECTIONS_TTL = 300
+
+# Keyset pagination sorts on COALESCE(field, sentinel) so NULLs have a fixed,
+# dialect-independent position and can be sought past like any other value
+_SORT_NULL_SENTINELS = {
+    'title': '',
+    'artist': '',
+    'username': '',
+    'status': '',
+    'updated_at': datetime(1970, 1, 1),
+}
+
 class PublicSongResponse(BaseModel):
     id: int
     title: str
@@ -51,12 +71,168 @@ class ArtistConnectionDetailsResponse(BaseModel):
 class TogglePublicRequest(BaseModel):
     song_id: int
 
+class PublicSongGroup(BaseModel):
+    key: Optional[str] = None  # Artist name or user id
+    label: Optional[str] = None  # Artist name or username
+    song_count: int
+
 class PaginatedPublicSongsResponse(BaseModel):
     songs: List[PublicSongResponse]
+    # When grouped, total_count/page/total_pages count groups, not songs
     total_count: int
     page: int
     per_page: int
     total_pages: int
+    # Opaque token for the next page in cursor mode (None on the last page)
+    next_cursor: Optional[str] = None
+    # Groups on this page, in order (only when group_by is set)
+    groups: Optional[List[PublicSongGroup]] = None
+
+
+def _encode_cursor(sort_by: str, direction: str, value: Any, song_id: int) -> str:
+    """Encode the (sort value, Song.id) of the last row into an opaque token."""
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps({"s": sort_by, "d": direction, "v": value, "id": song_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(token: str, sort_by: str, direction: str):
+    """Decode a cursor token, rejecting tampered tokens or ones from another sort order."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        value = payload["v"]
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        song_id = int(payload["id"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if payload.get("s") != sort_by or payload.get("d") != direction:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort order")
+    return value, song_id
+
+
+def _cached_public_songs_count(query, search: Optional[str], status: Optional[str], group_by: Optional[str] = None) -> int:
+    """Total matching public songs (or groups), cached briefly so page turns don't recount."""
+    cache_key = f"{cache_key_for_public_songs(search or '', status or '', 0, 0)}:count:{group_by or 'songs'}"
+    total_count = cache.get(cache_key)
+    if total_count is None:
+        total_count = query.order_by(None).count()
+        cache.set(cache_key, total_count, PUBLIC_SONGS_COUNT_TTL, tags=[PUBLIC_SONGS_CACHE_TAG])
+    return total_count
+
+
+def _build_public_song_responses(db: Session, rows, include_artist_images: bool) -> List[PublicSongResponse]:
+    """Convert (Song, User) rows into response objects, with artist images if requested."""
+    artist_images = {}
+    if include_artist_images:
+        artist_names = [song.artist for song, _ in rows if song.artist]
+        artist_images = get_artist_images_batch(db, artist_names)
+    
+    return [
+        PublicSongResponse(
+            id=song.id,
+            title=song.title,
+            artist=song.artist,
+            album=song.album,
+            year=song.year,
+            status=song.status,
+            album_cover=song.album_cover,
+            artist_image_url=artist_images.get(song.artist.lower()) if song.artist and include_artist_images else None,
+            user_id=song.user_id,
+            username=user.username,
+            display_name=user.display_name,
+            profile_image_url=user.profile_image_url,
+            created_at=song.created_at,
+            updated_at=song.updated_at
+        )
+        for song, user in rows
+    ]
+
+
+def _browse_grouped(
+    db: Session,
+    query,
+    group_by: str,
+    sort_field,
+    direction: str,
+    search: Optional[str],
+    status: Optional[str],
+    limit: int,
+    offset: int,
+    songs_per_group: int,
+    include_artist_images: bool,
+) -> PaginatedPublicSongsResponse:
+    """
+    Page over distinct artists or users in SQL, then load songs only for the
+    groups on the current page (at most ``songs_per_group`` each).
+    
+    Groups are ordered by their best song under the requested sort, so the
+    page order matches what grouping a flat sorted list would give.
+    """
+    if group_by == "artist":
+        group_col = Song.artist
+        group_label = Song.artist
+    else:
+        group_col = User.id
+        group_label = func.max(User.username)
+    
+    group_sort = func.min(sort_field) if direction == 'asc' else func.max(sort_field)
+    groups_query = query.with_entities(
+        group_col.label('group_key'),
+        group_label.label('group_label'),
+        func.count(Song.id).label('song_count'),
+        group_sort.label('group_sort')
+    ).group_by(group_col)
+    
+    total_count = _cached_public_songs_count(groups_query, search, status, group_by)
+    
+    order = group_sort.asc() if direction == 'asc' else group_sort.desc()
+    page_groups = groups_query.order_by(order, group_col).offset(offset).limit(limit).all()
+    
+    songs: List[PublicSongResponse] = []
+    if page_groups:
+        group_keys = [g.group_key for g in page_groups]
+        non_null_keys = [key for key in group_keys if key is not None]
+        key_filter = group_col.in_(non_null_keys)
+        if len(non_null_keys) != len(group_keys):
+            key_filter = or_(key_filter, group_col.is_(None))
+        
+        # Rank songs inside each group and keep the first songs_per_group
+        song_order = sort_field.asc() if direction == 'asc' else sort_field.desc()
+        ranked = query.filter(key_filter).with_entities(
+            Song.id.label('song_id'),
+            func.row_number().over(partition_by=group_col, order_by=(song_order, Song.id)).label('rank')
+        ).subquery()
+        
+        rows = db.query(Song, User, ranked.c.rank)\
+            .join(User, Song.user_id == User.id)\
+            .join(ranked, ranked.c.song_id == Song.id)\
+            .filter(ranked.c.rank <= songs_per_group)\
+            .all()
+        
+        group_position = {key: index for index, key in enumerate(group_keys)}
+        group_attr = (lambda song, user: song.artist) if group_by == "artist" else (lambda song, user: user.id)
+        rows.sort(key=lambda row: (group_position.get(group_attr(row[0], row[1]), len(group_keys)), row[2]))
+        songs = _build_public_song_responses(db, [(song, user) for song, user, _ in rows], include_artist_images)
+    
+    return PaginatedPublicSongsResponse(
+        songs=songs,
+        total_count=total_count,
+        page=(offset // limit) + 1,
+        per_page=limit,
+        total_pages=(total_count + limit - 1) // limit,
+        groups=[
+            PublicSongGroup(
+                key=str(g.group_key) if g.group_key is not None else None,
+                label=g.group_label,
+                song_count=g.song_count
+            )
+            for g in page_groups
+        ]
+    )
+
 
 @router.get("/browse", response_model=PaginatedPublicSongsResponse)
 def browse_public_songs(
@@ -64,277 +240,99 @@ def browse_public_songs(
     status: Optional[str] = Query(None, description="Filter by status"),
     sort_by: Optional[str] = Query("updated_at", description="Sort field (title, artist, username, status, updated_at)"),
     sort_direction: Optional[str] = Query("desc", description="Sort direction (asc, desc)"),
-    group_by: Optional[str] = Query(None, description="Group by field (artist, user)"),
-    limit: int = Query(50, ge=1, le=500, description="Number of results"),
+    group_by: Optional[str] = Query(None, description="Group by field (artist, user); limit/offset then page over groups"),
+    limit: int = Query(50, ge=1, le=500, description="Number of results (groups when grouped)"),
     offset: int = Query(0, ge=0, description="Results offset"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (replaces offset)"),
+    songs_per_group: int = Query(50, ge=1, le=500, description="Max songs returned per group when grouped"),
     include_artist_images: bool = Query(True, description="Include artist images (set to false for faster loading)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Browse all public songs with optional filtering and search"""
-    
-    if group_by == "artist":
-        # Optimized grouping - limit data loading to prevent memory issues
-        songs_query = db.query(Song, User).join(User, Song.user_id == User.id).filter(Song.is_public == True).distinct()
-        
-        # Apply filters to song query
-        if search:
-            search_term = f"%{search}%"
-            songs_query = songs_query.filter(
-                or_(
-                    Song.title.ilike(search_term),
-                    Song.artist.ilike(search_term),
-                    User.username.ilike(search_term)
-                )
-            )
-            
-        if status:
-            songs_query = songs_query.filter(Song.status == status)
-        
-        # Apply sorting - this happens BEFORE grouping and pagination
-        sort_field_map = {
-            'title': Song.title,
-            'artist': Song.artist,
-            'username': User.username,
-            'status': Song.status,
-            'updated_at': Song.updated_at
-        }
-        
-        if sort_by not in sort_field_map:
-            sort_by = 'updated_at'  # Default fallback
-        
-        sort_field = sort_field_map[sort_by]
-        
-        if sort_direction.lower() == 'asc':
-            songs_query = songs_query.order_by(sort_field.asc())
-        else:
-            songs_query = songs_query.order_by(sort_field.desc())
-        
-        # Get filtered and sorted results with reasonable limit for grouping
-        # Limit to prevent memory issues while still providing good grouping coverage
-        max_results = min(limit * 20, 1000)  # Max 1000 songs for grouping operations
-        all_results = songs_query.limit(max_results).all()
-        
-        # Get artist images for all songs in batch (only if requested)
-        artist_images = {}
-        if include_artist_images:
-            artist_names = [song.artist for song, _ in all_results if song.artist]
-            artist_images = get_artist_images_batch(db, artist_names)
-        
-        # Build response objects
-        all_songs = [
-            PublicSongResponse(
-                id=song.id,
-                title=song.title,
-                artist=song.artist,
-                album=song.album,
-                year=song.year,
-                status=song.status,
-                album_cover=song.album_cover,
-                artist_image_url=artist_images.get(song.artist.lower()) if song.artist and include_artist_images else None,
-                user_id=song.user_id,
-                username=user.username,
-                display_name=user.display_name,
-                profile_image_url=user.profile_image_url,
-                created_at=song.created_at,
-                updated_at=song.updated_at
+    """Browse all public songs with optional filtering and search.
+
+    Ungrouped results can be paged with ``offset`` or, for deep pages, by
+    passing the previous response's ``next_cursor`` as ``cursor``. Grouped
+    results page over distinct artists/users.
+    """
+    
+    # Base query for public songs. Song -> User is many-to-one, so the JOIN
+    # can't produce duplicates and no DISTINCT is needed.
+    query = db.query(Song, User).join(User, Song.user_id == User.id).filter(Song.is_public == True)
+    
+    # Apply filters
+    if search:
+        search_term = f"%{search}%"
+        query = query.filter(
+            or_(
+                Song.title.ilike(search_term),
+                Song.artist.ilike(search_term),
+                User.username.ilike(search_term)
             )
-            for song, user in all_results
-        ]
-        
-        # Apply pagination to the final sorted list
-        total_count = len(all_songs)
-        start_index = offset
-        end_index = offset + limit
-        paginated_songs = all_songs[start_index:end_index]
-        
-        # Calculate pagination info
-        page = (offset // limit) + 1
-        total_pages = (total_count + limit - 1) // limit
-        
-        return PaginatedPublicSongsResponse(
-            songs=paginated_songs,
-            total_count=total_count,
-            page=page,
-            per_page=limit,
-            total_pages=total_pages
         )
-    
-    elif group_by == "user":
-        # Optimized grouping - limit data loading to prevent memory issues
-        songs_query = db.query(Song, User).join(User, Song.user_id == User.id).filter(Song.is_public == True).distinct()
-        
-        # Apply filters to song query
-        if search:
-            search_term = f"%{search}%"
-            songs_query = songs_query.filter(
-                or_(
-                    Song.title.ilike(search_term),
-                    Song.artist.ilike(search_term),
-                    User.username.ilike(search_term)
-                )
-            )
-            
-        if status:
-            songs_query = songs_query.filter(Song.status == status)
-        
-        # Apply sorting - this happens BEFORE grouping and pagination
-        sort_field_map = {
-            'title': Song.title,
-            'artist': Song.artist,
-            'username': User.username,
-            'status': Song.status,
-            'updated_at': Song.updated_at
-        }
-        
-        if sort_by not in sort_field_map:
-            sort_by = 'updated_at'  # Default fallback
-        
-        sort_field = sort_field_map[sort_by]
-        
-        if sort_direction.lower() == 'asc':
-            songs_query = songs_query.order_by(sort_field.asc())
-        else:
-            songs_query = songs_query.order_by(sort_field.desc())
-        
-        # Get filtered and sorted results with reasonable limit for grouping
-        # Limit to prevent memory issues while still providing good grouping coverage
-        max_results = min(limit * 20, 1000)  # Max 1000 songs for grouping operations
-        all_results = songs_query.limit(max_results).all()
-        
-        # Get artist images for all songs in batch (only if requested)
-        artist_images = {}
-        if include_artist_images:
-            artist_names = [song.artist for song, _ in all_results if song.artist]
-            artist_images = get_artist_images_batch(db, artist_names)
-        
-        # Build response objects
-        all_songs = [
-            PublicSongResponse(
-                id=song.id,
-                title=song.title,
-                artist=song.artist,
-                album=song.album,
-                year=song.year,
-                status=song.status,
-                album_cover=song.album_cover,
-                artist_image_url=artist_images.get(song.artist.lower()) if song.artist and include_artist_images else None,
-                user_id=song.user_id,
-                username=user.username,
-                display_name=user.display_name,
-                profile_image_url=user.profile_image_url,
-                created_at=song.created_at,
-                updated_at=song.updated_at
-            )
-            for song, user in all_results
-        ]
-        
-        # Apply pagination to the final sorted list
-        total_count = len(all_songs)
-        start_index = offset
-        end_index = offset + limit
-        paginated_songs = all_songs[start_index:end_index]
-        
-        # Calculate pagination info
-        page = (offset // limit) + 1
-        total_pages = (total_count + limit - 1) // limit
         
-        return PaginatedPublicSongsResponse(
-            songs=paginated_songs,
-            total_count=total_count,
-            page=page,
-            per_page=limit,
-            total_pages=total_pages
+    if status:
+        query = query.filter(Song.status == status)
+    
+    sort_field_map = {
+        'title': Song.title,
+        'artist': Song.artist,
+        'username': User.username,
+        'status': Song.status,
+        'updated_at': Song.updated_at
+    }
+    
+    if sort_by not in sort_field_map:
+        sort_by = 'updated_at'  # Default fallback
+    direction = 'asc' if (sort_direction or '').lower() == 'asc' else 'desc'
+    
+    raw_sort_field = sort_field_map[sort_by]
+    sort_field = func.coalesce(
+        raw_sort_field, literal(_SORT_NULL_SENTINELS[sort_by], type_=raw_sort_field.type)
+    )
+    
+    if group_by in ("artist", "user"):
+        return _browse_grouped(
+            db, query, group_by, sort_field, direction, search, status,
+            limit, offset, songs_per_group, include_artist_images
         )
     
+    # Total count is cached per filter so page turns don't recount
+    total_count = _cached_public_songs_count(query, search, status)
+    
+    # Apply sorting with consistent secondary ordering
+    if direction == 'asc':
+        query = query.order_by(sort_field.asc(), Song.id)
     else:
-        # Optimized song-based pagination with DISTINCT
-        # Base query for public songs
-        query = db.query(Song, User).join(User, Song.user_id == User.id).filter(Song.is_public == True)
-        
-        # Add DISTINCT to prevent duplicates from JOIN
-        query = query.distinct()
-        
-        # Apply filters
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Song.title.ilike(search_term),
-                    Song.artist.ilike(search_term),
-                    User.username.ilike(search_term)
-                )
-            )
-            
-        if status:
-            query = query.filter(Song.status == status)
-        
-        # Apply sorting with consistent secondary ordering
-        sort_field_map = {
-            'title': Song.title,
-            'artist': Song.artist,
-            'username': User.username,
-            'status': Song.status,
-            'updated_at': Song.updated_at
-        }
-        
-        if sort_by not in sort_field_map:
-            sort_by = 'updated_at'  # Default fallback
-        
-        sort_field = sort_field_map[sort_by]
-        
-        if sort_direction.lower() == 'asc':
-            query = query.order_by(sort_field.asc(), Song.id)
-        else:
-            query = query.order_by(sort_field.desc(), Song.id)
-        
-        # Get total count before pagination (optimized)
-        if not search and not status:
-            # For simple queries, use a faster count method
-            total_count = db.query(Song).filter(Song.is_public == True).count()
-        else:
-            total_count = query.count()
-        
-        # Apply pagination at database level
-        results = query.offset(offset).limit(limit).all()
-        
-        # Calculate pagination info
-        page = (offset // limit) + 1
-        total_pages = (total_count + limit - 1) // limit  # Ceiling division
-        
-        # Get artist images for all songs in batch (only if requested)
-        artist_images = {}
-        if include_artist_images:
-            artist_names = [song.artist for song, _ in results if song.artist]
-            artist_images = get_artist_images_batch(db, artist_names)
-        
-        songs = [
-            PublicSongResponse(
-                id=song.id,
-                title=song.title,
-                artist=song.artist,
-                album=song.album,
-                year=song.year,
-                status=song.status,
-                album_cover=song.album_cover,
-                artist_image_url=artist_images.get(song.artist.lower()) if song.artist and include_artist_images else None,
-                user_id=song.user_id,
-                username=user.username,
-                display_name=user.display_name,
-                profile_image_url=user.profile_image_url,
-                created_at=song.created_at,
-                updated_at=song.updated_at
-            )
-            for song, user in results
-        ]
-        
-        return PaginatedPublicSongsResponse(
-            songs=songs,
-            total_count=total_count,
-            page=page,
-            per_page=limit,
-            total_pages=total_pages
-        )
+        query = query.order_by(sort_field.desc(), Song.id)
+    
+    if cursor:
+        # Keyset pagination: seek past the last row instead of OFFSET
+        last_value, last_id = _decode_cursor(cursor, sort_by, direction)
+        past_value = sort_field > last_value if direction == 'asc' else sort_field < last_value
+        query = query.filter(or_(past_value, and_(sort_field == last_value, Song.id > last_id)))
+        rows = query.limit(limit + 1).all()
+    else:
+        rows = query.offset(offset).limit(limit + 1).all()
+    
+    # The extra row only tells us whether another page exists
+    results = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and results:
+        last_song, last_user = results[-1]
+        last_value = last_user.username if sort_by == 'username' else getattr(last_song, sort_by)
+        if last_value is None:
+            last_value = _SORT_NULL_SENTINELS[sort_by]
+        next_cursor = _encode_cursor(sort_by, direction, last_value, last_song.id)
+    
+    return PaginatedPublicSongsResponse(
+        songs=_build_public_song_responses(db, results, include_artist_images),
+        total_count=total_count,
+        page=(offset // limit) + 1,
+        per_page=limit,
+        total_pages=(total_count + limit - 1) // limit,  # Ceiling division
+        next_cursor=next_cursor
+    )
 
 @router.get("/shared-connections", response_model=SharedConnectionsResponse)
 def get_shared_connections(
@@ -347,11 +345,20 @@ def get_shared_connections(
 ):
     """Get songs and artists shared between current user and other users"""
     
-    # Get current user's songs for comparison
-    my_songs = db.query(Song.title, Song.artist).filter(Song.user_id == current_user.id).subquery()
+    cache_key = f"shared_connections:{current_user.id}:{songs_limit}:{songs_offset}:{artists_limit}:{artists_offset}"
+    cached_response = cache.get(cache_key)
+    if cached_response is not None:
+        return cached_response
     
-    # Find shared songs (same title + artist) - get song_id, album_cover, status, album, year
-    shared_songs_base_query = db.query(
+    # Current user's songs for comparison (distinct, so joins never fan out)
+    my_songs = db.query(Song.fingerprint).filter(
+        Song.user_id == current_user.id,
+        Song.fingerprint.isnot(None)
+    ).distinct().subquery()
+    
+    # Find shared songs (same normalized title + artist); the window total
+    # saves a separate count over the same join
+    shared_songs_results = db.query(
         User.username,
         Song.id,
         Song.title,
@@ -359,22 +366,18 @@ def get_shared_connections(
         Song.album_cover,
         Song.status,
         Song.album,
-        Song.year
+        Song.year,
+        func.count().over().label('total')
     ).select_from(Song)\
     .join(User, Song.user_id == User.id)\
-    .join(my_songs, and_(Song.title == my_songs.c.title, Song.artist == my_songs.c.artist))\
+    .join(my_songs, Song.fingerprint == my_songs.c.fingerprint)\
     .filter(
         Song.user_id != current_user.id,
         Song.is_public == True
-    ).distinct()
-    
-    # Get total count for shared songs
-    total_shared_songs = shared_songs_base_query.count()
+    ).order_by(Song.id)\
+    .offset(songs_offset).limit(songs_limit).all()
     
-    # Apply pagination
-    shared_songs_results = shared_songs_base_query.offset(songs_offset).limit(songs_limit).all()
-    
-    # SIMPLIFIED APPROACH: Get artists where current user has songs
+    # Artists where current user has songs
     my_artist_counts = db.query(
         Song.artist,
         func.count(Song.id).label('my_count')
@@ -382,87 +385,82 @@ def get_shared_connections(
         Song.user_id == current_user.id
     ).group_by(Song.artist).subquery()
     
-    # Find other users who have public songs by the same artists
-    shared_artists_base_query = db.query(
+    # One grouped query per (other user, artist): their public song count, how
+    # many of those the current user also has, and the current user's count
+    other_user_count = func.count(Song.id)
+    shared_artists_query = db.query(
         User.username,
         Song.artist,
-        func.count(Song.id).label('other_user_count'),
-        my_artist_counts.c.my_count
+        other_user_count.label('other_user_count'),
+        func.count(my_songs.c.fingerprint).label('shared_songs_count'),
+        my_artist_counts.c.my_count,
+        func.count().over().label('total')
     ).select_from(Song)\
     .join(User, Song.user_id == User.id)\
     .join(my_artist_counts, Song.artist == my_artist_counts.c.artist)\
+    .outerjoin(my_songs, Song.fingerprint == my_songs.c.fingerprint)\
     .filter(
         Song.user_id != current_user.id,
         Song.is_public == True
     ).group_by(User.username, Song.artist, my_artist_counts.c.my_count)\
-    .order_by(func.count(Song.id).desc())
-    
-    # Get total count for shared artists (need a subquery for grouped count)
-    total_shared_artists = db.query(func.count()).select_from(
-        shared_artists_base_query.subquery()
-    ).scalar()
-    
-    # Apply pagination
-    shared_artists_query = shared_artists_base_query.offset(artists_offset).limit(artists_limit).all()
+    .order_by(other_user_count.desc(), User.username, Song.artist)\
+    .offset(artists_offset).limit(artists_limit).all()
+    
+    total_shared_songs = shared_songs_results[0].total if shared_songs_results else None
+    total_shared_artists = shared_artists_query[0].total if shared_artists_query else None
+    
+    # An offset past the end returns no rows to read the window total from
+    if total_shared_songs is None:
+        total_shared_songs = db.query(func.count(Song.id)).select_from(Song)\
+            .join(my_songs, Song.fingerprint == my_songs.c.fingerprint)\
+            .filter(Song.user_id != current_user.id, Song.is_public == True)\
+            .scalar() if songs_offset else 0
+    if total_shared_artists is None:
+        total_shared_artists = db.query(func.count()).select_from(
+            db.query(Song.user_id, Song.artist)
+            .join(my_artist_counts, Song.artist == my_artist_counts.c.artist)
+            .filter(Song.user_id != current_user.id, Song.is_public == True)
+            .group_by(Song.user_id, Song.artist)
+            .subquery()
+        ).scalar() if artists_offset else 0
     
     # Get artist images for shared artists
-    shared_artist_names = [artist for _, artist, _, _ in shared_artists_query if artist]
+    shared_artist_names = [row.artist for row in shared_artists_query if row.artist]
     artist_images = get_artist_images_batch(db, shared_artist_names)
     
-    # Build detailed artist breakdown
-    shared_artists = []
-    for username, artist, other_user_count, my_songs_count in shared_artists_query:
-        # Count shared songs (same title + artist between current user and this other user)
-        shared_songs_count = db.query(func.count(Song.id)).select_from(Song)\
-        .join(my_songs, and_(Song.title == my_songs.c.title, Song.artist == my_songs.c.artist))\
-        .filter(
-            Song.user_id != current_user.id,
-            Song.artist == artist,
-            Song.is_public == True
-        ).scalar() or 0
-        
-        shared_artists.append((username, artist, other_user_count, shared_songs_count, my_songs_count))
-    
-    # Build response with proper field mapping - always include all fields
-    shared_songs_list = []
-    for result in shared_songs_results:
-        # Access by index since SQLAlchemy returns tuples for multi-column queries
-        username = result[0] if len(result) > 0 else None
-        song_id = result[1] if len(result) > 1 else None
-        title = result[2] if len(result) > 2 else None
-        artist = result[3] if len(result) > 3 else None
-        album_cover = result[4] if len(result) > 4 else None
-        status = result[5] if len(result) > 5 else None
-        album = result[6] if len(result) > 6 else None
-        year = result[7] if len(result) > 7 else None
-        
-        shared_songs_list.append({
-            "song_id": song_id,
-            "username": username,
-            "title": title,
-            "artist": artist,
-            "album_cover": album_cover,
-            "status": status,
-            "album": album,
-            "year": year
-        })
-    
-    return SharedConnectionsResponse(
-        shared_songs=shared_songs_list,
+    response = SharedConnectionsResponse(
+        shared_songs=[
+            {
+                "song_id": row.id,
+                "username": row.username,
+                "title": row.title,
+                "artist": row.artist,
+                "album_cover": row.album_cover,
+                "status": row.status,
+                "album": row.album,
+                "year": row.year
+            }
+            for row in shared_songs_results
+        ],
         shared_artists=[
             {
-                "username": username,
-                "artist": artist,
-                "song_count": other_user_count,
-                "shared_songs_count": shared_songs_count,
-                "my_songs_count": my_songs_count,
-                "artist_image_url": artist_images.get(artist.lower()) if artist else None
+                "username": row.username,
+                "artist": row.artist,
+                "song_count": row.other_user_count,
+                "shared_songs_count": row.shared_songs_count,
+                "my_songs_count": row.my_count,
+                "artist_image_url": artist_images.get(row.artist.lower()) if row.artist else None
             }
-            for username, artist, other_user_count, shared_songs_count, my_songs_count in shared_artists
+            for row in shared_artists_query
         ],
         total_shared_songs=total_shared_songs,
         total_shared_artists=total_shared_artists
     )
+    cache.set(
+        cache_key, response, ttl=SHARED_CONNECTIONS_TTL,
+        tags=(shared_connections_tag(current_user.id), PUBLIC_SONGS_CACHE_TAG)
+    )
+    return response
 
 @router.get("/artist-connection-details", response_model=ArtistConnectionDetailsResponse)
 def get_artist_connection_details(
@@ -580,6 +578,7 @@ def toggle_song_public(
     # Toggle the public status
     song.is_public = not song.is_public
     db.commit()
+    invalidate_public_catalog_caches()
     
     # Log the activity
     try:
@@ -760,6 +759,8 @@ def bulk_toggle_songs_public(
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to save changes: {str(e)}")
+    if success_count:
+        invalidate_public_catalog_caches()
     
     # Check public WIP achievements if any songs were made public
     if request.make_public and success_count > 0:
@@ -862,6 +863,7 @@ def make_all_future_plans_public(
         user.default_public_sharing = True
         
         db.commit()
+        invalidate_public_catalog_caches()
         
         # Log the activity
         try:
@@ -923,6 +925,7 @@ def make_all_future_plans_private(
         user.default_public_sharing = False
         
         db.commit()
+        invalidate_public_catalog_caches()
         
         # Log the activity
         try:
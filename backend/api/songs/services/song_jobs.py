@@ -0,0 +1,93 @@
+"""
+Background jobs for song writes (see services/job_queue.py).
+
+SongService enqueues these in the same transaction as the create / update, and
+the handlers run the side effects that used to add to the request's latency.
+Other song-creating paths (batch create, playlist import, community events)
+queue their Spotify enhancement with ``enqueue_song_enhancement``.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from models import User
+from services.job_queue import enqueue_job, job_handler
+
+SONG_CREATED_JOB = "song_created"
+SONG_UPDATED_JOB = "song_updated"
+SONG_ACHIEVEMENTS_JOB = "check_song_achievements"
+SONGS_ENHANCE_JOB = "enhance_new_songs"
+
+
+def _load_song_and_user(db: Session, user_id: Optional[int], song_id: int):
+    from ..repositories.song_repository import SongRepository
+
+    user = db.get(User, user_id) if user_id is not None else None
+    song = SongRepository(db).get_song_by_id(song_id)
+    return song, user
+
+
+@job_handler(SONG_CREATED_JOB)
+def run_song_created(db: Session, user_id: Optional[int], payload: Dict[str, Any]):
+    """Spotify enhancement, activity log and potential-collaboration notices."""
+    from .song_service import SongService
+
+    song, user = _load_song_and_user(db, user_id, payload["song_id"])
+    if song is None or user is None:
+        return
+    SongService(db).run_creation_side_effects(song, user, auto_enhance=payload.get("auto_enhance", False))
+
+
+@job_handler(SONG_UPDATED_JOB)
+def run_song_updated(db: Session, user_id: Optional[int], payload: Dict[str, Any]):
+    """Activity log, collaborator notifications and potential-collaboration notices."""
+    from .song_service import SongService
+
+    song, user = _load_song_and_user(db, user_id, payload["song_id"])
+    if song is None or user is None:
+        return
+    SongService(db).run_update_side_effects(
+        song,
+        user,
+        collaborator_notice=payload.get("collaborator_notice"),
+        check_potential_collaborations=payload.get("check_potential_collaborations", False),
+    )
+
+
+@job_handler(SONGS_ENHANCE_JOB)
+def run_songs_enhance(db: Session, user_id: Optional[int], payload: Dict[str, Any]):
+    """Spotify auto-enhancement for songs created outside create_song (batches, imports, events)."""
+    from ..repositories.song_repository import SongRepository
+    from .song_service import SongService
+
+    user = db.get(User, user_id) if user_id is not None else None
+    if user is None:
+        return
+    service = SongService(db)
+    songs = SongRepository(db)
+    for song_id in payload.get("song_ids", []):
+        song = songs.get_song_by_id(song_id)
+        if song is not None:
+            service.enhance_created_song(song, user)
+
+
+def enqueue_song_enhancement(db: Session, user_id: int, song_ids: List[int]):
+    """Queue auto-enhancement of new songs in ``db``'s transaction (runs after the caller commits)."""
+    if song_ids:
+        enqueue_job(db, SONGS_ENHANCE_JOB, user_id, {"song_ids": list(song_ids)})
+
+
+@job_handler(SONG_ACHIEVEMENTS_JOB, dedupe=True)
+def run_song_achievements(db: Session, user_id: Optional[int], payload: Dict[str, Any]):
+    """
+    Achievement checks after song writes; one queued job per user. The payload
+    flags the achievement events that happened (merged across queued writes).
+    """
+    from .song_service import SongService
+
+    if user_id is None:
+        return
+    events = {event for event, happened in payload.items() if happened}
+    if events:
+        SongService(db).check_song_achievements(user_id, events)
@@ -5,20 +5,22 @@ from datetime import datetime
 
 from models import Song, SongStatus, User, Pack, AlbumSeries, CollaborationType, NotificationType, Collaboration
 from schemas import SongCreate, SongOut
-from api.data_access import create_song_in_db, delete_song_from_db
+from api.data_access import create_song_in_db, delete_song_from_db, auto_enhance_new_song
 from api.activity_logger import log_activity
-from api.achievements import (
-    check_status_achievements,
-    check_wip_completion_achievements,
-    check_diversity_achievements,
+from api.achievements import record_achievement_events
+from api.achievements.services.achievement_events import (
+    PACK_RELEASED, SONG_DETAILS_CHANGED, SONG_MADE_PUBLIC, SONG_RELEASED, song_status_event,
 )
 from api.achievements.repositories.achievements_repository import AchievementsRepository
 from api.notifications.services.notification_service import NotificationService
 from utils.cache import invalidate_user_caches, invalidate_leaderboard_cache
+from utils.normalization import song_fingerprint
+from services.job_queue import enqueue_job
 
 from ..repositories.song_repository import SongRepository
 from ..repositories.collaboration_repository import CollaborationRepository
 from ..repositories.pack_repository import PackRepository
+from .song_jobs import SONG_CREATED_JOB, SONG_UPDATED_JOB, SONG_ACHIEVEMENTS_JOB, enqueue_song_enhancement
 
 
 class SongService:
@@ -45,8 +47,8 @@ class SongService:
         cleaned_data = self._clean_song_data(song_data_dict)
         song_with_author = SongCreate(**cleaned_data)
         
-        # Create the song
-        db_song = create_song_in_db(self.db, song_with_author, current_user)
+        # Create the song (Spotify enhancement runs in the background job below)
+        db_song = create_song_in_db(self.db, song_with_author, current_user, auto_enhance=False)
         
         # Re-fetch with relationships
         db_song = self.song_repo.get_song_by_id(db_song.id)
@@ -54,13 +56,15 @@ class SongService:
         # Build response
         song_dict = self._build_song_response(db_song, current_user)
         
-        # Log activity and check achievements
-        self._log_song_creation(db_song, current_user)
-        self._check_creation_achievements(db_song, current_user)
-        
-        # Check for potential collaboration notifications
-        # If the song is public and WIP/Future Plans, notify users with matching songs
-        self._check_potential_collaboration_notifications(db_song, current_user)
+        # Hand enhancement, activity logging, achievements and potential
+        # collaboration notifications to the job queue
+        try:
+            enqueue_job(self.db, SONG_CREATED_JOB, current_user.id, {"song_id": db_song.id, "auto_enhance": True})
+            enqueue_job(self.db, SONG_ACHIEVEMENTS_JOB, current_user.id, {song_status_event(db_song.status): True})
+            self.db.commit()
+        except Exception as job_err:
+            self.db.rollback()
+            print(f"⚠️ Failed to queue song creation jobs: {job_err}")
         
         return SongOut(**song_dict)
     
@@ -202,6 +206,7 @@ class SongService:
         
         # Check if status is changing to Released
         old_status = song.status
+        collaborator_notice = None
         
         # Apply regular updates (skip relationship and protected fields)
         for key, value in updates.items():
@@ -253,19 +258,12 @@ class SongService:
                     except Exception as e:
                         print(f"⚠️ Failed to award release points: {e}")
 
-                    # Notify collaborators that the song was released
-                    try:
-                        actor_name = getattr(current_user, "display_name", None) or current_user.username
-                        message = f"{actor_name} released '{song.title}'"
-                        self.notification_service.notify_song_collaborators(
-                            song_id=song.id,
-                            actor_user_id=current_user.id,
-                            notification_type=NotificationType.COLLAB_SONG_STATUS,
-                            title=f"Song released: {song.title}",
-                            message=message,
-                        )
-                    except Exception as e:
-                        print(f"⚠️ Failed to notify collaborators about release: {e}")
+                    # Notify collaborators that the song was released (queued below)
+                    actor_name = getattr(current_user, "display_name", None) or current_user.username
+                    collaborator_notice = {
+                        "title": f"Song released: {song.title}",
+                        "message": f"{actor_name} released '{song.title}'",
+                    }
                         
             # Clear released_at if moving away from Released
             elif song.released_at is not None:
@@ -273,56 +271,59 @@ class SongService:
                     song.released_at = None
             
             # Notify collaborators about non-release status changes (e.g. Future Plans → WIP)
-            try:
-                # Normalize to string values for comparison / messaging
-                old_status_str = old_status.value if isinstance(old_status, SongStatus) else str(old_status)
-                new_status_str = new_status.value if isinstance(new_status, SongStatus) else str(new_status)
-                if old_status_str != new_status_str:
-                    actor_name = getattr(current_user, "display_name", None) or current_user.username
-                    # Skip here if we already sent a dedicated release notification above
-                    if not (new_status_str == SongStatus.released.value and (old_status_str != SongStatus.released.value)):
-                        message = f"{actor_name} moved '{song.title}' to {new_status_str}"
-                        self.notification_service.notify_song_collaborators(
-                            song_id=song.id,
-                            actor_user_id=current_user.id,
-                            notification_type=NotificationType.COLLAB_SONG_STATUS,
-                            title=f"Song status updated: {song.title}",
-                            message=message,
-                        )
-            except Exception as e:
-                print(f"⚠️ Failed to notify collaborators about status change: {e}")
-        
-        self.db.commit()
-        
-        # Re-fetch with relationships
-        updated_song = self.song_repo.get_song_by_id(song_id)
-        song_dict = self._build_song_response(updated_song, current_user)
-        
-        # Log activity and check achievements
-        self._log_song_update(updated_song, current_user)
-        self._check_update_achievements(updated_song, current_user)
+            # Normalize to string values for comparison / messaging
+            old_status_str = old_status.value if isinstance(old_status, SongStatus) else str(old_status)
+            new_status_str = new_status.value if isinstance(new_status, SongStatus) else str(new_status)
+            if old_status_str != new_status_str:
+                actor_name = getattr(current_user, "display_name", None) or current_user.username
+                # Skip here if we already queued a dedicated release notification above
+                if not (new_status_str == SongStatus.released.value and (old_status_str != SongStatus.released.value)):
+                    collaborator_notice = {
+                        "title": f"Song status updated: {song.title}",
+                        "message": f"{actor_name} moved '{song.title}' to {new_status_str}",
+                    }
         
         # Check for potential collaboration notifications when song becomes public WIP/Future
         # This happens when:
         # 1. is_public changes to True (while in WIP/Future Plans)
         # 2. status changes to WIP/Future Plans (while is_public is True)
-        old_is_public = getattr(song, '_original_is_public', not updates.get('is_public', False))
         became_public_wip_or_future = False
         
         if 'is_public' in updates and updates['is_public'] == True:
             # Song just became public - check if it's WIP or Future Plans
-            current_status = updated_song.status
+            current_status = song.status
             status_str = current_status.value if isinstance(current_status, SongStatus) else str(current_status)
             if status_str in ["In Progress", "Future Plans"]:
                 became_public_wip_or_future = True
-        elif 'status' in updates and updated_song.is_public:
+        elif 'status' in updates and song.is_public:
             # Status changed while song is public
             new_status_str = updates['status'].value if isinstance(updates['status'], SongStatus) else str(updates['status'])
             if new_status_str in ["In Progress", "Future Plans"]:
                 became_public_wip_or_future = True
         
+        # Activity log, notifications and achievement checks run in the background,
+        # queued in the same transaction as the update
+        enqueue_job(self.db, SONG_UPDATED_JOB, current_user.id, {
+            "song_id": song.id,
+            "collaborator_notice": collaborator_notice,
+            "check_potential_collaborations": became_public_wip_or_future,
+        })
+        achievement_events = {}
+        if "status" in updates and song_status_event(old_status) != song_status_event(song.status):
+            achievement_events[song_status_event(song.status)] = True
+        elif song_status_event(song.status) == SONG_RELEASED:
+            if any(field in updates for field in ("title", "artist", "year")):
+                achievement_events[SONG_DETAILS_CHANGED] = True
         if became_public_wip_or_future:
-            self._check_potential_collaboration_notifications(updated_song, current_user)
+            achievement_events[SONG_MADE_PUBLIC] = True
+        if achievement_events:
+            enqueue_job(self.db, SONG_ACHIEVEMENTS_JOB, current_user.id, achievement_events)
+        
+        self.db.commit()
+        
+        # Re-fetch with relationships
+        updated_song = self.song_repo.get_song_by_id(song_id)
+        song_dict = self._build_song_response(updated_song, current_user)
         
         # Invalidate caches if important fields changed
         try:
@@ -380,8 +381,7 @@ class SongService:
             released_songs = self.db.query(Song, UserModel).join(
                 UserModel, Song.user_id == UserModel.id
             ).filter(
-                Song.title.ilike(title),
-                Song.artist.ilike(artist),
+                Song.fingerprint == song_fingerprint(title, artist),
                 Song.user_id != current_user.id,
                 Song.status == "Released"  # Only check released songs
             ).all()
@@ -419,7 +419,7 @@ class SongService:
                 song_with_author = SongCreate(**song_data)
                 
                 # CRITICAL: auto_commit=False to prevent partial commits
-                new_song = create_song_in_db(self.db, song_with_author, current_user, auto_enhance=True, auto_commit=False)
+                new_song = create_song_in_db(self.db, song_with_author, current_user, auto_enhance=False, auto_commit=False)
                 new_songs.append(new_song)
             
             # If we get here, all songs were created successfully - commit the transaction
@@ -444,6 +444,14 @@ class SongService:
             print(f"⚠️ Failed to clean remaster tags for batch songs: {e}")
             # Don't fail the batch creation if cleaning fails
         
+        # Spotify enhancement runs in a background job
+        try:
+            enqueue_song_enhancement(self.db, current_user.id, song_ids)
+            self.db.commit()
+        except Exception as job_err:
+            self.db.rollback()
+            print(f"⚠️ Failed to queue enhancement for batch songs: {job_err}")
+        
         songs_with_relations = self.song_repo.get_songs_with_relations(song_ids)
         
         # Build responses
@@ -454,9 +462,9 @@ class SongService:
             song_dict = self._build_song_response(song, current_user, series_map=series_map)
             results.append(SongOut(**song_dict))
         
-        # Check achievements for batch creation
+        # Check the achievements the new songs' statuses can unlock
         try:
-            check_status_achievements(self.db, current_user.id)
+            record_achievement_events(self.db, current_user.id, {song_status_event(song.status) for song in new_songs})
         except Exception as e:
             print(f"⚠️ Failed to check achievements: {e}")
         
@@ -490,6 +498,10 @@ class SongService:
         # Update pack status and create series
         self._finalize_pack_release(pack, songs)
         
+        # Check the achievements the release can unlock for each song owner
+        for owner_id in {song.user_id for song in completed_songs}:
+            record_achievement_events(self.db, owner_id, [PACK_RELEASED])
+        
         return {
             "message": f"Pack '{pack_name}' released successfully",
             "completed_songs": len(completed_songs),
@@ -811,32 +823,65 @@ class SongService:
         except Exception as log_err:
             print(f"⚠️ Failed to log update_song activity: {log_err}")
     
-    def _check_creation_achievements(self, song: Song, current_user: User):
-        """Check achievements after song creation."""
+    def check_song_achievements(self, user_id: int, events):
+        """Check the achievements song write events can unlock (run by the achievements job)."""
         try:
-            # Note: Creation counters are already incremented in create_song_in_db,
-            # so we only need to check achievements here, not increment counters again.
-            
-            check_status_achievements(self.db, current_user.id)
-            if song.status == SongStatus.released:
-                check_wip_completion_achievements(self.db, current_user.id)
-                check_diversity_achievements(self.db, current_user.id)
+            # Note: Counters are already current (creation counters in create_song_in_db,
+            # the rest via user_stats_counters), so this only evaluates.
+            record_achievement_events(self.db, user_id, events)
         except Exception as ach_err:
             print(f"⚠️ Failed to check achievements: {ach_err}")
     
-    def _check_update_achievements(self, song: Song, current_user: User):
-        """Check achievements after song update."""
+    def run_creation_side_effects(self, song: Song, current_user: User, auto_enhance: bool = True):
+        """Slow follow-ups of create_song (run by the song_created job)."""
+        if auto_enhance:
+            self.enhance_created_song(song, current_user)
+        
+        self._log_song_creation(song, current_user)
+        
+        # If the song is public and WIP/Future Plans, notify users with matching songs
+        self._check_potential_collaboration_notifications(song, current_user)
+    
+    def enhance_created_song(self, song: Song, current_user: User):
+        """
+        Spotify auto-enhancement of a song the client already has. A song that
+        turns out to duplicate one of the user's songs is kept, and the user is
+        notified with a link to it so they can decide which to delete.
+        """
+        duplicate = auto_enhance_new_song(self.db, song, current_user, delete_duplicate=False)
+        if duplicate is None:
+            return
         try:
-            check_status_achievements(self.db, current_user.id)
-            if song.status == SongStatus.released:
-                check_wip_completion_achievements(self.db, current_user.id)
-            
-            # Check public WIP achievements when making a WIP song public
-            if song.status == SongStatus.wip and song.is_public:
-                from api.achievements import check_public_wip_achievements
-                check_public_wip_achievements(self.db, current_user.id)
-        except Exception as ach_err:
-            print(f"⚠️ Failed to check achievements: {ach_err}")
+            self.notification_service.create_general_notification(
+                user_id=current_user.id,
+                title="Possible duplicate song",
+                message=f"After Spotify enhancement, '{song.title}' by {song.artist} matches a song you already have. "
+                        f"Open it to review and delete whichever copy you don't need.",
+                related_song_id=song.id,
+            )
+        except Exception as e:
+            print(f"⚠️ Failed to notify about possible duplicate song {song.id}: {e}")
+    
+    def run_update_side_effects(self, song: Song, current_user: User,
+                                collaborator_notice: Optional[Dict[str, str]] = None,
+                                check_potential_collaborations: bool = False):
+        """Slow follow-ups of update_song (run by the song_updated job)."""
+        self._log_song_update(song, current_user)
+        
+        if collaborator_notice:
+            try:
+                self.notification_service.notify_song_collaborators(
+                    song_id=song.id,
+                    actor_user_id=current_user.id,
+                    notification_type=NotificationType.COLLAB_SONG_STATUS,
+                    title=collaborator_notice["title"],
+                    message=collaborator_notice["message"],
+                )
+            except Exception as e:
+                print(f"⚠️ Failed to notify collaborators about status change: {e}")
+        
+        if check_potential_collaborations:
+            self._check_potential_collaboration_notifications(song, current_user)
     
     def _update_song_collaborations(self, song_id: int, collaborations: List[str], current_user: User):
         """Update song collaborations."""
@@ -2,14 +2,14 @@
 Spotify repository - handles data access for Spotify-related operations.
 """
 
-import os
 from typing import Optional, List, Set
 from sqlalchemy.orm import Session
 from sqlalchemy import func, distinct, text
-from spotipy import Spotify
-from spotipy.oauth2 import SpotifyClientCredentials
 
-from models import Song, Artist, Pack, FeatureRequest, User, RockBandDLC
+from models import Song, Artist, Pack, FeatureRequest, User
+from services.dlc_index import get_dlc_index
+from services.spotify_cache import CachedSpotify
+from services.spotify_client import get_spotify_client
 from ..validators.spotify_validators import SpotifyOptionResponse
 
 
@@ -19,21 +19,12 @@ class SpotifyRepository:
         # This ensures .env file is loaded before we try to read credentials
         pass
 
-    def get_spotify_client(self) -> Optional[Spotify]:
-        """Get authenticated Spotify client."""
-        # Load credentials lazily to ensure .env is loaded
-        client_id = os.getenv("SPOTIFY_CLIENT_ID")
-        client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
-        
-        if not client_id or not client_secret:
-            print(f"Spotify credentials missing: CLIENT_ID={'set' if client_id else 'missing'}, CLIENT_SECRET={'set' if client_secret else 'missing'}")
-            return None
-        
-        auth = SpotifyClientCredentials(
-            client_id=client_id,
-            client_secret=client_secret,
-        )
-        return Spotify(auth_manager=auth)
+    def get_spotify_client(self) -> Optional[CachedSpotify]:
+        """Get the shared, authenticated Spotify client."""
+        sp = get_spotify_client()
+        if sp is None:
+            print("Spotify credentials missing: set SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET")
+        return sp
 
     def get_song_by_id(self, db: Session, song_id: int) -> Optional[Song]:
         """Get song by ID."""
@@ -93,11 +84,7 @@ class SpotifyRepository:
     def check_dlc_exists(self, db: Session, title: str, artist: str) -> bool:
         """Check if song exists as Rock Band DLC."""
         try:
-            dlc_entry = db.query(RockBandDLC).filter(
-                RockBandDLC.title.ilike(title),
-                RockBandDLC.artist.ilike(artist)
-            ).first()
-            return dlc_entry is not None
+            return get_dlc_index(db).is_dlc(title, artist)
         except Exception as e:
             print(f"Error checking DLC status for {title}: {e}")
             return False
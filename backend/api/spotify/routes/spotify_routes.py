@@ -97,10 +97,13 @@ def import_playlist(
         except Exception as log_err:
             print(f"⚠️ Failed to log import_spotify activity: {log_err}")
         
-        # Check achievements
+        # Check achievements (counts this import and checks the songs it created)
         try:
-            from api.achievements import check_spotify_achievements
-            check_spotify_achievements(db, current_user.id)
+            from api.activity_logger import flush_activity_logs
+            from api.achievements import record_achievement_events
+            from api.achievements.services.achievement_events import SPOTIFY_IMPORT
+            flush_activity_logs()
+            record_achievement_events(db, current_user.id, [SPOTIFY_IMPORT])
         except Exception as ach_err:
             print(f"⚠️ Failed to check achievements: {ach_err}")
         
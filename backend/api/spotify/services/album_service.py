@@ -80,7 +80,8 @@ class AlbumService:
 
     def _build_tracklist_items(self, tracks: Dict, artist: str, db: Session) -> List[TracklistItem]:
         """Build tracklist items from Spotify track data."""
-        from api.tools import clean_string, normalize_title, titles_similar
+        from api.tools import clean_string, normalize_title
+        from utils.title_matching import TitleMatcher
         
         # Get global songs by the same artist
         try:
@@ -88,6 +89,12 @@ class AlbumService:
         except Exception:
             global_songs = []
         normalized_artist = normalize_title(artist or "")
+        same_artist = []
+        for gs in global_songs:
+            gs_artist_normalized = normalize_title(gs.artist or "")
+            if normalized_artist in gs_artist_normalized or gs_artist_normalized in normalized_artist:
+                same_artist.append(gs)
+        global_matcher = TitleMatcher(same_artist, lambda s: s.title)
         
         items: List[TracklistItem] = []
         for t in tracks.get('items', []):
@@ -99,18 +106,8 @@ class AlbumService:
             is_dlc = self.repository.check_dlc_exists(db, clean_title, artist)
             
             # Check for existing songs by the same artist
-            s_global = None
-            status_val = None
-            if global_songs:
-                for gs in global_songs:
-                    gs_artist_normalized = normalize_title(gs.artist or "")
-                    if (gs_artist_normalized.find(normalized_artist) != -1 or 
-                        normalized_artist.find(gs_artist_normalized) != -1):
-                        gs_title_normalized = normalize_title(gs.title or "")
-                        if titles_similar(key, gs_title_normalized, threshold=0.92):
-                            s_global = gs
-                            status_val = gs.status
-                            break
+            s_global = global_matcher.match(key)
+            status_val = s_global.status if s_global else None
             
             items.append(TracklistItem(
                 spotify_track_id=t.get('id'),
@@ -3,15 +3,17 @@ Artist service - handles artist image management and operations.
 """
 
 import re
-import time
 from typing import Optional, List
 from sqlalchemy.orm import Session
 
+from utils.concurrency import map_concurrent
 from ..repositories.spotify_repository import SpotifyRepository
 from ..validators.spotify_validators import (
     ArtistImageFetchResponse, BulkImageFetchResponse
 )
 
+BULK_IMAGE_FETCH_WORKERS = 8
+
 
 class ArtistService:
     def __init__(self):
@@ -92,35 +94,35 @@ class ArtistService:
         
         log_entries.append(f"🖼️ Starting to fetch images for {total_count} artists...")
         
-        # Process in batches
+        # Searches run concurrently on the shared (rate-limited) client;
+        # results are applied and committed here, on the request thread
         commit_interval = 25
-        
-        for i, artist in enumerate(artists_without_images):
-            try:
-                image_url = self.fetch_artist_image_from_spotify(artist.name, sp)
-                if image_url:
-                    artist.image_url = image_url
-                    updated_count += 1
-                    entry = f"✅ {artist.name} – image fetched"
-                else:
-                    failed_artists.append(artist.name)
-                    entry = f"⚠️ {artist.name} – no image found"
-                if len(log_entries) < max_log_entries:
-                    log_entries.append(entry)
-                
-                # Commit periodically
-                if (i + 1) % commit_interval == 0:
-                    db.commit()
-                    print(f"Progress: {i + 1}/{total_count} artists processed, {updated_count} images fetched")
-                
-                # Rate limiting delay
-                time.sleep(0.1)
-                
-            except Exception as e:
-                print(f"Failed to fetch image for {artist.name}: {e}")
-                if len(log_entries) < max_log_entries:
-                    log_entries.append(f"❌ {artist.name} – error: {e}")
-                continue
+        artists_by_id = {artist.id: artist for artist in artists_without_images}
+        names = [(artist.id, artist.name) for artist in artists_without_images]
+        
+        def fetch(item):
+            return self.fetch_artist_image_from_spotify(item[1], sp)
+        
+        for i, ((artist_id, artist_name), image_url, error) in enumerate(
+            map_concurrent(fetch, names, BULK_IMAGE_FETCH_WORKERS)
+        ):
+            if error is not None:
+                print(f"Failed to fetch image for {artist_name}: {error}")
+                entry = f"❌ {artist_name} – error: {error}"
+            elif image_url:
+                artists_by_id[artist_id].image_url = image_url
+                updated_count += 1
+                entry = f"✅ {artist_name} – image fetched"
+            else:
+                failed_artists.append(artist_name)
+                entry = f"⚠️ {artist_name} – no image found"
+            if len(log_entries) < max_log_entries:
+                log_entries.append(entry)
+            
+            # Commit periodically
+            if (i + 1) % commit_interval == 0:
+                db.commit()
+                print(f"Progress: {i + 1}/{total_count} artists processed, {updated_count} images fetched")
         
         # Final commit
         db.commit()
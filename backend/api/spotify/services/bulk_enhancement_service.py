@@ -0,0 +1,162 @@
+"""
+Bulk enhancement service - enhances many songs with Spotify data at once.
+
+Track searches run concurrently on a bounded worker pool (the shared client is
+rate limited, see ``services.spotify_client``). Search results are full track
+objects, so no per-song ``track`` call is needed; artists are resolved per
+batch with one ``artists`` call per 50 ids and one commit per batch.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models import Artist, Song
+from utils.concurrency import map_concurrent
+from ..repositories.spotify_repository import SpotifyRepository
+from .song_enhancement_service import SongEnhancementService
+
+BULK_ENHANCE_WORKERS = 8
+BULK_ENHANCE_COMMIT_EVERY = 25
+SPOTIFY_ARTISTS_BATCH_SIZE = 50  # max ids per GET /artists
+
+
+class BulkEnhancementService:
+    def __init__(self, max_workers: int = BULK_ENHANCE_WORKERS, commit_every: int = BULK_ENHANCE_COMMIT_EVERY):
+        self.repository = SpotifyRepository()
+        self.max_workers = max_workers
+        self.commit_every = commit_every
+
+    def enhance_songs(self, song_ids: List[int], db: Session, user_id: int,
+                      preserve_artist_album: bool = False, sp=None) -> Iterator[Dict]:
+        """
+        Enhance the user's songs, yielding progress as searches complete.
+
+        Results are dicts with ``song_id``, ``status``, ``message`` and ``song``
+        (the committed Song for successes). Each matched song first yields a
+        ``matched`` event as its search result arrives, then ``success`` (or
+        ``error``) once its batch commits. Every requested id gets exactly one
+        final status: success, no_change, failed or error.
+        """
+        songs = db.query(Song).filter(Song.id.in_(song_ids), Song.user_id == user_id).all()
+        songs_by_id = {song.id: song for song in songs}
+
+        for song_id in song_ids:
+            if song_id not in songs_by_id:
+                yield {"song_id": song_id, "status": "failed", "song": None,
+                       "message": f"Failed to enhance song {song_id} (not found)"}
+
+        if sp is None:
+            sp = self.repository.get_spotify_client()
+        if sp is None:
+            for song in songs:
+                yield {"song_id": song.id, "status": "error", "song": None,
+                       "message": "Spotify credentials not configured"}
+            return
+
+        # Build queries up front: worker threads must not touch the session
+        queries = [(song.id, f"{song.title} {song.artist}".strip()) for song in songs]
+
+        def search(item: Tuple[int, str]) -> Optional[dict]:
+            results = sp.search(q=item[1], type="track", limit=1)
+            items = (results.get("tracks") or {}).get("items") or []
+            return items[0] if items else None
+
+        pending: List[Tuple[Song, Optional[str], Optional[str]]] = []
+        for (song_id, _), track, error in map_concurrent(search, queries, self.max_workers):
+            song = songs_by_id[song_id]
+            if error is not None:
+                print(f"Failed to enhance song {song_id}: {error}")
+                yield {"song_id": song_id, "status": "error", "song": None,
+                       "message": f"Error enhancing song {song_id}: {error}"}
+                continue
+            if not track:
+                yield {"song_id": song_id, "status": "no_change", "song": None,
+                       "message": f"No enhancement applied: {song.title}"}
+                continue
+
+            artist_name, spotify_artist_id = SongEnhancementService.apply_track_data(
+                song, track, preserve_artist_album
+            )
+            pending.append((song, artist_name, spotify_artist_id))
+            yield {"song_id": song_id, "status": "matched", "song": None,
+                   "message": f"Matched: {song.title}"}
+            if len(pending) >= self.commit_every:
+                yield from self._flush(db, sp, pending, preserve_artist_album)
+                pending = []
+
+        if pending:
+            yield from self._flush(db, sp, pending, preserve_artist_album)
+
+    def _flush(self, db: Session, sp, pending: List[Tuple[Song, Optional[str], Optional[str]]],
+               preserve_artist_album: bool) -> Iterator[Dict]:
+        """Resolve the batch's artists, commit, and report each song."""
+        try:
+            self._resolve_artists(db, sp, pending, preserve_artist_album)
+            db.commit()
+        except Exception as e:
+            print(f"Failed to commit enhancement batch: {e}")
+            db.rollback()
+            for song, _, _ in pending:
+                yield {"song_id": song.id, "status": "error", "song": None,
+                       "message": f"Error enhancing song {song.id}: {e}"}
+            return
+
+        for song, _, _ in pending:
+            yield {"song_id": song.id, "status": "success", "song": song,
+                   "message": f"Enhanced: {song.title}"}
+
+    def _resolve_artists(self, db: Session, sp, pending: List[Tuple[Song, Optional[str], Optional[str]]],
+                         preserve_artist_album: bool):
+        """Create missing artists and fill missing images with batched lookups."""
+        spotify_ids: Dict[str, Optional[str]] = {}
+        for _, artist_name, spotify_artist_id in pending:
+            if artist_name and not spotify_ids.get(artist_name):
+                spotify_ids[artist_name] = spotify_artist_id
+        if not spotify_ids:
+            return
+
+        artists = {
+            artist.name: artist
+            for artist in db.query(Artist).filter(Artist.name.in_(list(spotify_ids))).all()
+        }
+        needs_image = [
+            spotify_ids[name] for name in spotify_ids
+            if spotify_ids[name] and (name not in artists or not artists[name].image_url)
+        ]
+        images = self._fetch_artist_images(sp, needs_image)
+
+        for name, spotify_artist_id in spotify_ids.items():
+            image_url = images.get(spotify_artist_id)
+            artist = artists.get(name)
+            if artist is None:
+                artist = self.repository.create_artist(db, name, image_url)
+                if artist:
+                    artists[name] = artist
+            elif image_url and not artist.image_url:
+                artist.image_url = image_url
+
+        if preserve_artist_album:
+            return
+        for song, artist_name, _ in pending:
+            artist = artists.get(artist_name)
+            if artist:
+                song.artist = artist_name
+                song.artist_id = artist.id
+
+    @staticmethod
+    def _fetch_artist_images(sp, spotify_artist_ids: List[str]) -> Dict[str, str]:
+        """Spotify artist id -> first image URL, SPOTIFY_ARTISTS_BATCH_SIZE ids per call."""
+        images: Dict[str, str] = {}
+        ids = list(dict.fromkeys(spotify_artist_ids))
+        for start in range(0, len(ids), SPOTIFY_ARTISTS_BATCH_SIZE):
+            chunk = ids[start:start + SPOTIFY_ARTISTS_BATCH_SIZE]
+            try:
+                response = sp.artists(chunk) or {}
+            except Exception as e:
+                print(f"Failed to fetch artists batch from Spotify: {e}")
+                continue
+            for artist_data in response.get("artists") or []:
+                if artist_data and artist_data.get("images"):
+                    images[artist_data["id"]] = artist_data["images"][0].get("url")
+        return images
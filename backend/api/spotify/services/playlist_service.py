@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from models import SongStatus, Song
 from schemas import SongCreate
 from api.data_access import create_song_in_db
+from api.songs.services.song_jobs import enqueue_song_enhancement
 from ..repositories.spotify_repository import SpotifyRepository
 from ..validators.spotify_validators import SpotifyPlaylistImportRequest
 
@@ -42,6 +43,7 @@ class PlaylistService:
                 pack_id = new_pack.id
 
         imported_count = 0
+        imported_song_ids = []
         skipped_songs = []
         failed_songs = []
 
@@ -85,7 +87,8 @@ class PlaylistService:
                 song_payload = SongCreate(**song_kwargs)
 
                 try:
-                    create_song_in_db(db, song_payload, current_user, auto_enhance=True)
+                    song = create_song_in_db(db, song_payload, current_user, auto_enhance=False)
+                    imported_song_ids.append(song.id)
                     imported_count += 1
                 except Exception as e:
                     # Skip duplicates; log and continue on other errors
@@ -128,6 +131,14 @@ class PlaylistService:
                 print(f"⚠️ Failed to clean remaster tags: {e}")
                 # Don't fail the import if cleaning fails
 
+        # Spotify enhancement of the imported songs runs in a background job
+        try:
+            enqueue_song_enhancement(db, current_user.id, imported_song_ids)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Failed to queue enhancement for imported songs: {e}")
+
         return {
             "imported_count": imported_count,
             "skipped_songs": skipped_songs,
@@ -34,28 +34,7 @@ class SongEnhancementService:
                 return None
             print(f"Successfully fetched track: {track.get('name', 'Unknown')} by {track.get('artists', [{}])[0].get('name', 'Unknown')}")
 
-            album = track.get("album") or {}
-            images = album.get("images") or []
-            year = None
-            rd = album.get("release_date")
-            if isinstance(rd, str) and len(rd) >= 4 and rd[:4].isdigit():
-                year = int(rd[:4])
-
-            # Only update album if we're not preserving it
-            if not preserve_artist_album:
-                album_name = album.get("name")
-                song.album = album_name or song.album
-            
-            # Always update album cover and year
-            if images:
-                song.album_cover = images[0].get("url") or song.album_cover
-            if year:
-                song.year = year
-
-            # Handle artist creation/update
-            first_artist = (track.get("artists") or [{}])[0]
-            artist_name = first_artist.get("name")
-            spotify_artist_id = first_artist.get("id")  # Use Spotify artist ID for accurate image lookup
+            artist_name, spotify_artist_id = self.apply_track_data(song, track, preserve_artist_album)
             if artist_name:
                 artist = self._ensure_artist_exists(db, sp, artist_name, spotify_artist_id)
                 
@@ -78,6 +57,36 @@ class SongEnhancementService:
             db.rollback()
             return None
 
+    @staticmethod
+    def apply_track_data(song: Song, track: dict, preserve_artist_album: bool = False):
+        """
+        Copy album, cover and year from a Spotify track object onto a song.
+        
+        Returns the track's first (artist name, Spotify artist id); the caller
+        resolves the Artist row, since that may need another API call.
+        """
+        album = track.get("album") or {}
+        images = album.get("images") or []
+        year = None
+        rd = album.get("release_date")
+        if isinstance(rd, str) and len(rd) >= 4 and rd[:4].isdigit():
+            year = int(rd[:4])
+
+        # Only update album if we're not preserving it
+        if not preserve_artist_album:
+            album_name = album.get("name")
+            song.album = album_name or song.album
+        
+        # Always update album cover and year
+        if images:
+            song.album_cover = images[0].get("url") or song.album_cover
+        if year:
+            song.year = year
+
+        # Use Spotify artist ID for accurate image lookup
+        first_artist = (track.get("artists") or [{}])[0]
+        return first_artist.get("name"), first_artist.get("id")
+
     def auto_enhance_song(self, song_id: int, db: Session, preserve_artist_album: bool = False) -> bool:
         """Automatically enhance song by searching for it on Spotify."""
         sp = self.repository.get_spotify_client()
@@ -11,7 +11,7 @@ Handles:
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import List
+from typing import List, Optional
 from database import get_db
 from api.auth import get_current_active_user
 from api.activity_logger import log_activity
@@ -20,6 +20,9 @@ from workflow_schemas import (
     SongProgressOut, SongProgressUpdate, BulkProgressUpdate,
     WorkflowSummary
 )
+from utils.cache import SingleFlight, cache, user_tag
+from utils.metrics import record_cache_lookup
+from services.completion_cache import bump_workflow_version
 import time
 
 # TODO: Import the new workflow models once they're integrated into models.py
@@ -27,54 +30,61 @@ import time
 
 router = APIRouter(prefix="/workflows", tags=["workflows"])
 
-# Simple workflow cache with TTL
-_workflow_cache = {}
 WORKFLOW_CACHE_TTL = 600  # 10 minutes - workflows don't change often
+WORKFLOW_CACHE_TAG = "workflows"
+# Concurrent misses for the same user share a single load
+_workflow_flight = SingleFlight()
 
-def clear_workflow_cache():
-    """Clear the workflow cache - call when workflows are updated"""
-    global _workflow_cache
-    _workflow_cache.clear()
+def _workflow_cache_key(user_id: int) -> str:
+    return f"workflow:{user_id}"
+
+def clear_workflow_cache(user_id: Optional[int] = None):
+    """Clear cached workflows (one user's, or all) - call when workflows are updated"""
+    if user_id is None:
+        cache.invalidate_tag(WORKFLOW_CACHE_TAG)
+    else:
+        cache.delete(_workflow_cache_key(user_id))
 
 def _get_cached_workflow(user_id: int):
     """Get workflow from cache if not expired"""
-    if user_id in _workflow_cache:
-        workflow, timestamp = _workflow_cache[user_id]
-        if time.time() - timestamp < WORKFLOW_CACHE_TTL:
-            return workflow
-        else:
-            del _workflow_cache[user_id]
-    return None
+    workflow = cache.get(_workflow_cache_key(user_id))
+    record_cache_lookup("workflow", workflow is not None)
+    return workflow
 
 def _cache_workflow(user_id: int, workflow):
-    """Cache workflow with timestamp"""
-    _workflow_cache[user_id] = (workflow, time.time())
+    """Cache workflow for WORKFLOW_CACHE_TTL seconds"""
+    cache.set(
+        _workflow_cache_key(user_id),
+        workflow,
+        ttl=WORKFLOW_CACHE_TTL,
+        tags=[WORKFLOW_CACHE_TAG, user_tag(user_id)],
+    )
+
+def _get_or_load_workflow(db: Session, user_id: int, not_found_detail: str):
+    """Return the cached workflow for a user, loading it once if missing."""
+    cached_workflow = _get_cached_workflow(user_id)
+    if cached_workflow is not None:
+        return cached_workflow
 
+    def load():
+        # Another request may have filled the cache while we waited for the flight
+        cached_workflow = _get_cached_workflow(user_id)
+        if cached_workflow is not None:
+            return cached_workflow
+        workflow_data = _load_workflow(db, user_id, not_found_detail)
+        _cache_workflow(user_id, workflow_data)
+        return workflow_data
 
-# ========================================
-# User Workflows
-# ========================================
+    return _workflow_flight.do(user_id, load)
 
-@router.get("/my-workflow", response_model=UserWorkflowOut)
-async def get_my_workflow(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
-):
-    """Get the current user's workflow configuration (SQLite-compatible)."""
-    # Try cache first
-    cached_workflow = _get_cached_workflow(current_user.id)
-    if cached_workflow is not None:
-        return cached_workflow
-    
+def _load_workflow(db: Session, user_id: int, not_found_detail: str):
+    """Load a user's workflow and its steps from the database."""
     # Load user's workflow - REQUIRED, no fallback to templates
-    result = db.execute(text("SELECT id, user_id, name, description, template_id, created_at, updated_at FROM user_workflows WHERE user_id = :uid"), {"uid": current_user.id}).fetchone()
+    result = db.execute(text("SELECT id, user_id, name, description, template_id, created_at, updated_at FROM user_workflows WHERE user_id = :uid"), {"uid": user_id}).fetchone()
     if not result:
         # User has no workflow - this should never happen if registration worked correctly
         # But we don't create one from templates - user must configure it
-        raise HTTPException(
-            status_code=404,
-            detail="USER_WORKFLOW_NOT_CONFIGURED: No workflow found. Please configure your workflow."
-        )
+        raise HTTPException(status_code=404, detail=not_found_detail)
 
     workflow_id = result[0]
     steps = db.execute(text("""
@@ -82,7 +92,7 @@ async def get_my_workflow(
         FROM user_workflow_steps WHERE workflow_id = :wid ORDER BY order_index
     """), {"wid": workflow_id}).fetchall()
 
-    workflow_data = {
+    return {
         "id": result[0],
         "user_id": result[1],
         "name": result[2],
@@ -101,10 +111,23 @@ async def get_my_workflow(
             for s in steps
         ],
     }
-    
-    # Cache the result
-    _cache_workflow(current_user.id, workflow_data)
-    return workflow_data
+
+
+# ========================================
+# User Workflows
+# ========================================
+
+@router.get("/my-workflow", response_model=UserWorkflowOut)
+def get_my_workflow(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """Get the current user's workflow configuration (SQLite-compatible)."""
+    return _get_or_load_workflow(
+        db,
+        current_user.id,
+        "USER_WORKFLOW_NOT_CONFIGURED: No workflow found. Please configure your workflow."
+    )
 
 @router.get("/my-workflow/summary", response_model=WorkflowSummary)
 async def get_my_workflow_summary(
@@ -115,7 +138,7 @@ async def get_my_workflow_summary(
     raise HTTPException(status_code=404, detail="Not implemented yet")
 
 @router.get("/user/{user_id}", response_model=UserWorkflowOut)
-async def get_user_workflow(
+def get_user_workflow(
     user_id: int,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
@@ -123,52 +146,13 @@ async def get_user_workflow(
     """Get a specific user's workflow configuration (for collaboration songs).
     This ensures collaborators see the owner's workflow steps.
     """
-    # Try cache first
-    cached_workflow = _get_cached_workflow(user_id)
-    if cached_workflow is not None:
-        return cached_workflow
-    
-    # Load user's workflow - REQUIRED, no fallback to templates
-    result = db.execute(text("SELECT id, user_id, name, description, template_id, created_at, updated_at FROM user_workflows WHERE user_id = :uid"), {"uid": user_id}).fetchone()
-    
-    if not result:
-        # User has no workflow - this should never happen if registration worked correctly
-        # But we don't create one from templates - user must configure it
-        raise HTTPException(
-            status_code=404,
-            detail="USER_WORKFLOW_NOT_CONFIGURED: No workflow found for this user. Please ask them to configure their workflow."
-        )
-
-    workflow_id = result[0]
-    steps = db.execute(text("""
-        SELECT id, workflow_id, step_name, display_name, order_index
-        FROM user_workflow_steps WHERE workflow_id = :wid ORDER BY order_index
-    """), {"wid": workflow_id}).fetchall()
-
-    workflow_data = {
-        "id": result[0],
-        "user_id": result[1],
-        "name": result[2],
-        "description": result[3],
-        "template_id": result[4],
-        "created_at": result[5],
-        "updated_at": result[6],
-        "steps": [
-            {
-                "id": s[0],
-                "workflow_id": s[1],
-                "step_name": s[2],
-                "display_name": s[3],
-                "order_index": s[4],
-            }
-            for s in steps
-        ],
-    }
-    
-    # Cache the result
-    _cache_workflow(user_id, workflow_data)
+    start_time = time.time()
+    workflow_data = _get_or_load_workflow(
+        db,
+        user_id,
+        "USER_WORKFLOW_NOT_CONFIGURED: No workflow found for this user. Please ask them to configure their workflow."
+    )
     total_time = time.time() - start_time
-    print(f"[WORKFLOW] Total time for user {user_id}: {total_time:.3f}s")
     
     if total_time > 1.0:
         print(f"[WORKFLOW] WARNING: Workflow fetch took {total_time:.3f}s - this is unusually slow!")
@@ -290,8 +274,9 @@ async def update_my_workflow(
     db.commit()
     
     # Clear cache for this user since workflow was updated
-    if current_user.id in _workflow_cache:
-        del _workflow_cache[current_user.id]
+    clear_workflow_cache(current_user.id)
+    # Completion of every song the user owns depends on their steps
+    bump_workflow_version(current_user.id)
     
     updated_sections = []
     if workflow_update.name is not None or getattr(workflow_update, 'description', None) is not None:
@@ -314,7 +299,7 @@ async def update_my_workflow(
         print(f"⚠️ Failed to log workflow update: {log_err}")
     
     # Return updated workflow
-    return await get_my_workflow(db, current_user)
+    return get_my_workflow(db, current_user)
 
 @router.post("/reset-to-default", response_model=UserWorkflowOut)
 async def reset_to_default(
@@ -347,8 +332,8 @@ async def reset_to_default(
     db.commit()
     
     # Clear cache for this user since workflow was reset
-    if current_user.id in _workflow_cache:
-        del _workflow_cache[current_user.id]
+    clear_workflow_cache(current_user.id)
+    bump_workflow_version(current_user.id)
     
     try:
         log_activity(
@@ -364,7 +349,7 @@ async def reset_to_default(
     except Exception as log_err:
         print(f"⚠️ Failed to log workflow reset: {log_err}")
     
-    return await get_my_workflow(db, current_user)
+    return get_my_workflow(db, current_user)
 
 # ========================================
 # Song Progress Tracking
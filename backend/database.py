@@ -2,8 +2,11 @@
 
 from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from models import Base
+from utils.metrics import DB_POOL_CHECKOUT_SECONDS, DB_POOL_CONNECTIONS
 import os
+import time
 import logging
 
 SQLALCHEMY_DATABASE_URL = os.environ.get(
@@ -27,9 +30,20 @@ elif SQLALCHEMY_DATABASE_URL.startswith("postgresql"):
     # Use 'require' for Supabase pooler to ensure SSL connections
     connect_args["sslmode"] = "require"
 
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
     connect_args=connect_args,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,  # Verify connections before using them (handles dead connections)
     pool_recycle=180,  # Recycle connections after 3 minutes (Supabase pooler timeout is often 5-10 min)
     # Balanced settings for development and production
@@ -41,6 +55,11 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
 
+# Opt-in per-request query counting / N+1 detection (QUERY_PROFILER_ENABLED=1)
+from utils.query_profiler import QUERY_PROFILER_ENABLED, install_query_listeners
+if QUERY_PROFILER_ENABLED:
+    install_query_listeners(engine)
+
 # Safe migrations - don't block server startup
 def run_migrations():
     """Run database migrations safely without blocking startup"""
@@ -62,6 +81,18 @@ def _safe_migration(migration_name: str, migration_func):
 
 
 
+def _collect_pool_connections():
+    """Pool gauges, read at scrape time instead of logging on every checkout."""
+    pool = engine.pool
+    return [
+        (("in_use",), pool.checkedout()),
+        (("idle",), pool.checkedin()),
+        (("overflow",), max(pool.overflow(), 0)),
+        (("size",), pool.size()),
+    ]
+
+DB_POOL_CONNECTIONS.add_collector(_collect_pool_connections)
+
 # Temporarily disabled connection monitoring to reduce overhead
 # if not SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
 #     @event.listens_for(engine, "connect")
@@ -97,3 +128,10 @@ def get_db():
             # If close fails, the connection is likely already dead
             # The pool will handle cleanup via pool_pre_ping
             pass
+
+
+# Mapper/session listeners that keep caches and rollups in step with writes.
+# Registered here so every process that opens a session loads them, including
+# the external job worker, which never imports the API routers.
+import services.public_song_cache  # noqa: E402,F401
+import services.stats_rollup  # noqa: E402,F401
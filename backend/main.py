@@ -57,10 +57,16 @@ try:
     from api.community import router as community_router
     from api.public_profiles import router as public_profiles_router
     from api import updates as updates
+    from api import metrics as metrics
+    from api import jobs as jobs
     from api.community_events.routes.event_routes import router as community_events_router
     from api.community_events.routes.admin_routes import router as community_events_admin_router
     from database import engine, SQLALCHEMY_DATABASE_URL, get_db
     from models import Base
+    from utils.query_profiler import QUERY_PROFILER_ENABLED, QueryProfilerMiddleware
+    from utils.metrics import MetricsMiddleware
+    from services.job_queue import start_job_worker, stop_job_worker
+    from api.activity_logger import flush_activity_logs
 except ImportError as e:
     print(f"CRITICAL: Failed to import route modules: {e}")
     print(f"Traceback: {traceback.format_exc()}")
@@ -75,14 +81,8 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Request logging middleware (disabled in production for cleaner logs)
-# @app.middleware("http")
-# async def log_requests(request, call_next):
-#     import time
-#     start_time = time.time()
-#     response = await call_next(request)
-#     process_time = time.time() - start_time
-#     return response
+# Per-route latency histograms and error counters, exported at /metrics
+app.add_middleware(MetricsMiddleware)
 
 # Add trusted host middleware to handle Railway's forwarded headers
 app.add_middleware(
@@ -124,6 +124,10 @@ app.add_middleware(
 # Add GZip compression for better performance
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
+# Per-request query count / DB time headers and N+1 warnings (opt-in)
+if QUERY_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
+
 # No need to mount static files for uploads
 
 # Create tables with error handling - don't block startup
@@ -158,6 +162,8 @@ app.include_router(collaboration_requests_router, prefix="/api")
 app.include_router(community_router)
 app.include_router(public_profiles_router, prefix="/api")
 app.include_router(updates.router, prefix="/api")
+app.include_router(metrics.router)
+app.include_router(jobs.router)
 app.include_router(community_events_router, prefix="/api")
 app.include_router(community_events_admin_router, prefix="/api")
 
@@ -169,12 +175,19 @@ async def startup_event():
     try:
         print("🚀 Starting TrackFlow API...")
         init_db()
+        start_job_worker()
         print("✅ TrackFlow API started successfully")
     except Exception as e:
         print(f"❌ CRITICAL: Failed to start TrackFlow API: {e}")
         print(f"Traceback: {traceback.format_exc()}")
         # Don't exit - let the server start anyway, but log the error
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the in-process background job worker and write buffered activity logs"""
+    stop_job_worker()
+    flush_activity_logs()
+
 # Global exception handler to prevent crashes (but don't catch HTTPExceptions)
 from fastapi.exceptions import HTTPException as FastAPIHTTPException
 
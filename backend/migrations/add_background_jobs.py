@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Migration: Add background_jobs table for the persisted job queue
+
+Side effects of song writes (activity log, achievement checks, notifications,
+Spotify enhancement) are queued here and run by services/job_queue.py workers.
+
+Run with:
+    python -m migrations.add_background_jobs
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+from models import BackgroundJob
+
+def run_migration():
+    """Create the background_jobs table and its indexes"""
+    
+    print("🗃️ Creating background_jobs table...")
+    
+    try:
+        # checkfirst keeps this safe to rerun; dialect-specific DDL comes from the model
+        BackgroundJob.__table__.create(bind=engine, checkfirst=True)
+        print("✅ background_jobs table ready")
+        
+    except Exception as e:
+        print(f"❌ Error during migration: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,54 @@
+"""
+Migration: Add rock_band_dlc.updated_at
+
+The in-memory DLC index (services/dlc_index.py) includes max(updated_at) in
+its staleness stamp, so in-place edits to DLC rows are picked up like imports.
+Existing rows are backfilled from created_at.
+
+Run with:
+    python -m migrations.add_dlc_updated_at
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+from sqlalchemy import text
+from database import engine, SQLALCHEMY_DATABASE_URL
+
+
+def run_migration():
+    """Add and backfill rock_band_dlc.updated_at."""
+
+    is_postgres = SQLALCHEMY_DATABASE_URL.startswith("postgresql")
+
+    print(f"🔄 Running migration on {'PostgreSQL' if is_postgres else 'SQLite'}...")
+
+    with engine.connect() as conn:
+        print("\n🎸 Checking rock_band_dlc.updated_at...")
+        if is_postgres:
+            result = conn.execute(text("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_name = 'rock_band_dlc' AND column_name = 'updated_at'
+            """))
+            exists = result.fetchone() is not None
+        else:
+            result = conn.execute(text("PRAGMA table_info(rock_band_dlc)"))
+            exists = 'updated_at' in [row[1] for row in result.fetchall()]
+
+        if not exists:
+            print("   ➕ Adding rock_band_dlc.updated_at column...")
+            conn.execute(text(f"ALTER TABLE rock_band_dlc ADD COLUMN updated_at {'TIMESTAMP' if is_postgres else 'DATETIME'} NULL"))
+            conn.commit()
+            print("   ✅ Added rock_band_dlc.updated_at")
+        else:
+            print("   ✓ Column already exists")
+
+        result = conn.execute(text("UPDATE rock_band_dlc SET updated_at = created_at WHERE updated_at IS NULL"))
+        conn.commit()
+        print(f"   ✅ Backfilled {result.rowcount} rows")
+
+    print("\n✅ Migration complete!")
+
+
+if __name__ == "__main__":
+    run_migration()
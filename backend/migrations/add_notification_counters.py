@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Migration: Add notification_counters table for the notification badge
+
+Seeds a counter for every user that already has notifications; users without
+a row are counted on their first badge poll.
+
+Run with:
+    python -m migrations.add_notification_counters
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime
+
+from sqlalchemy import case, func, insert, literal, select, DateTime
+
+from database import engine
+from models import Notification, NotificationCounter
+
+def run_migration():
+    """Create the notification_counters table and seed it from notifications"""
+    
+    print("🗃️ Creating notification_counters table...")
+    
+    try:
+        NotificationCounter.__table__.create(bind=engine, checkfirst=True)
+        
+        with engine.begin() as conn:
+            seeded = select(
+                Notification.user_id,
+                func.sum(case((Notification.is_read == False, 1), else_=0)),
+                func.count(Notification.id),
+                literal(datetime.utcnow(), DateTime),
+            ).where(
+                Notification.user_id.notin_(select(NotificationCounter.user_id))
+            ).group_by(Notification.user_id)
+            result = conn.execute(
+                insert(NotificationCounter).from_select(
+                    ["user_id", "unread_count", "total_count", "updated_at"], seeded
+                )
+            )
+        print(f"✅ notification_counters table ready ({result.rowcount} users seeded)")
+        
+    except Exception as e:
+        print(f"❌ Error during migration: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,82 @@
+"""
+Migration: Add songs.fingerprint for cross-user song matching
+
+Adds a normalized "artist|title" key (see utils.normalization.song_fingerprint),
+indexes it and backfills existing rows in batches. New and edited songs keep it
+up to date through a mapper event on Song.
+
+Run with:
+    python -m migrations.add_song_fingerprint
+"""
+
+import sys
+sys.path.insert(0, '.')
+
+from sqlalchemy import text
+from database import engine, SQLALCHEMY_DATABASE_URL
+from utils.normalization import song_fingerprint
+
+BATCH_SIZE = 1000
+
+
+def run_migration():
+    """Add, index and backfill songs.fingerprint."""
+
+    is_postgres = SQLALCHEMY_DATABASE_URL.startswith("postgresql")
+
+    print(f"🔄 Running migration on {'PostgreSQL' if is_postgres else 'SQLite'}...")
+
+    with engine.connect() as conn:
+        print("\n🎵 Checking songs.fingerprint...")
+        if is_postgres:
+            result = conn.execute(text("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_name = 'songs' AND column_name = 'fingerprint'
+            """))
+            exists = result.fetchone() is not None
+        else:
+            result = conn.execute(text("PRAGMA table_info(songs)"))
+            exists = 'fingerprint' in [row[1] for row in result.fetchall()]
+
+        if not exists:
+            print("   ➕ Adding songs.fingerprint column...")
+            conn.execute(text("ALTER TABLE songs ADD COLUMN fingerprint VARCHAR NULL"))
+            conn.commit()
+            print("   ✅ Added songs.fingerprint")
+        else:
+            print("   ✓ Column already exists")
+
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_songs_fingerprint ON songs (fingerprint)"))
+        conn.commit()
+        print("   ✅ Index ix_songs_fingerprint ready")
+
+        # Backfill in id order so a rerun resumes where it stopped
+        print("\n🔁 Backfilling fingerprints...")
+        last_id = 0
+        updated = 0
+        while True:
+            rows = conn.execute(text("""
+                SELECT id, title, artist FROM songs
+                WHERE fingerprint IS NULL AND id > :last_id
+                ORDER BY id
+                LIMIT :limit
+            """), {"last_id": last_id, "limit": BATCH_SIZE}).fetchall()
+            if not rows:
+                break
+
+            conn.execute(
+                text("UPDATE songs SET fingerprint = :fingerprint WHERE id = :id"),
+                [{"id": row[0], "fingerprint": song_fingerprint(row[1], row[2])} for row in rows],
+            )
+            conn.commit()
+            last_id = rows[-1][0]
+            updated += len(rows)
+            print(f"   ... {updated} songs")
+
+        print(f"   ✅ Backfilled {updated} songs")
+
+    print("\n✅ Migration complete!")
+
+
+if __name__ == "__main__":
+    run_migration()
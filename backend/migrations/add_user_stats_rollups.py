@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Migration: Add user_stats_rollups table for the /stats dashboard
+
+Rows are built on each user's first stats request (services/stats_rollup.py),
+so nothing needs backfilling.
+
+Run with:
+    python -m migrations.add_user_stats_rollups
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine
+from models import UserStatsRollup
+
+def run_migration():
+    """Create the user_stats_rollups table"""
+    
+    print("🗃️ Creating user_stats_rollups table...")
+    
+    try:
+        UserStatsRollup.__table__.create(bind=engine, checkfirst=True)
+        print("✅ user_stats_rollups table ready")
+        
+    except Exception as e:
+        print(f"❌ Error during migration: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+
+if __name__ == "__main__":
+    run_migration()
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Enum, UniqueConstraint, Index
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Enum, UniqueConstraint, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import enum
 
+from utils.normalization import song_fingerprint
+
 Base = declarative_base()
 
 
@@ -147,6 +149,9 @@ class Song(Base):
     preview_link = Column(String, nullable=True)  # Optional preview/video URL for event submission
     is_event_submitted = Column(Boolean, default=False, index=True)  # Marks song as submitted/ready for event
     
+    # Normalized "artist|title" key for cross-user matching, maintained on flush
+    fingerprint = Column(String, nullable=True, index=True)
+    
     # Composite indexes for common query patterns
     __table_args__ = (
         Index('idx_song_user_status', 'user_id', 'status'),
@@ -170,6 +175,13 @@ class Song(Base):
     album_series_id = Column(Integer, ForeignKey("album_series.id"), nullable=True, index=True)
     album_series_obj = relationship("AlbumSeries", foreign_keys=[album_series_id], uselist=False)
 
+
+@event.listens_for(Song, "before_insert")
+@event.listens_for(Song, "before_update")
+def _set_song_fingerprint(mapper, connection, target):
+    # Bulk query.update() bypasses this; callers changing title/artist that way must set fingerprint too
+    target.fingerprint = song_fingerprint(target.title, target.artist)
+
 class Collaboration(Base):
     __tablename__ = "collaborations"
     
@@ -321,6 +333,7 @@ class RockBandDLC(Base):
     linked_song_id = Column(Integer, ForeignKey("songs.id"), nullable=True, index=True)  # Link to our songs if matched
     
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)  # Part of the DLC index's staleness stamp
     
     # Composite indexes for common query patterns
     __table_args__ = (
@@ -462,6 +475,21 @@ class UserStats(Base):
     # Relationships
     user = relationship("User", uselist=False)
 
+class UserStatsRollup(Base):
+    """
+    Precomputed /stats dashboard aggregates for one user (see services/stats_rollup.py).
+    
+    Song and collaboration writes bump ``version``; the rollup is rebuilt on the
+    next read whenever ``built_version`` lags behind it.
+    """
+    __tablename__ = "user_stats_rollups"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    stats_json = Column(Text, nullable=True)
+    version = Column(Integer, default=0, nullable=False)
+    built_version = Column(Integer, default=-1, nullable=False)
+    computed_at = Column(DateTime, nullable=True)
+
 class NotificationType(str, enum.Enum):
     ACHIEVEMENT_EARNED = "achievement_earned"
     COMMENT_REPLY = "comment_reply"
@@ -546,6 +574,18 @@ class Notification(Base):
         Index('idx_notification_related_song', 'related_song_id'),
     )
 
+class NotificationCounter(Base):
+    """
+    Per-user unread/total notification counts backing the notification badge.
+    Kept in sync by api/notifications/repositories/notification_counter_repository.py.
+    """
+    __tablename__ = "notification_counters"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread_count = Column(Integer, default=0, nullable=False)
+    total_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class ReleasePost(Base):
     """Admin-managed release posts for the home page"""
     __tablename__ = "release_posts"
@@ -736,3 +776,39 @@ class CommunityEventRegistration(Base):
     # Relationships
     pack = relationship("Pack", back_populates="event_registrations")
     user = relationship("User")
+
+
+class BackgroundJobStatus(str, enum.Enum):
+    """Status for background jobs"""
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class BackgroundJob(Base):
+    """
+    Persisted job for slow side effects of a write (activity log, achievement
+    checks, notifications, Spotify enhancement). See services/job_queue.py.
+    """
+    __tablename__ = "background_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    payload_json = Column(Text, nullable=True)  # JSON string of handler arguments
+    
+    status = Column(String, default="queued", nullable=False)  # BackgroundJobStatus values
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    last_error = Column(Text, nullable=True)
+    
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)  # Not picked up before this (retry backoff)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_job_pending', 'status', 'run_after'),
+        Index('idx_job_dedupe', 'user_id', 'job_type', 'status'),
+    )
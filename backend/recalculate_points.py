@@ -15,46 +15,24 @@ def recalculate_all_user_points():
     print("🔄 Starting total_points recalculation for all users...")
     
     with next(get_db()) as db:
-        # Get all users who have user_stats records
-        users_with_stats = db.execute(text("""
-            SELECT user_id FROM user_stats
-        """)).fetchall()
+        # One set-based UPDATE instead of a SUM and an UPDATE per user
+        result = db.execute(text("""
+            UPDATE user_stats
+            SET total_points = (
+                SELECT COALESCE(SUM(a.points), 0)
+                FROM user_achievements ua
+                JOIN achievements a ON ua.achievement_id = a.id
+                WHERE ua.user_id = user_stats.user_id
+            )
+        """))
         
-        if not users_with_stats:
+        if not result.rowcount:
             print("ℹ️ No users found with user_stats records")
             return
-            
-        print(f"📊 Found {len(users_with_stats)} users with stats records")
-        
-        updated_count = 0
-        for (user_id,) in users_with_stats:
-            # Calculate total points for this user from their achievements
-            result = db.execute(text("""
-                SELECT COALESCE(SUM(a.points), 0) as total_points
-                FROM user_achievements ua
-                JOIN achievements a ON ua.achievement_id = a.id
-                WHERE ua.user_id = :user_id
-            """), {"user_id": user_id}).fetchone()
-            
-            total_points = result[0] if result else 0
-            
-            # Update the user_stats table with the calculated points
-            db.execute(text("""
-                UPDATE user_stats 
-                SET total_points = :total_points
-                WHERE user_id = :user_id
-            """), {"total_points": total_points, "user_id": user_id})
-            
-            if total_points > 0:
-                print(f"📊 User {user_id}: {total_points} points")
-                updated_count += 1
-            else:
-                print(f"📊 User {user_id}: 0 points (no achievements)")
         
         # Commit all changes
         db.commit()
-        print(f"✅ Total points recalculation completed!")
-        print(f"📈 Updated {updated_count} users with non-zero points")
+        print(f"✅ Total points recalculation completed for {result.rowcount} users!")
         
         # Show summary statistics
         stats = db.execute(text("""
@@ -421,4 +421,20 @@ class UpdateOut(BaseModel):
     updated_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class BackgroundJobOut(BaseModel):
+    id: int
+    job_type: str
+    status: str
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    run_after: datetime
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
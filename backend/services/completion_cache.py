@@ -1,141 +1,186 @@
 """
 Caching service for song completion data to improve dashboard performance.
 
-This module provides a TTL-based cache for completion data to avoid redundant
-database queries when the same songs are requested multiple times.
+Completion is cached per song, keyed by song id and stamped with the owner id
+and the owner's workflow version. Overlapping dashboard pages reuse each other's
+entries, a progress update invalidates exactly one entry, and a workflow change
+invalidates all of the owner's songs at once by bumping the version.
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+from collections import OrderedDict
 from datetime import datetime, timedelta
-import hashlib
-import json
+import threading
 
-# Cache entry structure: (data, expiry_time)
-_cache: Dict[str, Tuple[Dict[int, Dict[str, Any]], datetime]] = {}
+from utils.metrics import CACHE_REQUESTS_TOTAL
+
+# Cache entry structure: song_id -> (owner_id, workflow_version, data, expiry_time)
+_cache: "OrderedDict[int, Tuple[Optional[int], int, Dict[str, Any], datetime]]" = OrderedDict()
+_workflow_versions: Dict[int, int] = {}
+_lock = threading.Lock()
 _cache_ttl_seconds = 300  # 5 minutes default TTL
+_max_entries = 20000
 
+_hits = 0
+_misses = 0
 
-def _make_cache_key(song_ids: List[int], include_remaining_steps: bool) -> str:
-    """Generate a cache key from song IDs and options."""
-    # Sort song IDs for consistent keys
-    sorted_ids = sorted(song_ids)
-    key_data = {
-        "song_ids": sorted_ids,
-        "include_remaining_steps": include_remaining_steps,
-    }
-    key_str = json.dumps(key_data, sort_keys=True)
-    return hashlib.md5(key_str.encode()).hexdigest()
+CACHE_REQUESTS_TOTAL.add_collector(
+    lambda: [(("completion", "hit"), _hits), (("completion", "miss"), _misses)]
+)
+
+
+def get_workflow_version(owner_id: Optional[int]) -> int:
+    """Current workflow version for a song owner (0 until their workflow changes)."""
+    return _workflow_versions.get(owner_id, 0)
+
+
+def bump_workflow_version(owner_id: int):
+    """
+    Invalidate every cached song of an owner.
+
+    Call after the owner's workflow steps change, since that changes
+    completion for all of their songs.
+    """
+    with _lock:
+        _workflow_versions[owner_id] = _workflow_versions.get(owner_id, 0) + 1
+
+
+def _shape(data: Dict[str, Any], include_remaining_steps: bool) -> Dict[str, Any]:
+    """Entries always hold remaining steps; strip them if the caller didn't ask."""
+    if include_remaining_steps:
+        return data
+    return {**data, "remaining_steps": []}
 
 
 def get_cached_completion_data(
-    song_ids: List[int], include_remaining_steps: bool
-) -> Optional[Dict[int, Dict[str, Any]]]:
+    songs: Iterable[Tuple[int, Optional[int]]], include_remaining_steps: bool
+) -> Tuple[Dict[int, Dict[str, Any]], List[int]]:
     """
-    Get cached completion data if available and not expired.
-    
+    Look up cached completion data for a set of songs.
+
     Args:
-        song_ids: List of song IDs to look up
-        include_remaining_steps: Whether remaining steps were included
-        
+        songs: (song_id, owner_id) pairs to look up
+        include_remaining_steps: Whether remaining steps should be included
+
     Returns:
-        Cached completion data or None if not found/expired
+        Tuple of (cached data for the hits, song ids that must be fetched)
     """
-    if not song_ids:
-        return None
-    
-    cache_key = _make_cache_key(song_ids, include_remaining_steps)
-    
-    if cache_key not in _cache:
-        return None
-    
-    data, expiry_time = _cache[cache_key]
-    
-    # Check if expired
-    if datetime.utcnow() > expiry_time:
-        del _cache[cache_key]
-        return None
-    
-    return data
+    global _hits, _misses
+
+    found: Dict[int, Dict[str, Any]] = {}
+    missing: List[int] = []
+    now = datetime.utcnow()
+
+    with _lock:
+        for song_id, owner_id in songs:
+            entry = _cache.get(song_id)
+            if entry is not None:
+                cached_owner, version, data, expiry_time = entry
+                if (
+                    now <= expiry_time
+                    and cached_owner == owner_id
+                    and version == _workflow_versions.get(owner_id, 0)
+                ):
+                    _cache.move_to_end(song_id)
+                    found[song_id] = _shape(data, include_remaining_steps)
+                    continue
+                del _cache[song_id]
+            missing.append(song_id)
+
+        _hits += len(found)
+        _misses += len(missing)
+
+    return found, missing
 
 
 def set_cached_completion_data(
-    song_ids: List[int],
-    include_remaining_steps: bool,
     completion_data: Dict[int, Dict[str, Any]],
+    owners: Dict[int, Optional[int]],
+    workflow_versions: Optional[Dict[Optional[int], int]] = None,
     ttl_seconds: Optional[int] = None,
 ):
     """
     Cache completion data with TTL.
-    
+
     Args:
-        song_ids: List of song IDs that were queried
-        include_remaining_steps: Whether remaining steps were included
-        completion_data: The completion data to cache
+        completion_data: Completion data per song id, including remaining steps
+        owners: Owner id per song id
+        workflow_versions: Owner workflow versions read before the data was
+            fetched, so a workflow change mid-fetch isn't masked
         ttl_seconds: Optional TTL override (defaults to module default)
     """
-    if not song_ids or not completion_data:
+    if not completion_data:
         return
-    
-    cache_key = _make_cache_key(song_ids, include_remaining_steps)
+
     expiry_time = datetime.utcnow() + timedelta(
         seconds=ttl_seconds or _cache_ttl_seconds
     )
-    
-    _cache[cache_key] = (completion_data, expiry_time)
-    
-    # Clean up expired entries periodically (every 100 cache sets)
-    if len(_cache) > 1000:
-        _cleanup_expired()
+
+    with _lock:
+        for song_id, data in completion_data.items():
+            owner_id = owners.get(song_id)
+            if workflow_versions is not None and owner_id in workflow_versions:
+                version = workflow_versions[owner_id]
+            else:
+                version = _workflow_versions.get(owner_id, 0)
+            _cache[song_id] = (
+                owner_id,
+                version,
+                data,
+                expiry_time,
+            )
+            _cache.move_to_end(song_id)
+
+        # Drop least recently used songs beyond the size bound
+        while len(_cache) > _max_entries:
+            _cache.popitem(last=False)
 
 
 def invalidate_song_cache(song_id: int):
     """
     Invalidate cache entries for a specific song.
-    
+
     This should be called when song progress is updated.
-    
+
     Args:
         song_id: The song ID to invalidate
     """
-    keys_to_remove = []
-    for cache_key, (data, _) in _cache.items():
-        if song_id in data:
-            keys_to_remove.append(cache_key)
-    
-    for key in keys_to_remove:
-        _cache.pop(key, None)
+    with _lock:
+        _cache.pop(song_id, None)
 
 
 def invalidate_all_cache():
     """Clear all cached completion data."""
-    _cache.clear()
+    with _lock:
+        _cache.clear()
 
 
 def _cleanup_expired():
     """Remove expired cache entries."""
     now = datetime.utcnow()
-    expired_keys = [
-        key for key, (_, expiry_time) in _cache.items() if now > expiry_time
-    ]
-    for key in expired_keys:
-        _cache.pop(key, None)
+    with _lock:
+        expired_keys = [
+            key for key, entry in _cache.items() if now > entry[3]
+        ]
+        for key in expired_keys:
+            _cache.pop(key, None)
 
 
 def get_cache_stats() -> Dict[str, Any]:
     """Get cache statistics for monitoring."""
     now = datetime.utcnow()
-    expired_count = sum(
-        1 for _, expiry_time in _cache.values() if now > expiry_time
-    )
-    
+    with _lock:
+        expired_count = sum(
+            1 for entry in _cache.values() if now > entry[3]
+        )
+        total = len(_cache)
+
     return {
-        "total_entries": len(_cache),
+        "total_entries": total,
         "expired_entries": expired_count,
-        "active_entries": len(_cache) - expired_count,
+        "active_entries": total - expired_count,
+        "max_entries": _max_entries,
         "ttl_seconds": _cache_ttl_seconds,
+        "hits": _hits,
+        "misses": _misses,
     }
-
-
-
-
-
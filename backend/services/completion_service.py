@@ -4,6 +4,7 @@ from sqlalchemy import text
 from services.completion_cache import (
     get_cached_completion_data,
     set_cached_completion_data,
+    get_workflow_version,
     invalidate_song_cache,
 )
 
@@ -142,15 +143,23 @@ def build_song_completion_data(
     if not song_ids:
         return {}
     
-    # Try to get from cache first
+    owners = {_get_value(song, "id"): _get_value(song, "user_id") for song in songs}
+    cached_data: Dict[int, Dict[str, Any]] = {}
+    
+    # Try to get from cache first - only songs not cached are fetched below
     if use_cache:
-        cached_data = get_cached_completion_data(song_ids, include_remaining_steps)
-        if cached_data is not None:
-            # Return cached data, but only for songs that were requested
+        cached_data, missing_ids = get_cached_completion_data(
+            [(sid, owners.get(sid)) for sid in song_ids], include_remaining_steps
+        )
+        if not missing_ids:
             return {sid: cached_data[sid] for sid in song_ids if sid in cached_data}
+        missing_set = set(missing_ids)
+        songs = [song for song in songs if _get_value(song, "id") in missing_set]
+        song_ids = missing_ids
     
     # Cache miss - fetch from database
     owner_ids = {_get_value(song, "user_id") for song in songs if _get_value(song, "user_id")}
+    workflow_versions = {owner_id: get_workflow_version(owner_id) for owner_id in owner_ids}
 
     workflow_fields_map = fetch_workflow_fields_map(db, owner_ids)
     progress_map = fetch_song_progress_map(db, song_ids)
@@ -189,13 +198,12 @@ def build_song_completion_data(
             round((completed_count / total_fields) * 100) if total_fields > 0 else None
         )
 
-        remaining_steps = []
-        if include_remaining_steps:
-            remaining_steps = [
-                _format_step_name(field)
-                for field in workflow_fields
-                if not song_progress.get(field, False)
-            ]
+        # Always computed so the cached entry serves both variants
+        remaining_steps = [
+            _format_step_name(field)
+            for field in workflow_fields
+            if not song_progress.get(field, False)
+        ]
 
         completion_data[song_id] = {
             "completion": completion,
@@ -205,7 +213,15 @@ def build_song_completion_data(
     
     # Cache the results
     if use_cache and completion_data:
-        set_cached_completion_data(song_ids, include_remaining_steps, completion_data)
+        set_cached_completion_data(completion_data, owners, workflow_versions)
+
+    if not include_remaining_steps:
+        completion_data = {
+            sid: {**data, "remaining_steps": []} for sid, data in completion_data.items()
+        }
+
+    if cached_data:
+        completion_data = {**cached_data, **completion_data}
 
     return completion_data
 
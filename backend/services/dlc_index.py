@@ -0,0 +1,188 @@
+"""
+In-memory index of official Rock Band DLC for fast title/artist matching.
+
+The DLC table only changes when the import tool runs, so it is loaded once per
+process and keyed on normalized artist and title. Lookups try an exact match,
+then prefix/substring matches within the matching artists, then a fuzzy title
+match. The index notices imports and in-place edits (row count / max id /
+max updated_at change) within ``DLC_INDEX_CHECK_INTERVAL`` seconds and
+reloads itself; the import tool runs in its own process, so this stamp is what
+other processes rely on.
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import RockBandDLC
+from utils.normalization import normalize_many, normalize_title
+from utils.title_matching import TitleMatcher
+
+DLC_INDEX_CHECK_INTERVAL = 60  # seconds between cheap "has the table changed?" checks
+FUZZY_TITLE_THRESHOLD = 0.9
+MAX_SIMILAR_MATCHES = 5
+
+
+def _entry_dict(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": entry["id"],
+        "title": entry["title"],
+        "artist": entry["artist"],
+        "origin": entry["origin"],
+    }
+
+
+def _match_result(match_type: str, matches: List[Dict[str, Any]]) -> Dict[str, Any]:
+    result = {
+        "is_dlc": True,
+        "origin": matches[0]["origin"],
+        "match_type": match_type,
+        "dlc_entry": _entry_dict(matches[0]),
+    }
+    if match_type != "exact":
+        result["similar_matches"] = [_entry_dict(m) for m in matches[:MAX_SIMILAR_MATCHES]]
+    return result
+
+
+NO_MATCH = {"is_dlc": False, "origin": None, "match_type": None, "dlc_entry": None}
+
+
+class DLCIndex:
+    """Read-only lookup structure built from (id, title, artist, origin) rows."""
+
+    def __init__(self, rows, stamp: Tuple = ()):
+        self.stamp = stamp
+        self._exact: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._by_artist: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+
+        rows = list(rows)
+        artist_keys = normalize_many(row[2] for row in rows)
+        title_keys = normalize_many(row[1] for row in rows)
+        for (row_id, title, artist, origin), artist_key, title_key in zip(rows, artist_keys, title_keys):
+            entry = {"id": row_id, "title": title, "artist": artist, "origin": origin}
+            if not title_key:
+                continue
+            self._exact.setdefault((artist_key, title_key), entry)
+            self._by_artist.setdefault(artist_key, []).append((title_key, entry))
+
+        self._artist_keys = sorted(self._by_artist)
+        # Per-artist fuzzy matchers, built on first fuzzy lookup for that artist
+        self._matchers: Dict[str, TitleMatcher] = {}
+
+    def __len__(self) -> int:
+        return sum(len(titles) for titles in self._by_artist.values())
+
+    def _candidate_artists(self, artist_key: str) -> List[str]:
+        """Exact artist, else artists starting with it, else artists containing it."""
+        if artist_key in self._by_artist:
+            return [artist_key]
+        if not artist_key:
+            return []
+        start = bisect.bisect_left(self._artist_keys, artist_key)
+        prefixed = []
+        for key in self._artist_keys[start:]:
+            if not key.startswith(artist_key):
+                break
+            prefixed.append(key)
+        if prefixed:
+            return prefixed
+        return [key for key in self._artist_keys if artist_key in key]
+
+    def _matcher(self, artist_key: str) -> TitleMatcher:
+        matcher = self._matchers.get(artist_key)
+        if matcher is None:
+            matcher = TitleMatcher(
+                [entry for _, entry in self._by_artist[artist_key]],
+                lambda entry: entry["title"],
+                threshold=FUZZY_TITLE_THRESHOLD,
+            )
+            self._matchers[artist_key] = matcher
+        return matcher
+
+    def is_dlc(self, title: str, artist: str) -> bool:
+        """Exact (normalized) match only - the cheap check used per track."""
+        return (normalize_title(artist or ""), normalize_title(title or "")) in self._exact
+
+    def lookup(self, title: str, artist: str) -> Dict[str, Any]:
+        """Best match for a title/artist pair, in the /rockband-dlc/check response shape."""
+        artist_key = normalize_title(artist or "")
+        title_key = normalize_title(title or "")
+        if not title_key:
+            return dict(NO_MATCH)
+
+        exact = self._exact.get((artist_key, title_key))
+        if exact:
+            return _match_result("exact", [exact])
+
+        artist_keys = self._candidate_artists(artist_key)
+        candidates = [item for key in artist_keys for item in self._by_artist[key]]
+
+        # Prefix matches first, then substring, like the old "%title%" search
+        prefix = [entry for key, entry in candidates if key.startswith(title_key)]
+        partial = prefix + [
+            entry for key, entry in candidates if title_key in key and not key.startswith(title_key)
+        ]
+        if partial:
+            return _match_result("partial", partial)
+
+        scored = [match for key in artist_keys for match in self._matcher(key).similar(title_key)]
+        scored.sort(key=lambda match: match[0], reverse=True)
+        fuzzy = [entry for _, entry in scored]
+        if fuzzy:
+            return _match_result("fuzzy", fuzzy)
+
+        return dict(NO_MATCH)
+
+
+_index: Optional[DLCIndex] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _table_stamp(db: Session) -> Tuple:
+    count, max_id, updated_at = db.query(
+        func.count(RockBandDLC.id), func.max(RockBandDLC.id), func.max(RockBandDLC.updated_at)
+    ).one()
+    return (count or 0, max_id or 0, str(updated_at))
+
+
+def get_dlc_index(db: Session) -> DLCIndex:
+    """
+    Process-wide DLC index, loaded on first use.
+
+    Reloads when the table's row count, max id or latest edit changed since the last load,
+    checked at most every ``DLC_INDEX_CHECK_INTERVAL`` seconds.
+    """
+    global _index, _checked_at
+
+    index = _index
+    if index is not None and time.time() - _checked_at < DLC_INDEX_CHECK_INTERVAL:
+        return index
+
+    with _lock:
+        # Another thread may have loaded or checked while we waited
+        if _index is not None and time.time() - _checked_at < DLC_INDEX_CHECK_INTERVAL:
+            return _index
+
+        stamp = _table_stamp(db)
+        if _index is None or _index.stamp != stamp:
+            start_time = time.time()
+            rows = db.query(
+                RockBandDLC.id, RockBandDLC.title, RockBandDLC.artist, RockBandDLC.origin
+            ).all()
+            _index = DLCIndex(rows, stamp)
+            print(f"🎸 Loaded DLC index: {len(_index)} entries in {time.time() - start_time:.2f}s")
+        _checked_at = time.time()
+        return _index
+
+
+def invalidate_dlc_index():
+    """Force a reload on next use (call after importing DLC in-process)."""
+    global _index, _checked_at
+    with _lock:
+        _index = None
+        _checked_at = 0.0
@@ -0,0 +1,289 @@
+"""
+Persisted background job queue.
+
+Slow side effects of a write (activity logging, achievement checks,
+notifications, Spotify enhancement) are handed off with ``enqueue_job``. The
+job row is added to the caller's session, so it commits atomically with the
+write that caused it, and a worker picks it up right after the commit.
+
+Jobs are claimed with a conditional UPDATE, so any number of workers (threads
+or processes) can share the table. Failed jobs are retried with exponential
+backoff up to ``max_attempts``; jobs left ``running`` by a dead worker are
+requeued after ``JOB_STALE_AFTER`` seconds.
+
+``JOB_WORKER_MODE`` selects where jobs run:
+    thread   - a daemon worker thread in each API process (default)
+    external - only in a separate worker process:
+               python tools/run_job_worker.py
+    off      - jobs are only queued (tests)
+"""
+
+import importlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import BackgroundJob, BackgroundJobStatus
+
+JOB_WORKER_MODE = os.getenv("JOB_WORKER_MODE", "thread").lower()
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "5"))  # seconds between polls when idle
+JOB_BATCH_SIZE = 20
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_BASE_DELAY = 5  # seconds, doubled on every further attempt
+JOB_STALE_AFTER = 10 * 60  # seconds a job may stay "running" before it is requeued
+
+# Modules whose import registers job handlers (the worker process imports them)
+JOB_HANDLER_MODULES = [
+    "api.songs.services.song_jobs",
+    "api.notifications.services.notification_jobs",
+]
+
+JobHandler = Callable[[Session, Optional[int], Dict[str, Any]], None]
+
+_handlers: Dict[str, JobHandler] = {}
+_dedupe_types: Set[str] = set()
+_handlers_loaded = False
+
+
+def job_handler(job_type: str, dedupe: bool = False):
+    """
+    Register a handler for ``job_type``.
+
+    Handlers are called as ``handler(db, user_id, payload)`` with their own
+    session; the worker commits after they return. With ``dedupe=True`` a user
+    has at most one queued job of this type: enqueueing another merges its
+    payload into the queued one (values are OR-ed, so use boolean flags).
+    """
+    def register(fn: JobHandler) -> JobHandler:
+        _handlers[job_type] = fn
+        if dedupe:
+            _dedupe_types.add(job_type)
+        return fn
+    return register
+
+
+def _load_handlers():
+    global _handlers_loaded
+    if not _handlers_loaded:
+        for module in JOB_HANDLER_MODULES:
+            importlib.import_module(module)
+        _handlers_loaded = True
+
+
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    user_id: Optional[int] = None,
+    payload: Optional[Dict[str, Any]] = None,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+) -> BackgroundJob:
+    """
+    Queue a job in ``db``'s transaction; it runs once the caller commits.
+
+    Returns the new job, or the already-queued job it was merged into.
+    """
+    _load_handlers()
+    payload = payload or {}
+    _wake_after_commit(db)
+
+    if job_type in _dedupe_types and user_id is not None:
+        existing = db.query(BackgroundJob).filter(
+            BackgroundJob.user_id == user_id,
+            BackgroundJob.job_type == job_type,
+            BackgroundJob.status == BackgroundJobStatus.queued.value,
+        ).order_by(BackgroundJob.id).first()
+        if existing is not None:
+            merged = json.loads(existing.payload_json or "{}")
+            for key, value in payload.items():
+                merged[key] = merged.get(key) or value
+            # Only merge while still queued; a worker may have claimed it meanwhile
+            updated = db.query(BackgroundJob).filter(
+                BackgroundJob.id == existing.id,
+                BackgroundJob.status == BackgroundJobStatus.queued.value,
+            ).update({BackgroundJob.payload_json: json.dumps(merged)}, synchronize_session=False)
+            if updated:
+                db.expire(existing)
+                return existing
+
+    job = BackgroundJob(
+        job_type=job_type,
+        user_id=user_id,
+        payload_json=json.dumps(payload),
+        status=BackgroundJobStatus.queued.value,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=datetime.utcnow(),
+    )
+    db.add(job)
+    return job
+
+
+def claim_due_jobs(db: Session, limit: int = JOB_BATCH_SIZE) -> List[int]:
+    """Mark up to ``limit`` due jobs as running; returns the ids this worker won."""
+    now = datetime.utcnow()
+    candidates = db.query(BackgroundJob.id).filter(
+        BackgroundJob.status == BackgroundJobStatus.queued.value,
+        BackgroundJob.run_after <= now,
+    ).order_by(BackgroundJob.id).limit(limit).all()
+
+    claimed = []
+    for (job_id,) in candidates:
+        updated = db.query(BackgroundJob).filter(
+            BackgroundJob.id == job_id,
+            BackgroundJob.status == BackgroundJobStatus.queued.value,
+        ).update({
+            BackgroundJob.status: BackgroundJobStatus.running.value,
+            BackgroundJob.started_at: now,
+            BackgroundJob.attempts: BackgroundJob.attempts + 1,
+        }, synchronize_session=False)
+        db.commit()
+        if updated:
+            claimed.append(job_id)
+    return claimed
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Put jobs whose worker died mid-run back in the queue."""
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE_AFTER)
+    count = db.query(BackgroundJob).filter(
+        BackgroundJob.status == BackgroundJobStatus.running.value,
+        BackgroundJob.started_at < cutoff,
+    ).update({BackgroundJob.status: BackgroundJobStatus.queued.value}, synchronize_session=False)
+    db.commit()
+    return count
+
+
+def run_job(db: Session, job_id: int) -> bool:
+    """Run a claimed job and record the outcome; returns True on success."""
+    _load_handlers()
+    job = db.get(BackgroundJob, job_id)
+    if job is None:
+        return False
+
+    try:
+        handler = _handlers.get(job.job_type)
+        if handler is None:
+            raise LookupError(f"No handler registered for job type '{job.job_type}'")
+        handler(db, job.user_id, json.loads(job.payload_json or "{}"))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        job = db.get(BackgroundJob, job_id)
+        job.last_error = f"{type(e).__name__}: {e}"
+        if job.attempts >= job.max_attempts:
+            job.status = BackgroundJobStatus.failed.value
+            job.finished_at = datetime.utcnow()
+            print(f"❌ Job {job_id} ({job.job_type}) failed after {job.attempts} attempts: {e}")
+        else:
+            job.status = BackgroundJobStatus.queued.value
+            job.run_after = datetime.utcnow() + timedelta(
+                seconds=JOB_RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+            )
+            print(f"⚠️ Job {job_id} ({job.job_type}) attempt {job.attempts} failed, retrying: {e}")
+        db.commit()
+        return False
+
+    job.status = BackgroundJobStatus.succeeded.value
+    job.finished_at = datetime.utcnow()
+    job.last_error = None
+    db.commit()
+    return True
+
+
+def run_pending_jobs(session_factory=None, limit: int = JOB_BATCH_SIZE) -> int:
+    """Claim and run one batch of due jobs; returns how many were run."""
+    if session_factory is None:
+        from database import SessionLocal
+        session_factory = SessionLocal
+
+    db = session_factory()
+    try:
+        requeue_stale_jobs(db)
+        job_ids = claim_due_jobs(db, limit)
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        # Fresh session per job so one failure can't poison the next
+        db = session_factory()
+        try:
+            run_job(db, job_id)
+        except Exception as e:
+            print(f"❌ Job {job_id} could not be recorded: {e}")
+        finally:
+            db.close()
+    return len(job_ids)
+
+
+class JobWorker:
+    """Polls the job table, waking early when a job is committed in-process."""
+
+    def __init__(self, session_factory=None, poll_interval: float = JOB_POLL_INTERVAL):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name="job-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def run_forever(self):
+        _load_handlers()
+        while not self._stopped.is_set():
+            try:
+                processed = run_pending_jobs(self.session_factory)
+            except Exception as e:
+                print(f"⚠️ Job worker poll failed: {e}")
+                processed = 0
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+
+_worker: Optional[JobWorker] = None
+_worker_lock = threading.Lock()
+
+
+def start_job_worker() -> Optional[JobWorker]:
+    """Start this process's worker thread (no-op unless JOB_WORKER_MODE=thread)."""
+    global _worker
+    if JOB_WORKER_MODE != "thread":
+        return None
+    with _worker_lock:
+        if _worker is None:
+            _worker = JobWorker()
+            _worker.start()
+            print("🧵 Background job worker started")
+    return _worker
+
+
+def stop_job_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop()
+            _worker = None
+
+
+def _wake_worker(session):
+    if _worker is not None:
+        _worker.wake()
+
+
+def _wake_after_commit(db: Session):
+    if not event.contains(db, "after_commit", _wake_worker):
+        event.listen(db, "after_commit", _wake_worker)
@@ -0,0 +1,153 @@
+"""
+In-memory rank index over users' cached achievement points.
+
+The leaderboard orders active users with points by (points desc, username,
+id). The index keeps those sort keys in one sorted list, so top-N is a slice
+and a user's rank or neighbourhood is a bisect, instead of grouping every
+user's achievements per request.
+
+``update_user_total_points`` invalidates the index (again after the commit that
+makes the change visible) and the next read rebuilds it with one query. Writes
+from other processes are noticed by a cheap stamp check of user_stats at most
+every ``LEADERBOARD_INDEX_CHECK_INTERVAL`` seconds. Username changes only
+affect tie order and are picked up within ``LEADERBOARD_INDEX_MAX_AGE``.
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from models import User, UserStats
+
+LEADERBOARD_INDEX_CHECK_INTERVAL = 30  # seconds between "did user_stats change?" checks
+LEADERBOARD_INDEX_MAX_AGE = 3600  # rebuild at least this often (username changes)
+
+
+class RankedUser(NamedTuple):
+    rank: int
+    user_id: int
+    username: str
+    total_points: int
+
+
+class LeaderboardIndex:
+    """Read-only ranking built from (user_id, username, total_points) rows."""
+
+    def __init__(self, rows, stamp: Tuple = ()):
+        self.stamp = stamp
+        self.built_at = time.time()
+        self._keys: List[Tuple[int, str, int]] = sorted(
+            (-points, username, user_id) for user_id, username, points in rows if points and points > 0
+        )
+        self._key_by_user: Dict[int, Tuple[int, str, int]] = {key[2]: key for key in self._keys}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _entries(self, start: int, stop: int) -> List[RankedUser]:
+        start = max(start, 0)
+        return [
+            RankedUser(start + offset + 1, user_id, username, -neg_points)
+            for offset, (neg_points, username, user_id) in enumerate(self._keys[start:stop])
+        ]
+
+    def top(self, limit: int, offset: int = 0) -> List[RankedUser]:
+        return self._entries(offset, offset + limit)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based position, or None for users without points."""
+        key = self._key_by_user.get(user_id)
+        if key is None:
+            return None
+        return bisect.bisect_left(self._keys, key) + 1
+
+    def around(self, user_id: int, radius: int) -> List[RankedUser]:
+        """The user plus up to ``radius`` users ranked directly above and below."""
+        rank = self.rank(user_id)
+        if rank is None:
+            return []
+        return self._entries(rank - 1 - radius, rank + radius)
+
+
+_index: Optional[LeaderboardIndex] = None
+_index_generation = -1
+_generation = 0
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _table_stamp(db: Session) -> Tuple:
+    count, points, updated_at = db.query(
+        func.count(UserStats.user_id),
+        func.sum(UserStats.total_points),
+        func.max(UserStats.updated_at),
+    ).join(User, User.id == UserStats.user_id).filter(
+        UserStats.total_points > 0, User.is_active == True
+    ).one()
+    return (count or 0, points or 0, str(updated_at))
+
+
+def _is_current(index: Optional[LeaderboardIndex]) -> bool:
+    return (
+        index is not None
+        and _index_generation == _generation
+        and time.time() - _checked_at < LEADERBOARD_INDEX_CHECK_INTERVAL
+    )
+
+
+def get_leaderboard_index(db: Session) -> LeaderboardIndex:
+    """
+    Process-wide rank index, built on first use and after invalidation.
+
+    Also rebuilds when user_stats' stamp changed since the last build (checked
+    at most every ``LEADERBOARD_INDEX_CHECK_INTERVAL`` seconds) or the index is
+    older than ``LEADERBOARD_INDEX_MAX_AGE``.
+    """
+    global _index, _index_generation, _checked_at
+
+    index = _index
+    if _is_current(index):
+        return index
+
+    with _lock:
+        # Another thread may have rebuilt or checked while we waited
+        if _is_current(_index):
+            return _index
+
+        generation = _generation
+        stamp = _table_stamp(db)
+        if (
+            _index is None
+            or _index_generation != generation
+            or _index.stamp != stamp
+            or time.time() - _index.built_at > LEADERBOARD_INDEX_MAX_AGE
+        ):
+            rows = db.query(UserStats.user_id, User.username, UserStats.total_points).join(
+                User, User.id == UserStats.user_id
+            ).filter(UserStats.total_points > 0, User.is_active == True).all()
+            _index = LeaderboardIndex(rows, stamp)
+        # An invalidation during the build leaves the index stale for the next read
+        _index_generation = generation
+        _checked_at = time.time()
+        return _index
+
+
+def _invalidate_after_commit(session):
+    invalidate_leaderboard_index()
+
+
+def invalidate_leaderboard_index(db: Optional[Session] = None):
+    """
+    Force a rebuild on next use. Pass the session making the point change to
+    invalidate again once it commits, so a rebuild racing the uncommitted
+    write does not stick.
+    """
+    global _generation
+    with _lock:
+        _generation += 1
+    if db is not None and not event.contains(db, "after_commit", _invalidate_after_commit):
+        event.listen(db, "after_commit", _invalidate_after_commit)
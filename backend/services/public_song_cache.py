@@ -0,0 +1,56 @@
+"""
+Cache tags for public song browsing and shared connections, and the Song
+mapper events that invalidate them.
+
+Imported by ``database`` so the listeners are registered in every process that
+writes songs (API workers and the external job worker alike). Invalidation is
+deferred to the writing session's commit; bulk ``query.update()`` callers in
+api/public_songs.py invalidate explicitly after committing.
+"""
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+
+from models import Song
+from utils.cache import cache, invalidate_after_commit
+
+# Tag for cached public-catalog data (browse totals); invalidated when public flags change
+PUBLIC_SONGS_CACHE_TAG = "public_songs"
+
+
+def shared_connections_tag(user_id: int) -> str:
+    """Cache tag for a user's shared connections."""
+    return f"shared_connections:{user_id}"
+
+
+def invalidate_public_catalog_caches() -> None:
+    """Drop cached public catalog data after a song's public flag changes."""
+    cache.invalidate_tag(PUBLIC_SONGS_CACHE_TAG)
+
+
+@event.listens_for(Song, "after_insert")
+@event.listens_for(Song, "after_delete")
+def _song_added_or_removed(mapper, connection, target):
+    tags = set()
+    if target.user_id is not None:
+        tags.add(shared_connections_tag(target.user_id))
+    if target.is_public:
+        tags.add(PUBLIC_SONGS_CACHE_TAG)
+    invalidate_after_commit(object_session(target), tags=tags)
+
+
+@event.listens_for(Song, "after_update")
+def _song_updated(mapper, connection, target):
+    state = inspect(target)
+    changed = lambda attr: state.attrs[attr].history.has_changes()
+    tags = set()
+    if any(changed(attr) for attr in ("title", "artist", "fingerprint", "user_id")):
+        # Ownership transfers affect the previous owner too
+        owner_ids = {target.user_id, *state.attrs.user_id.history.deleted}
+        tags.update(shared_connections_tag(owner_id) for owner_id in owner_ids - {None})
+        if target.is_public:
+            tags.add(PUBLIC_SONGS_CACHE_TAG)
+    if changed("is_public"):
+        tags.add(PUBLIC_SONGS_CACHE_TAG)
+    if tags:
+        invalidate_after_commit(object_session(target), tags=tags)
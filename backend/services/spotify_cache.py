@@ -0,0 +1,199 @@
+"""
+Persistent cache for Spotify Web API responses.
+
+``CachedSpotify`` wraps a spotipy client and stores search, album, track,
+artist and playlist responses in a local SQLite file with per-endpoint TTLs, so
+repeated lookups (tracklist views, DLC checks, artist images) cost no network
+calls and survive restarts. Other client methods pass straight through.
+
+``SPOTIFY_CACHE_MODE`` selects the behaviour:
+    normal  - serve fresh entries, fetch and store on miss (default)
+    record  - always fetch, store every response
+    replay  - serve stored entries regardless of age, never touch the network;
+              a miss raises ``SpotifyReplayMiss`` (for benchmarks and tests)
+    off     - no caching
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.metrics import CACHE_REQUESTS_TOTAL
+
+SPOTIFY_CACHE_PATH = os.getenv(
+    "SPOTIFY_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "spotify_cache.db"),
+)
+SPOTIFY_CACHE_MODE = os.getenv("SPOTIFY_CACHE_MODE", "normal").lower()
+
+DAY = 24 * 60 * 60
+
+# Seconds each endpoint's responses stay fresh
+SPOTIFY_CACHE_TTLS: Dict[str, int] = {
+    "search": DAY,
+    "album": 7 * DAY,
+    "album_tracks": 7 * DAY,
+    "albums": 7 * DAY,
+    "track": 7 * DAY,
+    "tracks": 7 * DAY,
+    "artist": DAY,  # images change occasionally
+    "artists": DAY,
+    "artist_albums": DAY,
+    "playlist_tracks": 10 * 60,  # playlists are edited by their owners
+}
+
+
+class SpotifyReplayMiss(Exception):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+class SpotifyResponseStore:
+    """SQLite key/value store of JSON responses with expiry."""
+
+    def __init__(self, path: str = SPOTIFY_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS spotify_responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                response TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, allow_expired: bool = False) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM spotify_responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (not allow_expired and row[1] < time.time()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, endpoint: str, response: Any, ttl: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO spotify_responses (key, endpoint, response, stored_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, json.dumps(response), now, now + ttl),
+            )
+            self._conn.commit()
+
+    def prune(self) -> int:
+        """Delete expired entries; returns how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM spotify_responses WHERE expires_at < ?", (time.time(),)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM spotify_responses").fetchone()[0]
+        return {"path": self.path, "total_entries": total, "hits": self.hits, "misses": self.misses}
+
+
+def _cache_key(endpoint: str, args: tuple, kwargs: dict) -> str:
+    return json.dumps([endpoint, list(args), kwargs], sort_keys=True, default=str)
+
+
+class CachedSpotify:
+    """
+    Spotify client proxy that caches responses of the endpoints in
+    ``SPOTIFY_CACHE_TTLS``.
+
+    Args:
+        client: spotipy ``Spotify`` instance (may be None in replay mode)
+        store: Response store (defaults to the process-wide store)
+        mode: normal, record, replay or off (defaults to ``SPOTIFY_CACHE_MODE``)
+    """
+
+    def __init__(self, client, store: Optional[SpotifyResponseStore] = None, mode: Optional[str] = None):
+        self._client = client
+        self._store = store
+        self._mode = mode or SPOTIFY_CACHE_MODE
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in SPOTIFY_CACHE_TTLS and self._mode != "off":
+            return lambda *args, **kwargs: self._call(name, args, kwargs)
+        if self._client is None:
+            raise SpotifyReplayMiss(f"No Spotify client available for {name}()")
+        return getattr(self._client, name)
+
+    def _call(self, endpoint: str, args: tuple, kwargs: dict) -> Any:
+        store = self._store or get_response_store()
+        key = _cache_key(endpoint, args, kwargs)
+
+        if self._mode == "replay":
+            response = store.get(key, allow_expired=True)
+            if response is None:
+                raise SpotifyReplayMiss(f"No recorded Spotify response for {endpoint}{args}{kwargs}")
+            return response
+
+        if self._mode != "record":
+            try:
+                response = store.get(key)
+            except sqlite3.Error as e:
+                print(f"⚠️ Spotify cache read failed: {e}")
+                response = None
+            if response is not None:
+                return response
+
+        fetch: Callable = getattr(self._client, endpoint)
+        response = fetch(*args, **kwargs)
+        if response is not None:
+            try:
+                store.set(key, endpoint, response, SPOTIFY_CACHE_TTLS[endpoint])
+            except (sqlite3.Error, TypeError) as e:
+                print(f"⚠️ Spotify cache write failed: {e}")
+        return response
+
+
+_store: Optional[SpotifyResponseStore] = None
+_store_lock = threading.Lock()
+
+CACHE_REQUESTS_TOTAL.add_collector(
+    lambda: [(("spotify", "hit"), _store.hits), (("spotify", "miss"), _store.misses)] if _store else []
+)
+
+
+def get_response_store() -> SpotifyResponseStore:
+    """Process-wide response store, opened (and pruned) on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = SpotifyResponseStore()
+                try:
+                    removed = store.prune()
+                    if removed:
+                        print(f"🧹 Pruned {removed} expired Spotify cache entries")
+                except sqlite3.Error as e:
+                    print(f"⚠️ Spotify cache prune failed: {e}")
+                _store = store
+    return _store
+
+
+def cached_spotify(client) -> Optional[CachedSpotify]:
+    """Wrap a spotipy client with the response cache (None stays None unless replaying)."""
+    if client is None and SPOTIFY_CACHE_MODE != "replay":
+        return None
+    return CachedSpotify(client)
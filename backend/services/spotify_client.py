@@ -0,0 +1,114 @@
+"""
+Process-wide Spotify client.
+
+Building ``Spotify(auth_manager=SpotifyClientCredentials(...))`` per request
+pays a token fetch and a fresh TLS handshake every time. ``get_spotify_client``
+instead hands out one client per process: the client-credentials token is kept
+in memory until it expires, HTTP connections are reused through a keep-alive
+session, and 429/5xx responses are retried honouring ``Retry-After``. Network
+calls share one token bucket so concurrent callers (bulk enhancement, image
+fetches) stay under Spotify's rate limit, and the client is wrapped in the
+persistent response cache (see ``spotify_cache``) so cache hits are free.
+"""
+
+import os
+import threading
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from spotipy import Spotify
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials
+from urllib3.util.retry import Retry
+
+from services.spotify_cache import CachedSpotify, cached_spotify
+from utils.concurrency import TokenBucket, rate_limited
+
+SPOTIFY_REQUEST_TIMEOUT = 10  # seconds
+SPOTIFY_MAX_RETRIES = 3
+# Longest Retry-After we are willing to sleep for inside a request
+SPOTIFY_MAX_RETRY_AFTER = 30
+SPOTIFY_POOL_SIZE = 20
+# Process-wide cap on outbound Spotify requests
+SPOTIFY_REQUESTS_PER_SECOND = float(os.getenv("SPOTIFY_REQUESTS_PER_SECOND", "20"))
+
+
+class _SpotifyRetry(Retry):
+    """Retry that honours Retry-After but never blocks a request for minutes."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, SPOTIFY_MAX_RETRY_AFTER)
+
+
+def _build_session() -> requests.Session:
+    retry = _SpotifyRetry(
+        total=SPOTIFY_MAX_RETRIES,
+        connect=SPOTIFY_MAX_RETRIES,
+        read=False,
+        status=SPOTIFY_MAX_RETRIES,
+        allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+        status_forcelist=(429, 500, 502, 503, 504),
+        backoff_factor=0.5,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=SPOTIFY_POOL_SIZE, pool_maxsize=SPOTIFY_POOL_SIZE)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_client: Optional[CachedSpotify] = None
+_client_credentials: Optional[Tuple[str, str]] = None
+_lock = threading.Lock()
+_bucket = TokenBucket(SPOTIFY_REQUESTS_PER_SECOND)
+
+
+def get_spotify_client() -> Optional[CachedSpotify]:
+    """
+    Shared, cached Spotify client, or None when credentials are missing.
+
+    Credentials are read from the environment on each call (so .env loading
+    order doesn't matter) and the client is rebuilt if they change.
+    """
+    global _client, _client_credentials
+
+    client_id = os.getenv("SPOTIFY_CLIENT_ID")
+    client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        # Replay mode serves recorded responses without credentials
+        return cached_spotify(None)
+
+    credentials = (client_id, client_secret)
+    if _client is not None and _client_credentials == credentials:
+        return _client
+
+    with _lock:
+        if _client is None or _client_credentials != credentials:
+            session = _build_session()
+            auth_manager = SpotifyClientCredentials(
+                client_id=client_id,
+                client_secret=client_secret,
+                requests_session=session,
+                requests_timeout=SPOTIFY_REQUEST_TIMEOUT,
+                cache_handler=MemoryCacheHandler(),
+            )
+            _client = cached_spotify(rate_limited(Spotify(
+                auth_manager=auth_manager,
+                requests_session=session,
+                requests_timeout=SPOTIFY_REQUEST_TIMEOUT,
+            ), _bucket))
+            _client_credentials = credentials
+        return _client
+
+
+def reset_spotify_client():
+    """Drop the shared client (tests, credential rotation)."""
+    global _client, _client_credentials
+    with _lock:
+        _client = None
+        _client_credentials = None
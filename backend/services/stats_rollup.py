@@ -0,0 +1,307 @@
+"""
+Materialized per-user stats for the /stats dashboard.
+
+Every /stats endpoint used to aggregate the user's songs, packs and
+collaborations from scratch. Instead each user gets one ``user_stats_rollups``
+row holding all of those aggregates as JSON, so an endpoint costs a primary
+key lookup (plus one artist-image lookup, since images change independently).
+
+The rollup is recomputed lazily: any write that can change a user's stats
+bumps that user's ``version`` in the same transaction, and the next read
+rebuilds the row if ``built_version`` is behind. Writes are caught by mapper
+events (ORM inserts/updates/deletes of songs, collaborations and pack names)
+and by a ``do_orm_execute`` hook for bulk ``query.update()``/``delete()`` on
+songs and collaborations. ``STATS_ROLLUP_MAX_AGE`` bounds staleness from
+anything else (e.g. a username change).
+"""
+
+import json
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import event, inspect, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import Collaboration, CollaborationType, Pack, Song, SongStatus, User, UserStatsRollup
+
+STATS_ROLLUP_TOP_N = 100  # longest top-artists/albums list kept
+STATS_ROLLUP_TOP_PACKS = 50
+STATS_ROLLUP_TOP_COLLABORATORS = 50
+STATS_ROLLUP_DETAIL_TOP_N = 5  # top artists/albums kept per year and decade
+STATS_ROLLUP_MAX_AGE = timedelta(hours=1)
+
+# Song columns the stats are computed from
+STATS_SONG_FIELDS = ("status", "artist", "album", "album_cover", "year", "pack_id", "user_id")
+
+
+def song_access_filter(db: Session, user_id: int):
+    """Songs a user owns or collaborates on (SONG_EDIT)"""
+    return or_(
+        Song.user_id == user_id,
+        Song.id.in_(
+            select(Collaboration.song_id).where(
+                Collaboration.user_id == user_id,
+                Collaboration.collaboration_type == CollaborationType.SONG_EDIT
+            )
+        )
+    )
+
+
+def _ranked(counts: Dict[Any, int], limit: Optional[int] = None) -> List[Any]:
+    """Keys by descending count; ties keep first-seen order."""
+    ranked = sorted(counts, key=lambda key: -counts[key])
+    return ranked[:limit] if limit is not None else ranked
+
+
+def _top_albums(albums: Dict[Any, list], limit: int, with_artist: bool) -> List[Dict[str, Any]]:
+    return [
+        {
+            "album": key[0] if with_artist else key,
+            **({"artist": key[1]} if with_artist else {}),
+            "count": albums[key][0],
+            "album_cover": albums[key][1],
+        }
+        for key in sorted(albums, key=lambda key: -albums[key][0])[:limit]
+    ]
+
+
+def _add_album(albums: Dict[Any, list], key, album_cover: Optional[str]):
+    entry = albums.setdefault(key, [0, None])
+    entry[0] += 1
+    # Matches MAX(album_cover): any non-null cover, consistently the greatest
+    if album_cover is not None and (entry[1] is None or album_cover > entry[1]):
+        entry[1] = album_cover
+
+
+def compute_user_stats(db: Session, user: User) -> Dict[str, Any]:
+    """Aggregate a user's released songs and collaborations into rollup form."""
+    access = song_access_filter(db, user.id)
+
+    songs = db.query(
+        Song.artist, Song.album, Song.album_cover, Song.year, Pack.name
+    ).outerjoin(
+        Pack, Pack.id == Song.pack_id
+    ).filter(
+        Song.status == SongStatus.released,
+        access
+    ).order_by(Song.id).all()
+
+    artists: Counter = Counter()
+    albums: Dict[Any, list] = {}
+    packs: Counter = Counter()
+    pack_artists: Dict[str, Counter] = defaultdict(Counter)
+    years: Counter = Counter()
+    periods: Dict[str, Dict[int, Dict[str, Any]]] = {"years": {}, "decades": {}}
+
+    for artist, album, album_cover, year, pack_name in songs:
+        if artist is not None:
+            artists[artist] += 1
+        if album is not None:
+            _add_album(albums, (album, artist), album_cover)
+        if pack_name is not None:
+            packs[pack_name] += 1
+            if artist is not None:
+                pack_artists[pack_name][artist] += 1
+        if year is None:
+            continue
+        years[year] += 1
+        for kind, period in (("years", year), ("decades", (year // 10) * 10)):
+            detail = periods[kind].setdefault(period, {
+                "count": 0, "artists": Counter(), "albums": {}, "album_cover": None, "album_name": None
+            })
+            detail["count"] += 1
+            if artist is not None:
+                detail["artists"][artist] += 1
+            if album is not None:
+                _add_album(detail["albums"], album, album_cover)
+            if album_cover is not None and detail["album_cover"] is None:
+                detail["album_cover"], detail["album_name"] = album_cover, album
+
+    collaborations = db.query(Collaboration.user_id, User.username).join(
+        Song, Song.id == Collaboration.song_id
+    ).outerjoin(
+        User, User.id == Collaboration.user_id
+    ).filter(
+        access,
+        Collaboration.collaboration_type == CollaborationType.SONG_EDIT
+    ).all()
+    collaborators = Counter(
+        username for _, username in collaborations
+        if username is not None and username != user.username
+    )
+
+    def period_details(kind: str) -> Dict[str, Any]:
+        return {
+            str(period): {
+                "total_songs": detail["count"],
+                "album_cover": detail["album_cover"],
+                "album_name": detail["album_name"],
+                "top_artists": [
+                    {"artist": name, "count": detail["artists"][name]}
+                    for name in _ranked(detail["artists"], STATS_ROLLUP_DETAIL_TOP_N)
+                ],
+                "top_albums": _top_albums(detail["albums"], STATS_ROLLUP_DETAIL_TOP_N, with_artist=False),
+            }
+            for period, detail in sorted(periods[kind].items())
+        }
+
+    return {
+        "total_songs": len(songs),
+        "by_status": {SongStatus.released.value: len(songs)} if songs else {},
+        "top_artists": [{"artist": name, "count": artists[name]} for name in _ranked(artists, STATS_ROLLUP_TOP_N)],
+        "top_albums": _top_albums(albums, STATS_ROLLUP_TOP_N, with_artist=True),
+        "top_packs": [
+            {
+                "pack": name,
+                "count": packs[name],
+                "artist": next(iter(_ranked(pack_artists[name], 1)), None),
+            }
+            for name in _ranked(packs, STATS_ROLLUP_TOP_PACKS)
+        ],
+        "total_artists": len(artists),
+        "total_albums": len({album for album, _ in albums}),
+        "total_packs": len(packs),
+        "total_collaborations": len(collaborations),
+        "total_collaborators": len({collaborator_id for collaborator_id, _ in collaborations}),
+        "top_collaborators": [{"author": name, "count": collaborators[name]} for name in _ranked(collaborators, STATS_ROLLUP_TOP_COLLABORATORS)],
+        "year_distribution": [{"year": year, "count": years[year]} for year in sorted(years)],
+        "years": period_details("years"),
+        "decades": period_details("decades"),
+    }
+
+
+def get_user_stats(db: Session, user: User) -> Dict[str, Any]:
+    """The user's stats rollup, rebuilt first if it is missing, dirty or too old."""
+    # Versions are bumped with Core UPDATEs, so never trust an identity-map copy
+    rollup = db.get(UserStatsRollup, user.id, populate_existing=True)
+    if (
+        rollup is not None
+        and rollup.built_version == rollup.version
+        and rollup.computed_at is not None
+        and datetime.utcnow() - rollup.computed_at < STATS_ROLLUP_MAX_AGE
+    ):
+        return json.loads(rollup.stats_json)
+    return rebuild_user_stats(db, user, rollup)
+
+
+def rebuild_user_stats(db: Session, user: User, rollup: Optional[UserStatsRollup] = None) -> Dict[str, Any]:
+    # Writes landing mid-rebuild bump version past this, so the row stays dirty
+    version = rollup.version if rollup is not None else 0
+    stats = compute_user_stats(db, user)
+
+    try:
+        if rollup is None:
+            db.add(UserStatsRollup(
+                user_id=user.id,
+                stats_json=json.dumps(stats),
+                version=version,
+                built_version=version,
+                computed_at=datetime.utcnow(),
+            ))
+        else:
+            db.query(UserStatsRollup).filter(UserStatsRollup.user_id == user.id).update({
+                UserStatsRollup.stats_json: json.dumps(stats),
+                UserStatsRollup.built_version: version,
+                UserStatsRollup.computed_at: datetime.utcnow(),
+            }, synchronize_session=False)
+        db.commit()
+    except IntegrityError:
+        # Another request created the row first; this result is still current
+        db.rollback()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Failed to store stats rollup for user {user.id}: {e}")
+    return stats
+
+
+# ==================== INVALIDATION ====================
+
+def _song_user_ids(song_ids):
+    """Owners and SONG_EDIT collaborators of ``song_ids`` (ids or a select of ids)"""
+    return or_(
+        UserStatsRollup.user_id.in_(select(Song.user_id).where(Song.id.in_(song_ids))),
+        UserStatsRollup.user_id.in_(
+            select(Collaboration.user_id).where(
+                Collaboration.song_id.in_(song_ids),
+                Collaboration.collaboration_type == CollaborationType.SONG_EDIT,
+            )
+        ),
+    )
+
+
+def mark_stats_dirty(connection, user_criteria) -> None:
+    """Bump the rollup version of every user matching ``user_criteria``."""
+    connection.execute(
+        update(UserStatsRollup).where(user_criteria).values(version=UserStatsRollup.version + 1)
+    )
+
+
+def mark_users_dirty(connection, user_ids: Iterable[int]) -> None:
+    user_ids = [user_id for user_id in user_ids if user_id is not None]
+    if user_ids:
+        mark_stats_dirty(connection, UserStatsRollup.user_id.in_(user_ids))
+
+
+def _is_released(status) -> bool:
+    return status == SongStatus.released.value
+
+
+@event.listens_for(Song, "after_insert")
+@event.listens_for(Song, "after_delete")
+def _song_added_or_removed(mapper, connection, target):
+    if _is_released(target.status):
+        mark_stats_dirty(connection, or_(
+            UserStatsRollup.user_id == target.user_id, _song_user_ids([target.id])
+        ))
+
+
+@event.listens_for(Song, "after_update")
+def _song_updated(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[attr].history.has_changes() for attr in STATS_SONG_FIELDS):
+        return
+    was_released = any(_is_released(status) for status in state.attrs.status.history.deleted)
+    if not (_is_released(target.status) or was_released):
+        return
+    # Ownership transfers affect the previous owner too
+    previous_owners = [owner_id for owner_id in state.attrs.user_id.history.deleted if owner_id is not None]
+    mark_stats_dirty(connection, or_(
+        UserStatsRollup.user_id.in_(previous_owners), _song_user_ids([target.id])
+    ))
+
+
+@event.listens_for(Collaboration, "after_insert")
+@event.listens_for(Collaboration, "after_delete")
+@event.listens_for(Collaboration, "after_update")
+def _collaboration_changed(mapper, connection, target):
+    if target.song_id is not None:
+        mark_stats_dirty(connection, or_(
+            UserStatsRollup.user_id == target.user_id, _song_user_ids([target.song_id])
+        ))
+
+
+@event.listens_for(Pack, "after_update")
+def _pack_renamed(mapper, connection, target):
+    if inspect(target).attrs.name.history.has_changes():
+        mark_stats_dirty(connection, _song_user_ids(select(Song.id).where(Song.pack_id == target.id)))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_write(orm_execute_state):
+    # Bulk query.update()/delete() skip the mapper events; mark before the rows change
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    entity = mapper.class_ if mapper is not None else None
+    if entity is Song:
+        song_ids = select(Song.id)
+    elif entity is Collaboration:
+        song_ids = select(Collaboration.song_id)
+    else:
+        return
+    whereclause = orm_execute_state.statement.whereclause
+    if whereclause is not None:
+        song_ids = song_ids.where(whereclause)
+    mark_stats_dirty(orm_execute_state.session.connection(), _song_user_ids(song_ids))
@@ -1,6 +1,10 @@
 import pytest
 import os
 import tempfile
+
+# Write activity logs on the test session instead of the buffered sink
+os.environ.setdefault("ACTIVITY_LOG_MODE", "sync")
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
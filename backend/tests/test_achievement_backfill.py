@@ -0,0 +1,100 @@
+from sqlalchemy import text
+
+from models import (
+    Achievement, AlbumSeries, Collaboration, CollaborationRequest, CollaborationType, FeatureRequest,
+    Pack, Song, SongProgress, SongStatus, UserAchievement, UserStats,
+)
+from api.achievements import AchievementsService
+from api.achievements.services.achievement_backfill import backfill_achievements, compute_user_metrics
+
+METRICS = {
+    "total_released", "total_packs", "total_collaborations", "total_feature_requests", "total_wip",
+    "total_future_created", "wip_creations", "unique_artists", "unique_years", "unique_decades",
+    "alphabet_coverage", "wip_completions", "completed_songs", "completed_packs", "series_created",
+    "completed_series", "collaborations_added", "collaborations_total", "public_wips",
+    "collab_requests_sent", "bug_reports", "profile_pic", "personal_link", "contact_method",
+}
+
+
+def _library(db, user, other):
+    db.execute(text("CREATE TABLE user_workflows (id INTEGER PRIMARY KEY, user_id INTEGER)"))
+    db.execute(text("CREATE TABLE user_workflow_steps (id INTEGER PRIMARY KEY, workflow_id INTEGER, step_name TEXT, order_index INTEGER)"))
+    db.execute(text("INSERT INTO user_workflows (id, user_id) VALUES (1, :uid)"), {"uid": user.id})
+    db.execute(text("INSERT INTO user_workflow_steps (workflow_id, step_name, order_index) VALUES (1, 'drums', 0), (1, 'bass', 1)"))
+
+    pack = Pack(name="Prog Pack", user_id=user.id)
+    db.add(pack)
+    db.commit()
+    series = AlbumSeries(series_number=1, album_name="Moving Pictures", artist_name="Rush", pack_id=pack.id)
+    db.add(series)
+    db.commit()
+    songs = [
+        Song(title="Tom Sawyer", artist="Rush", year=1981, status=SongStatus.released, user_id=user.id,
+             pack_id=pack.id, album_series_id=series.id),
+        Song(title="YYZ", artist="rush", year=1981, status=SongStatus.released, user_id=user.id,
+             pack_id=pack.id, album_series_id=series.id),
+        Song(title="Roundabout", artist="Yes", year=1971, status=SongStatus.released, user_id=user.id),
+        Song(title="Draft", artist="Genesis", status=SongStatus.wip, user_id=user.id, is_public=True),
+        Song(title="Theirs", artist="Tool", year=2001, status=SongStatus.released, user_id=other.id),
+    ]
+    db.add_all(songs)
+    db.commit()
+    for song in songs[:2]:
+        db.add_all([SongProgress(song_id=song.id, step_name=step, is_completed=True) for step in ("drums", "bass")])
+    db.add_all([
+        Collaboration(song_id=songs[0].id, user_id=other.id, collaboration_type=CollaborationType.SONG_EDIT),
+        Collaboration(song_id=songs[4].id, user_id=user.id, collaboration_type=CollaborationType.SONG_EDIT),
+        FeatureRequest(title="Bug: crash", description="x", user_id=user.id),
+        CollaborationRequest(song_id=songs[4].id, requester_id=user.id, owner_id=other.id, message="hi"),
+    ])
+    user.website_url = "https://example.com"
+    db.commit()
+
+
+def _achievement(code, metric_type, target_value, points=10):
+    return Achievement(code=code, name=code, description=code, icon="🏆", category="test",
+                       points=points, rarity="common", target_value=target_value, metric_type=metric_type)
+
+
+class TestAchievementBackfill:
+    """Test the set-based retroactive achievement backfill"""
+
+    def test_bulk_metrics_match_per_user_calculation(self, test_db, test_user, test_user2):
+        _library(test_db, test_user, test_user2)
+        service = AchievementsService()
+
+        bulk = compute_user_metrics(test_db, [test_user.id, test_user2.id])
+
+        for user in (test_user, test_user2):
+            stats = service.update_user_stats(test_db, user.id)
+            per_user = service._bulk_calculate_metrics(test_db, user.id, set(METRICS), stats)
+            assert {metric: bulk[user.id][metric] for metric in METRICS} == per_user
+        assert (bulk[test_user.id]["completed_packs"], bulk[test_user.id]["completed_series"]) == (1, 1)
+
+    def test_backfill_awards_missing_achievements_in_chunks(self, test_db, test_user, test_user2):
+        _library(test_db, test_user, test_user2)
+        first_release, three_released, first_finish = (
+            _achievement("first_release", "total_released", 1),
+            _achievement("three_released", "total_released", 3, points=25),
+            _achievement("first_finish", "wip_completions", 1),
+        )
+        test_db.add_all([first_release, three_released, first_finish])
+        test_db.commit()
+        test_db.add(UserAchievement(user_id=test_user.id, achievement_id=first_release.id))
+        test_db.add(UserStats(user_id=test_user.id, total_points=10, total_wip_created=4))
+        test_db.commit()
+
+        dry_run = backfill_achievements(test_db, dry_run=True, chunk_size=1, verbose=False)
+        assert dry_run["awarded"] == {test_user.id: ["three_released", "first_finish"], test_user2.id: ["first_release"]}
+        assert (dry_run["chunks"], dry_run["awards"], dry_run["points"]) == (2, 3, 45)
+        assert test_db.query(UserAchievement).count() == 1
+
+        result = backfill_achievements(test_db, chunk_size=1, verbose=False)
+        assert result["awarded"] == dry_run["awarded"]
+        stats = test_db.get(UserStats, test_user.id)
+        test_db.refresh(stats)
+        # Points are added to the existing total; lifetime counters are kept
+        assert (stats.total_points, stats.total_wip_created, stats.total_released) == (45, 4, 3)
+        assert test_db.get(UserStats, test_user2.id).total_points == 10
+
+        assert backfill_achievements(test_db, verbose=False)["awards"] == 0
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from models import Achievement, Collaboration, CollaborationType, Pack, Song, SongStatus, UserAchievement, UserStats
+from api.achievements import AchievementsService
+from api.achievements.services.achievement_events import (
+    PACK_CREATED, SONG_RELEASED, SPOTIFY_IMPORT, metrics_for_events, song_status_event,
+)
+from api.songs.services.song_service import SongService
+from services.job_queue import run_pending_jobs
+
+
+@pytest.fixture
+def service(test_db):
+    test_db.add_all([
+        Achievement(code="first_release", name="First Release", description="Release a song", icon="✨",
+                    category="milestone_released", points=10, rarity="common", target_value=1, metric_type="total_released"),
+        Achievement(code="pack_starter", name="Pack Starter", description="Create a pack", icon="📦",
+                    category="milestone_packs", points=10, rarity="common", target_value=1, metric_type="total_packs"),
+        Achievement(code="importer", name="Importer", description="Import from Spotify", icon="🎧",
+                    category="activity", points=10, rarity="common", target_value=2, metric_type="total_spotify_imports"),
+    ])
+    test_db.commit()
+    return AchievementsService()
+
+
+def _earned(db, user_id):
+    return {code for (code,) in db.query(Achievement.code).join(UserAchievement).filter(UserAchievement.user_id == user_id)}
+
+
+class TestUserStatsCounters:
+    """Test that UserStats counters follow writes without recounting"""
+
+    def test_counters_follow_song_pack_and_collaboration_writes(self, test_db, test_user, test_user2, service):
+        test_db.add(Song(title="Existing", artist="Rush", user_id=test_user.id, status=SongStatus.released))
+        test_db.commit()
+        stats = service.get_or_create_user_stats(test_db, test_user.id)
+        assert (stats.total_songs, stats.total_released) == (1, 1)
+
+        song = Song(title="Tom Sawyer", artist="Rush", user_id=test_user.id, status=SongStatus.wip)
+        test_db.add_all([song, Pack(name="Rush Pack", user_id=test_user.id)])
+        test_db.commit()
+        test_db.add(Collaboration(song_id=song.id, user_id=test_user2.id, collaboration_type=CollaborationType.SONG_EDIT))
+        song.status = SongStatus.released
+        test_db.commit()
+        test_db.refresh(stats)
+        assert (stats.total_songs, stats.total_released, stats.total_wip) == (2, 2, 0)
+        assert (stats.total_packs, stats.total_collaborations) == (1, 1)
+
+        # Bulk delete, as the remove-collaborator endpoints do
+        test_db.query(Collaboration).filter(Collaboration.song_id == song.id).delete(synchronize_session=False)
+        test_db.delete(song)
+        test_db.commit()
+        test_db.refresh(stats)
+        assert (stats.total_songs, stats.total_released, stats.total_collaborations) == (1, 1, 0)
+
+        counted = service.repository.count_user_stats(test_db, test_user.id)
+        assert {column: getattr(stats, column) for column in counted} == counted
+
+
+class TestAchievementEvents:
+    """Test event-driven achievement evaluation"""
+
+    def test_event_metric_mapping(self):
+        assert song_status_event("Released") == SONG_RELEASED
+        assert song_status_event(SongStatus.wip) == "song_started"
+        assert "total_packs" not in metrics_for_events([SONG_RELEASED])
+        assert metrics_for_events([PACK_CREATED]) == {"total_packs"}
+
+    def test_only_metrics_the_event_moves_are_checked(self, test_db, test_user, service, monkeypatch):
+        service.get_or_create_user_stats(test_db, test_user.id)
+        test_db.add_all([
+            Song(title="YYZ", artist="Rush", user_id=test_user.id, status=SongStatus.released),
+            Pack(name="Rush Pack", user_id=test_user.id),
+        ])
+        test_db.commit()
+
+        def no_recount(*args, **kwargs):
+            raise AssertionError("events must not recount")
+        monkeypatch.setattr(service.repository, "count_user_stats", no_recount)
+
+        assert service.record_events(test_db, test_user.id, [SONG_RELEASED]) == ["first_release"]
+        assert _earned(test_db, test_user.id) == {"first_release"}
+        assert service.record_events(test_db, test_user.id, [SONG_RELEASED]) == []
+        assert service.record_events(test_db, test_user.id, [PACK_CREATED]) == ["pack_starter"]
+
+    def test_spotify_import_counts_itself(self, test_db, test_user, service):
+        service.get_or_create_user_stats(test_db, test_user.id)
+
+        assert service.record_events(test_db, test_user.id, [SPOTIFY_IMPORT]) == []
+        assert service.record_events(test_db, test_user.id, [SPOTIFY_IMPORT]) == ["importer"]
+        assert test_db.get(UserStats, test_user.id).total_spotify_imports == 2
+
+    def test_song_update_queues_status_event(self, test_db, test_user, service):
+        song = Song(title="Limelight", artist="Rush", user_id=test_user.id, status=SongStatus.wip)
+        test_db.add(song)
+        test_db.commit()
+
+        SongService(test_db).update_song(song.id, {"status": SongStatus.released}, test_user)
+        run_pending_jobs(sessionmaker(bind=test_db.get_bind()))
+
+        assert _earned(test_db, test_user.id) == {"first_release"}
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import ActivityLog, Base, User
+from api import activity_logger
+from api.activity_logger import ActivityLogSink, log_activity
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'activity.db'}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(User(username="logger", email="logger@example.com", hashed_password="x"))
+        db.commit()
+    return engine
+
+
+def _row(n):
+    return {"user_id": 1, "activity_type": "login", "description": f"entry {n}",
+            "metadata_json": None, "created_at": None}
+
+
+def _count(engine):
+    with sessionmaker(bind=engine)() as db:
+        return db.query(ActivityLog).count()
+
+
+class TestActivityLogSink:
+    """Test the buffered activity log writer"""
+
+    def test_flush_writes_one_batch(self, engine):
+        sink = ActivityLogSink(engine=engine, flush_interval=60)
+        for n in range(5):
+            sink.submit(_row(n))
+
+        assert _count(engine) == 0
+        assert sink.flush() == 5
+        assert _count(engine) == 5
+        assert (sink.queued, sink.written, sink.dropped) == (5, 5, 0)
+
+    def test_batch_size_triggers_background_flush(self, engine):
+        sink = ActivityLogSink(engine=engine, batch_size=3, flush_interval=60)
+        for n in range(3):
+            sink.submit(_row(n))
+
+        deadline = time.monotonic() + 2
+        while sink.written < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _count(engine) == 3
+
+    def test_full_buffer_drops_entries(self, engine):
+        sink = ActivityLogSink(engine=engine, flush_interval=60, max_queue=2)
+
+        results = [sink.submit(_row(n)) for n in range(3)]
+
+        assert results == [True, True, False]
+        assert sink.dropped == 1
+        assert sink.flush() == 2
+
+    def test_log_activity_uses_sink_when_buffered(self, engine, monkeypatch):
+        sink = ActivityLogSink(engine=engine, flush_interval=60)
+        monkeypatch.setattr(activity_logger, "ACTIVITY_LOG_MODE", "buffered")
+        monkeypatch.setattr(activity_logger, "activity_log_sink", sink)
+
+        # The request session is never touched
+        log_activity(None, 1, "login", "logged in", {"ip": "127.0.0.1"})
+
+        assert sink.pending() == 1
+        sink.flush()
+        assert _count(engine) == 1
@@ -0,0 +1,115 @@
+import threading
+import time
+
+from models import Artist, Song, SongStatus
+from api.spotify.services.bulk_enhancement_service import BulkEnhancementService
+from utils.concurrency import TokenBucket, map_concurrent, rate_limited
+
+
+class FakeSpotify:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def search(self, q, type="track", limit=1):
+        with self.lock:
+            self.calls.append(("search", q))
+        if q.startswith("Unknown"):
+            return {"tracks": {"items": []}}
+        if q.startswith("Broken"):
+            raise RuntimeError("boom")
+        return {"tracks": {"items": [{
+            "id": f"track-{q}",
+            "album": {"name": "Paranoid", "release_date": "1970-09-18",
+                      "images": [{"url": "http://img/album"}]},
+            "artists": [{"name": "Black Sabbath", "id": "sabbath"}],
+        }]}}
+
+    def artists(self, ids):
+        with self.lock:
+            self.calls.append(("artists", tuple(ids)))
+        return {"artists": [{"id": i, "images": [{"url": f"http://img/{i}"}]} for i in ids]}
+
+
+class TestConcurrencyHelpers:
+    """Test the token bucket and bounded fan-out helpers"""
+
+    def test_token_bucket_limits_rate(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        # First token is free, the remaining five refill at 50/s
+        assert time.monotonic() - started >= 0.09
+
+    def test_rate_limited_proxy_takes_tokens(self):
+        bucket = TokenBucket(rate=1000, capacity=5)
+        client = rate_limited(FakeSpotify(), bucket)
+
+        client.search(q="Paranoid Black Sabbath")
+
+        assert bucket._tokens < 5
+
+    def test_map_concurrent_reports_errors_per_item(self):
+        def square(n):
+            if n == 3:
+                raise ValueError("three")
+            return n * n
+
+        results = {item: (result, error) for item, result, error in map_concurrent(square, range(5), 3)}
+
+        assert results[4] == (16, None)
+        assert isinstance(results[3][1], ValueError)
+
+
+class TestBulkEnhancementService:
+    """Test the concurrent bulk enhancement engine"""
+
+    def _song(self, db, user, title):
+        song = Song(title=title, artist="Sabbath", user_id=user.id, status=SongStatus.future)
+        db.add(song)
+        db.commit()
+        return song
+
+    def test_enhances_batches_and_reports_every_song(self, test_db, test_user, test_user2):
+        songs = [self._song(test_db, test_user, f"Song {i}") for i in range(5)]
+        unknown = self._song(test_db, test_user, "Unknown")
+        broken = self._song(test_db, test_user, "Broken")
+        foreign = self._song(test_db, test_user2, "Not Mine")
+        sp = FakeSpotify()
+
+        ids = [s.id for s in songs] + [unknown.id, broken.id, foreign.id]
+        results = list(BulkEnhancementService(commit_every=2).enhance_songs(ids, test_db, test_user.id, sp=sp))
+        final = [r for r in results if r["status"] != "matched"]
+        status = {r["song_id"]: r["status"] for r in final}
+
+        assert len(final) == len(ids)
+        # Each match is reported as its search completes, ahead of its batch commit
+        events = [(r["song_id"], r["status"]) for r in results]
+        for song in songs:
+            assert events.index((song.id, "matched")) < events.index((song.id, "success"))
+        first_commit = [event[1] for event in events].index("success")
+        assert [event[1] for event in events[:first_commit]].count("matched") == 2
+        assert all(status[s.id] == "success" for s in songs)
+        assert status[unknown.id] == "no_change"
+        assert status[broken.id] == "error"
+        assert status[foreign.id] == "failed"
+
+        artist = test_db.query(Artist).filter(Artist.name == "Black Sabbath").one()
+        assert artist.image_url == "http://img/sabbath"
+        for song in songs:
+            test_db.refresh(song)
+            assert (song.album, song.year, song.artist_id) == ("Paranoid", 1970, artist.id)
+        # No per-song track/artist calls: only searches plus one artists batch
+        assert [c for c in sp.calls if c[0] != "search"] == [("artists", ("sabbath",))]
+
+    def test_preserve_artist_album(self, test_db, test_user):
+        song = self._song(test_db, test_user, "Song")
+
+        list(BulkEnhancementService().enhance_songs(
+            [song.id], test_db, test_user.id, preserve_artist_album=True, sp=FakeSpotify()
+        ))
+
+        test_db.refresh(song)
+        assert (song.artist, song.album, song.year) == ("Sabbath", None, 1970)
+        assert song.album_cover == "http://img/album"
@@ -0,0 +1,201 @@
+import threading
+import time
+
+from utils.cache import (
+    SimpleCache, SingleFlight, cached, cache, user_tag,
+    invalidate_user_caches, invalidate_leaderboard_cache
+)
+
+
+class TestSimpleCache:
+    """Test the bounded LRU cache and tag invalidation"""
+
+    def test_get_set_and_expiry(self):
+        c = SimpleCache()
+        c.set("a", 1, ttl=60)
+        assert c.get("a") == 1
+        c.set("b", 2, ttl=-1)
+        assert c.get("b") is None
+
+    def test_lru_eviction_by_entry_count(self):
+        c = SimpleCache(max_entries=3)
+        for key in ("a", "b", "c"):
+            c.set(key, key)
+        # Touch "a" so "b" becomes least recently used
+        assert c.get("a") == "a"
+        c.set("d", "d")
+
+        assert c.get("b") is None
+        assert c.get("a") == "a"
+        assert len(c) == 3
+        assert c.stats()["evictions"] == 1
+
+    def test_eviction_by_memory(self):
+        c = SimpleCache(max_bytes=20_000)
+        for i in range(10):
+            c.set(f"k{i}", "x" * 5_000)
+
+        stats = c.stats()
+        assert stats["approx_bytes"] <= 20_000
+        assert stats["total_entries"] < 10
+        assert c.get("k9") is not None
+
+    def test_invalidate_tag_only_touches_tagged_entries(self):
+        c = SimpleCache()
+        c.set("user:1:progress", "p1", tags=[user_tag(1)])
+        c.set("user:1:other", "o1", tags=[user_tag(1), "leaderboard"])
+        c.set("user:2:progress", "p2", tags=[user_tag(2)])
+
+        assert c.invalidate_tag(user_tag(1)) == 2
+        assert c.get("user:1:progress") is None
+        assert c.get("user:1:other") is None
+        assert c.get("user:2:progress") == "p2"
+        # Tag index is cleaned up with the entries
+        assert c.invalidate_tag("leaderboard") == 0
+
+    def test_concurrent_writers(self):
+        c = SimpleCache(max_entries=50)
+
+        def writer(offset):
+            for i in range(500):
+                c.set(f"{offset}:{i}", i, tags=[f"t{offset}"])
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(c) == 50
+
+
+class TestCachedDecorator:
+    """Test the cached() decorator with tags"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_tagged_results_invalidated_by_helpers(self):
+        calls = []
+
+        @cached(ttl=60, key_func=lambda user_id: f"user:{user_id}:thing", tags=lambda user_id: [user_tag(user_id)])
+        def load(user_id):
+            calls.append(user_id)
+            return {"user": user_id}
+
+        @cached(ttl=60, key_func=lambda: "leaderboard:test", tags=["leaderboard"])
+        def board():
+            calls.append("board")
+            return ["row"]
+
+        load(1)
+        load(1)
+        board()
+        board()
+        assert calls == [1, "board"]
+
+        invalidate_user_caches(1)
+        load(1)
+        board()
+        assert calls == [1, "board", 1]
+
+        invalidate_leaderboard_cache()
+        board()
+        assert calls == [1, "board", 1, "board"]
+
+
+class TestSingleFlight:
+    """Test request coalescing for expensive computations"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_concurrent_callers_share_one_computation(self):
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "value"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", compute)))
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=lambda: results.append(flight.do("k", compute))) for _ in range(5)]
+        for t in followers:
+            t.start()
+        for t in [leader] + followers:
+            t.join()
+
+        assert calls == [1]
+        assert results == ["value"] * 6
+        assert not flight.in_flight("k")
+
+    def test_followers_receive_leader_exception(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def failing():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                flight.do("k", failing)
+            except ValueError as e:
+                errors.append(str(e))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        leader.join()
+        follower.join()
+
+        assert errors == ["boom", "boom"]
+
+    def test_stale_value_served_while_refreshing(self):
+        calls = []
+
+        @cached(ttl=0, key_func=lambda: "swr:test", stale_ttl=60)
+        def load():
+            calls.append(1)
+            return len(calls)
+
+        assert load() == 1
+        time.sleep(0.01)
+        # Expired but inside the stale window: this caller refreshes
+        assert load() == 2
+        assert len(calls) == 2
+
+    def test_concurrent_workflow_requests_share_one_load(self, monkeypatch):
+        from api import workflows
+
+        loads = []
+
+        def slow_load(db, user_id, not_found_detail):
+            loads.append(user_id)
+            time.sleep(0.1)
+            return {"id": 1, "user_id": user_id, "steps": []}
+
+        monkeypatch.setattr(workflows, "_load_workflow", slow_load)
+        threads = [threading.Thread(target=workflows._get_or_load_workflow, args=(None, 7, "")) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert loads == [7]
+
+        # Cached in the shared LRU cache, dropped with the user's other entries
+        invalidate_user_caches(7)
+        workflows._get_or_load_workflow(None, 7, "")
+        workflows.clear_workflow_cache(7)
+        workflows._get_or_load_workflow(None, 7, "")
+        assert loads == [7, 7, 7]
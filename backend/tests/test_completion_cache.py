@@ -0,0 +1,64 @@
+from services import completion_cache
+from services.completion_cache import (
+    get_cached_completion_data,
+    set_cached_completion_data,
+    invalidate_song_cache,
+    invalidate_all_cache,
+    bump_workflow_version,
+)
+
+
+def _entry(completion, remaining):
+    return {"completion": completion, "remaining_steps": remaining, "workflow_fields": ["midi", "drums"]}
+
+
+class TestCompletionCache:
+    """Test the per-song completion cache"""
+
+    def setup_method(self):
+        invalidate_all_cache()
+
+    def test_overlapping_pages_reuse_entries(self):
+        set_cached_completion_data({1: _entry(50, ["Drums"]), 2: _entry(100, [])}, {1: 10, 2: 10})
+
+        found, missing = get_cached_completion_data([(1, 10), (2, 10), (3, 10)], True)
+
+        assert set(found) == {1, 2}
+        assert missing == [3]
+        assert found[1]["remaining_steps"] == ["Drums"]
+
+    def test_remaining_steps_stripped_when_not_requested(self):
+        set_cached_completion_data({1: _entry(50, ["Drums"])}, {1: 10})
+
+        found, _ = get_cached_completion_data([(1, 10)], False)
+
+        assert found[1]["remaining_steps"] == []
+        assert found[1]["completion"] == 50
+
+    def test_invalidate_song_touches_only_that_song(self):
+        set_cached_completion_data({1: _entry(50, []), 2: _entry(0, [])}, {1: 10, 2: 10})
+
+        invalidate_song_cache(1)
+        found, missing = get_cached_completion_data([(1, 10), (2, 10)], True)
+
+        assert missing == [1]
+        assert set(found) == {2}
+
+    def test_workflow_change_and_owner_change_miss(self):
+        set_cached_completion_data({1: _entry(50, []), 2: _entry(0, [])}, {1: 10, 2: 20})
+
+        bump_workflow_version(10)
+        _, missing = get_cached_completion_data([(1, 10), (2, 99)], True)
+
+        assert missing == [1, 2]
+
+    def test_size_bound(self, monkeypatch):
+        monkeypatch.setattr(completion_cache, "_max_entries", 3)
+        set_cached_completion_data(
+            {sid: _entry(0, []) for sid in range(1, 6)}, {sid: 10 for sid in range(1, 6)}
+        )
+
+        found, missing = get_cached_completion_data([(sid, 10) for sid in range(1, 6)], True)
+
+        assert set(found) == {3, 4, 5}
+        assert missing == [1, 2]
@@ -0,0 +1,76 @@
+from models import RockBandDLC
+from api.rockband_dlc import check_dlc_status_batch, DLCBatchCheckRequest
+from services import dlc_index
+from services.dlc_index import DLCIndex, get_dlc_index, invalidate_dlc_index
+
+
+ROWS = [
+    (1, "Paranoid", "Black Sabbath", "RB2"),
+    (2, "Iron Man (Live)", "Black Sabbath", "DLC"),
+    (3, "Enter Sandman", "Metallica", "DLC"),
+    (4, "Don't Fear the Reaper", "Blue Öyster Cult", "RB1"),
+]
+
+
+class TestDLCIndex:
+    """Test the in-memory DLC match index"""
+
+    def test_exact_match_is_normalized(self):
+        index = DLCIndex(ROWS)
+
+        result = index.lookup("PARANOID - 2009 Remaster", "black sabbath")
+
+        assert result["match_type"] == "exact"
+        assert result["dlc_entry"]["id"] == 1
+        assert index.is_dlc("Don't Fear The Reaper", "Blue Oyster Cult")
+
+    def test_prefix_and_fuzzy_matches(self):
+        index = DLCIndex(ROWS)
+
+        partial = index.lookup("Iron Man", "Sabbath")
+        assert partial["match_type"] == "partial"
+        assert partial["dlc_entry"]["id"] == 2
+
+        fuzzy = index.lookup("Enter Sandmann", "Metallica")
+        assert fuzzy["match_type"] == "fuzzy"
+        assert fuzzy["dlc_entry"]["id"] == 3
+
+        assert index.lookup("Nothing Else Matters", "Metallica")["is_dlc"] is False
+
+    def test_reloads_when_table_changes(self, test_db, monkeypatch):
+        invalidate_dlc_index()
+        test_db.add(RockBandDLC(title="Paranoid", artist="Black Sabbath", origin="RB2"))
+        test_db.commit()
+        assert get_dlc_index(test_db).is_dlc("Paranoid", "Black Sabbath")
+
+        test_db.add(RockBandDLC(title="War Pigs", artist="Black Sabbath", origin="DLC"))
+        test_db.commit()
+        # Within the check interval the loaded index is reused
+        assert not get_dlc_index(test_db).is_dlc("War Pigs", "Black Sabbath")
+
+        monkeypatch.setattr(dlc_index, "DLC_INDEX_CHECK_INTERVAL", 0)
+        assert get_dlc_index(test_db).is_dlc("War Pigs", "Black Sabbath")
+
+        # In-place edits keep the row count and max id but move updated_at
+        test_db.query(RockBandDLC).filter(RockBandDLC.title == "War Pigs").one().title = "Planet Caravan"
+        test_db.commit()
+        assert get_dlc_index(test_db).is_dlc("Planet Caravan", "Black Sabbath")
+        invalidate_dlc_index()
+
+    def test_batch_endpoint(self, test_db):
+        invalidate_dlc_index()
+        test_db.add(RockBandDLC(title="Paranoid", artist="Black Sabbath", origin="RB2"))
+        test_db.commit()
+
+        response = check_dlc_status_batch(
+            DLCBatchCheckRequest(songs=[
+                {"title": "Paranoid", "artist": "Black Sabbath"},
+                {"title": "Unknown", "artist": "Nobody"},
+            ]),
+            db=test_db,
+        )
+
+        assert response["count"] == 2
+        assert [r["is_dlc"] for r in response["results"]] == [True, False]
+        assert response["results"][0]["title"] == "Paranoid"
+        invalidate_dlc_index()
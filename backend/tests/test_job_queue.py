@@ -0,0 +1,121 @@
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from models import ActivityLog, BackgroundJob, Collaboration, CollaborationType, Notification, Song, SongStatus
+from api.jobs import get_job_status
+from api.songs.services.song_jobs import SONG_ACHIEVEMENTS_JOB, SONG_UPDATED_JOB, enqueue_song_enhancement
+from api.songs.services.song_service import SongService
+from services.job_queue import enqueue_job, job_handler, run_pending_jobs
+
+calls = []
+
+
+@job_handler("test_job")
+def _run_test_job(db, user_id, payload):
+    calls.append((user_id, payload))
+    if payload.get("fail"):
+        raise RuntimeError("boom")
+
+
+@job_handler("test_dedupe_job", dedupe=True)
+def _run_test_dedupe_job(db, user_id, payload):
+    calls.append((user_id, payload))
+
+
+@pytest.fixture
+def session_factory(test_db):
+    calls.clear()
+    return sessionmaker(bind=test_db.get_bind(), expire_on_commit=False)
+
+
+class TestJobQueue:
+    """Test the persisted background job queue"""
+
+    def test_job_runs_after_commit(self, test_db, test_user, session_factory):
+        job = enqueue_job(test_db, "test_job", test_user.id, {"n": 1})
+        test_db.commit()
+
+        assert run_pending_jobs(session_factory) == 1
+        test_db.refresh(job)
+        assert job.status == "succeeded"
+        assert calls == [(test_user.id, {"n": 1})]
+        assert get_job_status(job.id, test_db, test_user).status == "succeeded"
+
+    def test_failed_job_retried_then_failed(self, test_db, test_user, session_factory):
+        job = enqueue_job(test_db, "test_job", test_user.id, {"fail": True}, max_attempts=2)
+        test_db.commit()
+
+        run_pending_jobs(session_factory)
+        test_db.refresh(job)
+        assert (job.status, job.attempts) == ("queued", 1)
+        assert "boom" in job.last_error
+        # Backoff: not due again yet
+        assert run_pending_jobs(session_factory) == 0
+
+        job.run_after = datetime.utcnow()
+        test_db.commit()
+        run_pending_jobs(session_factory)
+        test_db.refresh(job)
+        assert (job.status, job.attempts) == ("failed", 2)
+
+    def test_dedupe_merges_queued_job(self, test_db, test_user, session_factory):
+        first = enqueue_job(test_db, "test_dedupe_job", test_user.id, {"a": True, "b": False})
+        test_db.commit()
+        second = enqueue_job(test_db, "test_dedupe_job", test_user.id, {"a": False, "b": True})
+        test_db.commit()
+
+        assert second.id == first.id
+        assert test_db.query(BackgroundJob).count() == 1
+        run_pending_jobs(session_factory)
+        assert calls == [(test_user.id, {"a": True, "b": True})]
+
+
+class TestSongWriteJobs:
+    """Test that song updates hand their side effects to the job queue"""
+
+    def test_update_song_queues_side_effects(self, test_db, test_user, test_user2, session_factory):
+        song = Song(title="Paranoid", artist="Black Sabbath", user_id=test_user.id, status=SongStatus.wip)
+        test_db.add(song)
+        test_db.commit()
+        test_db.add(Collaboration(song_id=song.id, user_id=test_user2.id,
+                                  collaboration_type=CollaborationType.SONG_EDIT))
+        test_db.commit()
+
+        SongService(test_db).update_song(song.id, {"status": SongStatus.future}, test_user)
+
+        jobs = {job.job_type: job for job in test_db.query(BackgroundJob).all()}
+        assert set(jobs) == {SONG_UPDATED_JOB, SONG_ACHIEVEMENTS_JOB}
+        assert json.loads(jobs[SONG_UPDATED_JOB].payload_json)["collaborator_notice"] is not None
+        # Nothing ran inline
+        assert test_db.query(ActivityLog).count() == 0
+        assert test_db.query(Notification).filter(Notification.user_id == test_user2.id).count() == 0
+
+        assert run_pending_jobs(session_factory) == 2
+        assert test_db.query(ActivityLog).filter(ActivityLog.activity_type == "update_song").count() == 1
+        assert test_db.query(Notification).filter(Notification.user_id == test_user2.id).count() == 1
+
+    def test_enhanced_duplicate_is_flagged_not_deleted(self, test_db, test_user, session_factory, monkeypatch):
+        import api.spotify
+
+        def fake_enhance(song_id, db, preserve_artist_album=False):
+            db.get(Song, song_id).title = "Paranoid"
+            db.commit()
+            return True
+
+        monkeypatch.setattr(api.spotify, "auto_enhance_song", fake_enhance)
+        existing = Song(title="Paranoid", artist="Black Sabbath", user_id=test_user.id, status=SongStatus.released)
+        new = Song(title="Paranoid (Live)", artist="Black Sabbath", user_id=test_user.id, status=SongStatus.future)
+        test_db.add_all([existing, new])
+        test_db.commit()
+
+        enqueue_song_enhancement(test_db, test_user.id, [new.id])
+        test_db.commit()
+        assert run_pending_jobs(session_factory) == 1
+
+        # The client already has the new song: it stays, and the user gets a link to it
+        assert test_db.query(Song).filter(Song.user_id == test_user.id).count() == 2
+        notice = test_db.query(Notification).filter(Notification.user_id == test_user.id).one()
+        assert (notice.title, notice.related_song_id) == ("Possible duplicate song", new.id)
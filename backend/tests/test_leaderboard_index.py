@@ -0,0 +1,79 @@
+import pytest
+
+from models import Achievement, User, UserAchievement, UserStats
+from api.achievements import AchievementsService
+from api.public_profiles import get_user_leaderboard_rank
+from services.leaderboard_index import LeaderboardIndex, get_leaderboard_index, invalidate_leaderboard_index
+from utils.cache import cache
+
+
+@pytest.fixture
+def ranked_users(test_db):
+    invalidate_leaderboard_index()
+    cache.clear()
+    users = [User(username=name, email=f"{name}@example.com", hashed_password="x") for name in ("ann", "bob", "cat", "dan", "eve")]
+    test_db.add_all(users)
+    test_db.commit()
+    test_db.add_all([
+        UserStats(user_id=user.id, total_points=points)
+        for user, points in zip(users, (30, 50, 30, 10, 0))
+    ])
+    test_db.commit()
+    yield {user.username: user for user in users}
+    invalidate_leaderboard_index()
+
+
+class TestLeaderboardIndex:
+    """Test the in-memory leaderboard rank index"""
+
+    def test_ranks_by_points_then_username(self):
+        index = LeaderboardIndex([(1, "cat", 30), (2, "bob", 50), (3, "ann", 30), (4, "dan", 10), (5, "eve", 0)])
+
+        assert len(index) == 4
+        assert [(r.rank, r.username) for r in index.top(3)] == [(1, "bob"), (2, "ann"), (3, "cat")]
+        assert [r.username for r in index.top(2, offset=2)] == ["cat", "dan"]
+        assert (index.rank(1), index.rank(4), index.rank(5)) == (3, 4, None)
+        assert [r.rank for r in index.around(3, radius=1)] == [1, 2, 3]
+        assert [r.username for r in index.around(2, radius=1)] == ["bob", "ann"]
+        assert index.around(5, radius=1) == []
+
+    def test_point_changes_invalidate_ranks(self, test_db, ranked_users):
+        service = AchievementsService()
+        dan = ranked_users["dan"]
+        first_release = Achievement(code="first_release", name="First Release", description="x", icon="✨",
+                                    category="test", points=10, rarity="common", target_value=1, metric_type="total_released")
+        test_db.add(first_release)
+        test_db.commit()
+        test_db.add(UserAchievement(user_id=ranked_users["bob"].id, achievement_id=first_release.id))
+        test_db.commit()
+
+        leaderboard = service.get_leaderboard(test_db, dan.id, limit=2)
+        assert [(e.username, e.rank, e.total_achievements) for e in leaderboard.leaderboard] == [("bob", 1, 1), ("ann", 2, 0)]
+        assert (leaderboard.current_user_rank, leaderboard.total_users) == (4, 4)
+        assert get_user_leaderboard_rank(test_db, ranked_users["eve"].id) is None
+
+        service.repository.update_user_total_points(test_db, dan.id, 25)
+        assert get_user_leaderboard_rank(test_db, dan.id) == 2
+        around = service.get_leaderboard_around_user(test_db, dan.id, radius=1)
+        assert [(e.username, e.total_points) for e in around.leaderboard] == [("bob", 50), ("dan", 35), ("ann", 30)]
+
+    def test_uncommitted_change_is_picked_up_after_commit(self, test_db, ranked_users):
+        service = AchievementsService()
+        eve = ranked_users["eve"]
+
+        service.repository.update_user_total_points(test_db, eve.id, 100, commit=False)
+        get_leaderboard_index(test_db)  # rebuilt while the write is pending
+        test_db.commit()
+
+        assert get_leaderboard_index(test_db).rank(eve.id) == 1
+
+    def test_inactive_users_are_not_ranked(self, test_db, ranked_users):
+        assert get_leaderboard_index(test_db).rank(ranked_users["bob"].id) == 1
+
+        ranked_users["bob"].is_active = False
+        test_db.commit()
+        invalidate_leaderboard_index()
+
+        index = get_leaderboard_index(test_db)
+        assert index.rank(ranked_users["bob"].id) is None
+        assert (len(index), index.rank(ranked_users["ann"].id)) == (3, 1)
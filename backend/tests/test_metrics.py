@@ -0,0 +1,57 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils.metrics import MetricsRegistry, MetricsMiddleware, HTTP_REQUEST_SECONDS, HTTP_ERRORS_TOTAL
+
+
+class TestMetricsRegistry:
+    """Test text exposition rendering"""
+
+    def test_counter_gauge_and_histogram_render(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_total", "Demo counter", ("kind",))
+        gauge = registry.gauge("demo_gauge", "Demo gauge", ("state",))
+        histogram = registry.histogram("demo_seconds", "Demo histogram", buckets=(0.1, 1.0))
+
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        gauge.add_collector(lambda: [(("in_use",), 3)])
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        text = registry.render()
+
+        assert "# TYPE demo_total counter" in text
+        assert 'demo_total{kind="a"} 3' in text
+        assert 'demo_gauge{state="in_use"} 3' in text
+        assert 'demo_seconds_bucket{le="0.1"} 1' in text
+        assert 'demo_seconds_bucket{le="1"} 2' in text
+        assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+        assert "demo_seconds_count 3" in text
+
+
+class TestMetricsMiddleware:
+    """Test per-route latency and error recording"""
+
+    def test_records_route_template_and_errors(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/items/{item_id}")
+        def get_item(item_id: int):
+            return {"id": item_id}
+
+        @app.get("/broken")
+        def broken():
+            raise RuntimeError("boom")
+
+        client = TestClient(app, raise_server_exceptions=False)
+        before = HTTP_REQUEST_SECONDS.count(method="GET", route="/items/{item_id}")
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/broken")
+
+        assert HTTP_REQUEST_SECONDS.count(method="GET", route="/items/{item_id}") == before + 2
+        assert HTTP_ERRORS_TOTAL.value(method="GET", route="/broken") >= 1
+
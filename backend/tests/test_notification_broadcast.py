@@ -0,0 +1,42 @@
+from sqlalchemy.orm import sessionmaker
+
+from models import BackgroundJob, Notification, NotificationType, User
+from api.notifications.services.notification_service import NotificationService
+from services.job_queue import run_pending_jobs
+
+
+class TestBroadcastNotifications:
+    """Test bulk fan-out of broadcast notifications"""
+
+    def _add_inactive_user(self, db):
+        user = User(username="inactive", email="inactive@example.com", hashed_password="x", is_active=False)
+        db.add(user)
+        db.commit()
+        return user
+
+    def test_pack_release_reaches_active_users_except_owner(self, test_db, test_user, test_user2):
+        inactive = self._add_inactive_user(test_db)
+
+        result = NotificationService(test_db).broadcast_pack_release_notification("Sabbath Pack", test_user.username)
+
+        assert (result["sent_count"], result["total_users"]) == (1, 1)
+        notifications = test_db.query(Notification).all()
+        assert [(n.user_id, n.type, n.is_read) for n in notifications] == [
+            (test_user2.id, NotificationType.PACK_RELEASE.value, False)
+        ]
+        assert "Sabbath Pack" in notifications[0].message
+        assert notifications[0].created_at is not None
+        assert inactive.id not in {n.user_id for n in notifications}
+
+    def test_background_broadcast_runs_as_job(self, test_db, test_user, test_user2):
+        result = NotificationService(test_db).broadcast_notification(
+            NotificationType.GENERAL, "Maintenance", "Back soon", background=True, requested_by=test_user.id
+        )
+
+        assert test_db.query(Notification).count() == 0
+        job = test_db.get(BackgroundJob, result["job_id"])
+        assert job.user_id == test_user.id
+
+        run_pending_jobs(sessionmaker(bind=test_db.get_bind()))
+
+        assert test_db.query(Notification).filter(Notification.title == "Maintenance").count() == 2
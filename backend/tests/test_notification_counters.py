@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from models import NotificationCounter, NotificationType
+from api.notifications.repositories.notification_repository import NotificationRepository
+from api.notifications.services.notification_jobs import RECONCILE_NOTIFICATION_COUNTERS_JOB
+from api.notifications.services.notification_service import NotificationService
+from services.job_queue import enqueue_job, run_pending_jobs
+from utils.cache import cache
+
+
+class TestNotificationCounters:
+    """Test the counter-backed notification badge counts"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def _notify(self, repo, user_id, title="Hello"):
+        return repo.create_notification(user_id, NotificationType.GENERAL.value, title, "msg")
+
+    def _stored(self, db, user_id):
+        db.expire_all()
+        counter = db.get(NotificationCounter, user_id)
+        return counter.unread_count, counter.total_count
+
+    def test_counter_is_seeded_from_existing_notifications(self, test_db, test_user):
+        repo = NotificationRepository(test_db)
+        self._notify(repo, test_user.id)
+        self._notify(repo, test_user.id)
+
+        assert repo.get_notification_counts(test_user.id) == (2, 2)
+        assert self._stored(test_db, test_user.id) == (2, 2)
+
+    def test_counter_follows_create_read_and_delete(self, test_db, test_user):
+        repo = NotificationRepository(test_db)
+        assert repo.get_notification_counts(test_user.id) == (0, 0)
+
+        first = self._notify(repo, test_user.id)
+        second = self._notify(repo, test_user.id)
+        assert repo.get_notification_counts(test_user.id) == (2, 2)
+
+        repo.mark_notification_read(first.id, test_user.id)
+        assert repo.get_notification_counts(test_user.id) == (1, 2)
+
+        repo.delete_notification(first.id, test_user.id)
+        assert repo.get_notification_counts(test_user.id) == (1, 1)
+
+        self._notify(repo, test_user.id)
+        assert repo.mark_all_read(test_user.id) == 2
+        assert repo.get_notification_counts(test_user.id) == (0, 2)
+        assert self._stored(test_db, test_user.id) == (0, 2)
+
+        repo.delete_notification(second.id, test_user.id)
+        assert repo.get_notification_counts(test_user.id) == (0, 1)
+
+    def test_broadcast_updates_seeded_counters(self, test_db, test_user, test_user2):
+        repo = NotificationRepository(test_db)
+        repo.get_notification_counts(test_user2.id)
+
+        NotificationService(test_db).broadcast_notification(NotificationType.GENERAL, "News", "msg")
+
+        assert repo.get_notification_counts(test_user.id) == (1, 1)
+        assert repo.get_notification_counts(test_user2.id) == (1, 1)
+
+    def test_cleanup_reconciles_counters(self, test_db, test_user):
+        repo = NotificationRepository(test_db)
+        old = self._notify(repo, test_user.id)
+        self._notify(repo, test_user.id)
+        repo.mark_notification_read(old.id, test_user.id)
+        old.created_at = datetime.utcnow() - timedelta(days=60)
+        test_db.commit()
+        assert repo.get_notification_counts(test_user.id) == (1, 2)
+
+        assert repo.cleanup_old_notifications(days_old=30) == 1
+        assert repo.get_notification_counts(test_user.id) == (1, 1)
+
+    def test_reconcile_job_repairs_drift(self, test_db, test_user):
+        repo = NotificationRepository(test_db)
+        self._notify(repo, test_user.id)
+        repo.get_notification_counts(test_user.id)
+        counter = test_db.get(NotificationCounter, test_user.id)
+        counter.unread_count, counter.total_count = 7, 9
+        test_db.commit()
+
+        enqueue_job(test_db, RECONCILE_NOTIFICATION_COUNTERS_JOB)
+        test_db.commit()
+        run_pending_jobs(sessionmaker(bind=test_db.get_bind()))
+
+        assert self._stored(test_db, test_user.id) == (1, 1)
+        assert repo.get_notification_counts(test_user.id) == (1, 1)
@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from models import Base, User
+from api.notifications.services import notification_service
+from api.notifications.services.notification_service import NotificationService
+from api.notifications.services.notification_stream import (
+    NotificationHub,
+    StreamLimitReached,
+    create_stream_ticket,
+    format_sse,
+    notification_event_stream,
+    redeem_stream_ticket,
+)
+from auth import create_access_token, verify_token
+from utils.cache import cache
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # A file database, since the stream reads from threadpool threads
+    engine = create_engine(f"sqlite:///{tmp_path / 'stream.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with factory() as db:
+        db.add(User(username="listener", email="listener@example.com", hashed_password="x"))
+        db.commit()
+    cache.clear()
+    return factory
+
+
+def _notify(session_factory, title):
+    with session_factory() as db:
+        return NotificationService(db).create_general_notification(1, title, "msg")
+
+
+def _parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+class TestNotificationHub:
+    """Test the in-process notification pub/sub hub"""
+
+    def test_publish_reaches_only_that_users_streams(self):
+        async def scenario():
+            hub = NotificationHub()
+            mine, other = hub.subscribe(1), hub.subscribe(2)
+            hub.publish(1, "changed")
+            hub.publish_all("changed", exclude_user_ids=[2])
+            await asyncio.sleep(0)
+            return mine.queue.qsize(), other.queue.qsize()
+
+        assert asyncio.run(scenario()) == (2, 0)
+
+    def test_connection_cap(self):
+        async def scenario():
+            hub = NotificationHub(max_connections=1)
+            subscription = hub.subscribe(1)
+            with pytest.raises(StreamLimitReached):
+                hub.subscribe(2)
+            hub.unsubscribe(subscription)
+            hub.unsubscribe(subscription)
+            hub.subscribe(2)
+            return hub.connection_count()
+
+        assert asyncio.run(scenario()) == 1
+
+    def test_slow_client_is_marked_overflowed(self):
+        async def scenario():
+            hub = NotificationHub(queue_size=1)
+            subscription = hub.subscribe(1)
+            hub.publish(1, "changed")
+            hub.publish(1, "changed")
+            await asyncio.sleep(0)
+            return subscription.overflowed
+
+        assert asyncio.run(scenario()) is True
+
+    def test_format_sse(self):
+        assert format_sse("count", {"unread_count": 1}, 7) == 'id: 7\nevent: count\ndata: {"unread_count": 1}\n\n'
+
+
+class TestNotificationStream:
+    """Test the SSE notification stream"""
+
+    def test_replay_push_and_heartbeat(self, session_factory, monkeypatch):
+        hub = NotificationHub()
+        monkeypatch.setattr(notification_service, "notification_hub", hub)
+        seen = _notify(session_factory, "Seen")
+        missed = _notify(session_factory, "Missed")
+
+        async def scenario():
+            subscription = hub.subscribe(1)
+            stream = notification_event_stream(
+                subscription, last_event_id=seen.id, hub=hub,
+                session_factory=session_factory, heartbeat=0.05,
+            )
+            chunks = [await stream.__anext__() for _ in range(3)]
+
+            pushed = await run_in_threadpool(_notify, session_factory, "Live")
+            chunks += [await stream.__anext__() for _ in range(3)]
+
+            await stream.aclose()
+            return chunks, pushed, hub.connection_count()
+
+        chunks, pushed, connections = asyncio.run(scenario())
+
+        assert chunks[0].startswith("retry:")
+        replayed, count = _parse(chunks[1]), _parse(chunks[2])
+        assert (replayed["event"], replayed["id"], replayed["data"]["title"]) == ("notification", str(missed.id), "Missed")
+        assert count["data"] == {"unread_count": 2, "total_count": 2}
+
+        live, live_count = _parse(chunks[3]), _parse(chunks[4])
+        assert (live["event"], live["id"]) == ("notification", str(pushed.id))
+        assert live_count["data"] == {"unread_count": 3, "total_count": 3}
+        assert chunks[5] == ": keepalive\n\n"
+        assert connections == 0
+
+    def test_first_connection_gets_latest_id(self, session_factory):
+        latest = _notify(session_factory, "Hello")
+
+        async def scenario():
+            hub = NotificationHub()
+            stream = notification_event_stream(hub.subscribe(1), hub=hub, session_factory=session_factory)
+            chunks = [await stream.__anext__() for _ in range(2)]
+            await stream.aclose()
+            return chunks
+
+        count = _parse(asyncio.run(scenario())[1])
+        assert (count["event"], count["id"]) == ("count", str(latest.id))
+
+
+class TestStreamTicket:
+    """Test the single-use tickets that open a notification stream"""
+
+    def test_ticket_is_single_use_and_not_a_session(self):
+        ticket = create_stream_ticket(7)
+
+        assert verify_token(ticket) is None
+        assert redeem_stream_ticket(ticket) == 7
+        assert redeem_stream_ticket(ticket) is None
+        assert redeem_stream_ticket(create_access_token({"sub": "listener"})) is None
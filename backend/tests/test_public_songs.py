@@ -0,0 +1,168 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+
+from models import Song
+from api.public_songs import browse_public_songs, get_shared_connections
+from services.public_song_cache import shared_connections_tag
+from utils.cache import cache
+
+
+def _browse(db, user, **overrides):
+    params = dict(
+        search=None, status=None, sort_by="updated_at", sort_direction="desc",
+        group_by=None, limit=3, offset=0, cursor=None,
+        include_artist_images=False, db=db, current_user=user,
+    )
+    params.update(overrides)
+    return browse_public_songs(**params)
+
+
+@pytest.fixture
+def public_catalog(test_db, test_user):
+    cache.clear()
+    base = datetime(2024, 1, 1)
+    for i in range(8):
+        test_db.add(Song(
+            title=f"Song {i % 3}",
+            artist=f"Artist {i % 2}",
+            status="Future Plans",
+            is_public=True,
+            user_id=test_user.id,
+            # Duplicate timestamps exercise the Song.id tie-breaker
+            updated_at=base + timedelta(days=i // 2),
+        ))
+    test_db.add(Song(title="Private", artist="Artist 0", status="Future Plans", is_public=False, user_id=test_user.id))
+    test_db.commit()
+    return test_db
+
+
+class TestBrowseCursorPagination:
+    """Test keyset pagination for public song browsing"""
+
+    @pytest.mark.parametrize("sort_by,direction", [("updated_at", "desc"), ("title", "asc"), ("artist", "desc")])
+    def test_cursor_walk_matches_offset_walk(self, public_catalog, test_user, sort_by, direction):
+        offset_ids = []
+        for offset in range(0, 9, 3):
+            page = _browse(public_catalog, test_user, sort_by=sort_by, sort_direction=direction, offset=offset)
+            offset_ids.extend(song.id for song in page.songs)
+
+        cursor_ids = []
+        page = _browse(public_catalog, test_user, sort_by=sort_by, sort_direction=direction)
+        cursor_ids.extend(song.id for song in page.songs)
+        while page.next_cursor:
+            page = _browse(public_catalog, test_user, sort_by=sort_by, sort_direction=direction, cursor=page.next_cursor)
+            cursor_ids.extend(song.id for song in page.songs)
+
+        assert len(cursor_ids) == 8
+        assert cursor_ids == offset_ids
+        assert page.total_count == 8
+
+    def test_cursor_rejected_for_other_sort(self, public_catalog, test_user):
+        page = _browse(public_catalog, test_user)
+        with pytest.raises(HTTPException) as exc:
+            _browse(public_catalog, test_user, sort_by="title", cursor=page.next_cursor)
+        assert exc.value.status_code == 400
+
+    def test_garbage_cursor_rejected(self, public_catalog, test_user):
+        with pytest.raises(HTTPException) as exc:
+            _browse(public_catalog, test_user, cursor="not-a-cursor")
+        assert exc.value.status_code == 400
+
+
+class TestBrowseGrouped:
+    """Test database-side grouped pagination"""
+
+    def test_group_by_artist_pages_over_groups(self, public_catalog, test_user):
+        first = _browse(public_catalog, test_user, group_by="artist", sort_by="artist", sort_direction="asc", limit=1, songs_per_group=50)
+        second = _browse(public_catalog, test_user, group_by="artist", sort_by="artist", sort_direction="asc", limit=1, offset=1, songs_per_group=50)
+
+        assert first.total_count == 2
+        assert first.total_pages == 2
+        assert [g.label for g in first.groups] == ["Artist 0"]
+        assert first.groups[0].song_count == 4
+        assert {song.artist for song in first.songs} == {"Artist 0"}
+        assert len(first.songs) == 4
+        assert [g.label for g in second.groups] == ["Artist 1"]
+
+    def test_songs_per_group_caps_each_group(self, public_catalog, test_user, test_user2):
+        public_catalog.add(Song(title="Other", artist="Artist 9", status="Released", is_public=True, user_id=test_user2.id))
+        public_catalog.commit()
+
+        page = _browse(public_catalog, test_user, group_by="user", limit=10, songs_per_group=2)
+
+        assert page.total_count == 2
+        assert sorted(g.song_count for g in page.groups) == [1, 8]
+        per_user = {}
+        for song in page.songs:
+            per_user[song.user_id] = per_user.get(song.user_id, 0) + 1
+        assert per_user == {test_user.id: 2, test_user2.id: 1}
+        # Songs arrive grouped in the same order as the groups
+        assert [str(song.user_id) for song in page.songs] == sorted(
+            [str(song.user_id) for song in page.songs],
+            key=[g.key for g in page.groups].index
+        )
+
+
+def _shared(db, user, **overrides):
+    params = dict(songs_limit=100, songs_offset=0, artists_limit=100, artists_offset=0, db=db, current_user=user)
+    params.update(overrides)
+    return get_shared_connections(**params)
+
+
+class TestSharedConnections:
+    """Test the grouped shared-connections computation and its cache"""
+
+    @pytest.fixture
+    def shared_catalog(self, test_db, test_user, test_user2):
+        cache.clear()
+        for title in ("Paranoid", "Iron Man", "War Pigs"):
+            test_db.add(Song(title=title, artist="Black Sabbath", status="Released", user_id=test_user.id))
+        test_db.add_all([
+            Song(title="PARANOID (2009 Remaster)", artist="Black Sabbath", status="Released", is_public=True, user_id=test_user2.id),
+            Song(title="Iron Man", artist="Black Sabbath", status="Released", is_public=True, user_id=test_user2.id),
+            Song(title="N.I.B.", artist="Black Sabbath", status="Released", is_public=True, user_id=test_user2.id),
+            Song(title="War Pigs", artist="Black Sabbath", status="Released", is_public=False, user_id=test_user2.id),
+        ])
+        test_db.commit()
+        return test_db
+
+    def test_artist_breakdown_counts(self, shared_catalog, test_user, test_user2):
+        result = _shared(shared_catalog, test_user)
+
+        assert result.total_shared_songs == 2
+        assert result.total_shared_artists == 1
+        assert result.shared_artists == [{
+            "username": test_user2.username,
+            "artist": "Black Sabbath",
+            "song_count": 3,
+            "shared_songs_count": 2,
+            "my_songs_count": 3,
+            "artist_image_url": None,
+        }]
+
+    def test_cached_until_songs_change(self, shared_catalog, test_user, test_user2):
+        assert _shared(shared_catalog, test_user).total_shared_songs == 2
+
+        # Other user's public flag change invalidates
+        hidden = shared_catalog.query(Song).filter(Song.title == "War Pigs", Song.user_id == test_user2.id).one()
+        hidden.is_public = True
+        shared_catalog.commit()
+        assert _shared(shared_catalog, test_user).total_shared_songs == 3
+
+        # Current user's own song edits invalidate
+        mine = shared_catalog.query(Song).filter(Song.title == "Iron Man", Song.user_id == test_user.id).one()
+        mine.title = "Sweet Leaf"
+        shared_catalog.commit()
+        assert _shared(shared_catalog, test_user).total_shared_songs == 2
+
+    def test_invalidated_on_commit_not_flush(self, shared_catalog, test_user):
+        mine = shared_catalog.query(Song).filter(Song.title == "Paranoid", Song.user_id == test_user.id).one()
+        mine.title = "Sweet Leaf"
+        shared_catalog.flush()
+        # A reader re-caching between the flush and the commit must not outlive the commit
+        cache.set("reader", "old rows", tags=[shared_connections_tag(test_user.id)])
+        assert cache.get("reader") == "old rows"
+
+        shared_catalog.commit()
+        assert cache.get("reader") is None
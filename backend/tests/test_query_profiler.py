@@ -0,0 +1,45 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from utils.query_profiler import QueryProfilerMiddleware, install_query_listeners, statement_shape
+
+
+class TestStatementShape:
+    """Test SQL normalization used to group repeated statements"""
+
+    def test_parameters_and_literals_are_collapsed(self):
+        a = statement_shape("SELECT * FROM songs WHERE id = ? AND title = 'A'")
+        b = statement_shape("SELECT  *\n FROM songs WHERE id = ? AND title = 'Other'")
+        assert a == b
+
+    def test_in_lists_of_any_length_match(self):
+        assert statement_shape("SELECT 1 FROM songs WHERE id IN (?, ?, ?)") == \
+            statement_shape("SELECT 1 FROM songs WHERE id IN (?)")
+
+
+class TestQueryProfilerMiddleware:
+    """Test per-request query headers"""
+
+    def test_headers_report_query_count_and_repeats(self):
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        install_query_listeners(engine)
+        app = FastAPI()
+        app.add_middleware(QueryProfilerMiddleware, budget=3, repeat_threshold=3)
+
+        @app.get("/n-plus-one")
+        def n_plus_one():
+            with engine.connect() as conn:
+                for i in range(4):
+                    conn.execute(text("SELECT :i"), {"i": i})
+            return {"ok": True}
+
+        response = TestClient(app).get("/n-plus-one")
+
+        assert response.status_code == 200
+        assert response.headers["x-db-query-count"] == "4"
+        assert response.headers["x-db-repeated-queries"] == "1"
+        assert float(response.headers["x-db-time-ms"]) >= 0
@@ -0,0 +1,38 @@
+from models import Song, User, Collaboration, CollaborationType
+from api.data_access import check_song_duplicate_for_user
+from utils.normalization import song_fingerprint
+
+
+class TestSongFingerprint:
+    """Test the normalized song fingerprint and the lookups built on it"""
+
+    def test_fingerprint_ignores_case_punctuation_and_remaster_tags(self):
+        assert song_fingerprint("Hey Jude - Remastered 2015", "The Beatles") == song_fingerprint("hey jude", "the beatles")
+        assert song_fingerprint("Go Your Own Way!", "Fleetwood Mac") == song_fingerprint("go your own way", "FLEETWOOD MAC")
+        assert song_fingerprint("Song", "A") != song_fingerprint("Song", "B")
+
+    def test_fingerprint_set_on_insert_and_update(self, test_db, test_user):
+        song = Song(title="Black Dog (Remastered)", artist="Led Zeppelin", status="Future Plans", user_id=test_user.id)
+        test_db.add(song)
+        test_db.commit()
+        assert song.fingerprint == "led zeppelin|black dog"
+
+        song.title = "Rock and Roll"
+        test_db.commit()
+        assert song.fingerprint == "led zeppelin|rock and roll"
+
+    def test_duplicate_check_matches_owned_and_collaborated_songs(self, test_db, test_user):
+        other = User(username="other", email="other@example.com", hashed_password="x")
+        test_db.add(other)
+        test_db.commit()
+        owned = Song(title="Paranoid", artist="Black Sabbath", status="Released", user_id=test_user.id)
+        shared = Song(title="Iron Man", artist="Black Sabbath", status="Released", user_id=other.id)
+        test_db.add_all([owned, shared])
+        test_db.commit()
+
+        assert check_song_duplicate_for_user(test_db, "PARANOID (2009 Remaster)", "black sabbath", test_user)
+        assert not check_song_duplicate_for_user(test_db, "Iron Man", "Black Sabbath", test_user)
+
+        test_db.add(Collaboration(song_id=shared.id, user_id=test_user.id, collaboration_type=CollaborationType.SONG_EDIT))
+        test_db.commit()
+        assert check_song_duplicate_for_user(test_db, "iron man", "Black Sabbath", test_user)
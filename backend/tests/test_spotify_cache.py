@@ -0,0 +1,64 @@
+import pytest
+
+from services.spotify_cache import CachedSpotify, SpotifyResponseStore, SpotifyReplayMiss
+
+
+class FakeSpotify:
+    def __init__(self):
+        self.calls = []
+
+    def search(self, q, type="track", limit=10):
+        self.calls.append(("search", q))
+        return {"albums": {"items": [{"id": "a1", "name": q}]}}
+
+    def album_tracks(self, album_id):
+        self.calls.append(("album_tracks", album_id))
+        return {"items": [{"id": "t1", "name": "Track"}]}
+
+    def current_user(self):
+        return "passthrough"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SpotifyResponseStore(str(tmp_path / "spotify_cache.db"))
+
+
+class TestSpotifyResponseCache:
+    """Test the persistent Spotify response cache"""
+
+    def test_repeated_lookups_hit_the_store(self, store):
+        client = FakeSpotify()
+        sp = CachedSpotify(client, store=store, mode="normal")
+
+        first = sp.search(q="album:Paranoid", type="album", limit=1)
+        second = sp.search(q="album:Paranoid", type="album", limit=1)
+        sp.album_tracks("a1")
+        sp.album_tracks("a1")
+
+        assert first == second
+        assert client.calls == [("search", "album:Paranoid"), ("album_tracks", "a1")]
+        assert store.stats()["total_entries"] == 2
+        # Uncached methods pass through to the client
+        assert sp.current_user() == "passthrough"
+
+    def test_expired_entries_refetched(self, store, monkeypatch):
+        from services import spotify_cache
+        monkeypatch.setitem(spotify_cache.SPOTIFY_CACHE_TTLS, "album_tracks", -1)
+        client = FakeSpotify()
+        sp = CachedSpotify(client, store=store, mode="normal")
+
+        sp.album_tracks("a1")
+        sp.album_tracks("a1")
+
+        assert len(client.calls) == 2
+        assert store.prune() == 1
+
+    def test_record_then_replay_without_client(self, store):
+        recorder = CachedSpotify(FakeSpotify(), store=store, mode="record")
+        recorded = recorder.album_tracks("a1")
+
+        replay = CachedSpotify(None, store=store, mode="replay")
+        assert replay.album_tracks("a1") == recorded
+        with pytest.raises(SpotifyReplayMiss):
+            replay.album_tracks("missing")
@@ -0,0 +1,40 @@
+from urllib3 import HTTPResponse
+
+from services import spotify_client
+from services.spotify_client import get_spotify_client, reset_spotify_client, _build_session
+
+
+class TestSpotifyClientFactory:
+    """Test the shared Spotify client factory"""
+
+    def setup_method(self):
+        reset_spotify_client()
+
+    def teardown_method(self):
+        reset_spotify_client()
+
+    def test_client_shared_until_credentials_change(self, monkeypatch):
+        monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
+        monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+
+        first = get_spotify_client()
+        assert get_spotify_client() is first
+        # Token fetches and API calls share one keep-alive session
+        spotify = first._client._client
+        assert spotify._session is spotify.auth_manager._session
+
+        monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "rotated")
+        assert get_spotify_client() is not first
+
+    def test_missing_credentials(self, monkeypatch):
+        monkeypatch.delenv("SPOTIFY_CLIENT_ID", raising=False)
+        monkeypatch.setattr(spotify_client, "cached_spotify", lambda client: client)
+
+        assert get_spotify_client() is None
+
+    def test_retry_after_honoured_and_capped(self):
+        retry = _build_session().get_adapter("https://api.spotify.com").max_retries
+
+        assert 429 in retry.status_forcelist
+        assert retry.get_retry_after(HTTPResponse(status=429, headers={"Retry-After": "2"})) == 2
+        assert retry.get_retry_after(HTTPResponse(status=429, headers={"Retry-After": "3600"})) == spotify_client.SPOTIFY_MAX_RETRY_AFTER
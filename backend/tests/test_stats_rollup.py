@@ -0,0 +1,103 @@
+import json
+
+from starlette.requests import Request
+
+from models import Artist, Collaboration, CollaborationType, Pack, Song, UserStatsRollup
+from api import stats
+from services.stats_rollup import get_user_stats
+
+
+def _song(db, user, title, artist, album=None, year=None, status="Released", pack=None, album_cover=None):
+    song = Song(title=title, artist=artist, album=album, year=year, status=status, user_id=user.id,
+                pack_id=pack.id if pack else None, album_cover=album_cover)
+    db.add(song)
+    db.commit()
+    return song
+
+
+class TestStatsRollup:
+    """Test the materialized per-user stats behind /stats"""
+
+    def _library(self, db, user, other):
+        pack = Pack(name="Metal Pack", user_id=user.id)
+        db.add_all([pack, Artist(name="Iron Maiden", image_url="maiden.jpg")])
+        db.commit()
+        _song(db, user, "Aces High", "Iron Maiden", "Powerslave", 1984, pack=pack, album_cover="ps.jpg")
+        _song(db, user, "2 Minutes", "Iron Maiden", "Powerslave", 1984, pack=pack)
+        _song(db, user, "Painkiller", "Judas Priest", "Painkiller", 1990)
+        _song(db, user, "Not yet", "Slayer", status="In Progress")
+        shared = _song(db, other, "Holy Wars", "Megadeth", "Rust in Peace", 1990)
+        db.add(Collaboration(song_id=shared.id, user_id=user.id, collaboration_type=CollaborationType.SONG_EDIT))
+        db.commit()
+        return pack, shared
+
+    def test_dashboard_served_from_rollup(self, test_db, test_user, test_user2):
+        self._library(test_db, test_user, test_user2)
+
+        result = stats.get_stats(db=test_db, current_user=test_user)
+
+        assert result["total_songs"] == 4
+        assert result["by_status"] == {"Released": 4}
+        assert result["top_artists"][0] == {"artist": "Iron Maiden", "count": 2, "artist_image_url": "maiden.jpg"}
+        assert result["top_albums"][0] == {"album": "Powerslave", "artist": "Iron Maiden", "count": 2, "album_cover": "ps.jpg"}
+        assert result["top_packs"] == [{"pack": "Metal Pack", "count": 2, "artist": "Iron Maiden", "artist_image_url": "maiden.jpg"}]
+        assert (result["total_artists"], result["total_albums"], result["total_packs"]) == (3, 3, 1)
+        assert (result["total_collaborations"], result["total_collaborators"]) == (1, 1)
+        assert result["year_distribution"] == [{"year": 1984, "count": 2}, {"year": 1990, "count": 2}]
+        assert [row["decade"] for row in result["decade_distribution"]] == ["1980s", "1990s"]
+
+        decade = stats.get_decade_details(1990, db=test_db, current_user=test_user)
+        assert decade["total_songs"] == 2
+        assert stats.get_user_top_years(limit=1, db=test_db, current_user=test_user)[0]["album_cover"] == "ps.jpg"
+        assert stats.get_year_details(2001, db=test_db, current_user=test_user)["total_songs"] == 0
+
+    def test_song_write_marks_rollup_dirty(self, test_db, test_user, test_user2):
+        self._library(test_db, test_user, test_user2)
+        assert get_user_stats(test_db, test_user)["total_songs"] == 4
+        rollup = test_db.get(UserStatsRollup, test_user.id)
+        assert rollup.built_version == rollup.version
+
+        # Unreleased songs don't touch the stats
+        wip = _song(test_db, test_user, "Draft", "Slayer", status="In Progress")
+        test_db.refresh(rollup)
+        assert rollup.built_version == rollup.version
+
+        wip.status = "Released"
+        test_db.commit()
+        test_db.refresh(rollup)
+        assert rollup.built_version != rollup.version
+        assert get_user_stats(test_db, test_user)["total_songs"] == 5
+
+    def test_collaborator_rollups_follow_shared_songs(self, test_db, test_user, test_user2):
+        pack, shared = self._library(test_db, test_user, test_user2)
+        get_user_stats(test_db, test_user)
+
+        shared.year = 1991
+        test_db.commit()
+        assert get_user_stats(test_db, test_user)["year_distribution"][-1] == {"year": 1991, "count": 1}
+
+        # Bulk delete, as the remove-collaborator endpoints do
+        test_db.query(Collaboration).filter(Collaboration.song_id == shared.id).delete(synchronize_session=False)
+        test_db.commit()
+        assert get_user_stats(test_db, test_user)["total_songs"] == 3
+
+        pack.name = "Renamed Pack"
+        test_db.commit()
+        assert get_user_stats(test_db, test_user)["top_packs"][0]["pack"] == "Renamed Pack"
+
+    def test_bundle_matches_single_endpoints_and_sends_etag(self, test_db, test_user, test_user2):
+        self._library(test_db, test_user, test_user2)
+        request = Request({"type": "http", "headers": []})
+
+        response = stats.get_stats_bundle(request, limit=5, db=test_db, current_user=test_user)
+        bundle = json.loads(response.body)
+
+        dashboard = stats.get_stats(db=test_db, current_user=test_user)
+        assert {key: bundle[key] for key in dashboard} == json.loads(json.dumps(dashboard))
+        assert bundle["top_lists"]["top_packs"] == stats.get_user_top_packs(db=test_db, current_user=test_user)
+        assert bundle["year_details"]["1990"] == stats.get_year_details(1990, db=test_db, current_user=test_user)
+        assert bundle["decade_details"]["1980"]["top_artists"][0]["artist_image_url"] == "maiden.jpg"
+
+        etag = response.headers["etag"]
+        revalidate = Request({"type": "http", "headers": [(b"if-none-match", etag.encode())]})
+        assert stats.get_stats_bundle(revalidate, limit=5, db=test_db, current_user=test_user).status_code == 304
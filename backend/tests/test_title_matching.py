@@ -0,0 +1,57 @@
+from utils.title_matching import TitleMatcher
+from utils.normalization import clean_string, normalize_many, normalize_title, titles_similar
+
+
+SONGS = [
+    {"id": 1, "title": "Stairway to Heaven"},
+    {"id": 2, "title": "Black Dog - Remaster"},
+    {"id": 3, "title": "Whole Lotta Love"},
+    {"id": 4, "title": "Ramble On"},
+]
+
+
+class TestTitleMatcher:
+    """Test indexed title matching"""
+
+    def test_exact_match_uses_normalized_titles(self):
+        matcher = TitleMatcher(SONGS, lambda s: s["title"])
+
+        assert matcher.match_title("BLACK DOG (Remastered)")["id"] == 2
+        assert matcher.match(normalize_title("Ramble On"))["id"] == 4
+
+    def test_fuzzy_match_and_threshold(self):
+        matcher = TitleMatcher(SONGS, lambda s: s["title"])
+
+        assert matcher.match_title("Stairway to Heavan")["id"] == 1
+        assert matcher.match_title("Whole Lotta Shakin") is None
+        assert matcher.match_title("") is None
+
+    def test_agrees_with_pairwise_similarity(self):
+        titles = [
+            "Since I've Been Loving You", "Since Ive Been Lovin You", "Immigrant Song",
+            "Immigrant Songs", "Good Times Bad Times", "Bad Times Good Times",
+            "Dazed and Confused", "Dazed & Confused (Live)", "Communication Breakdown",
+        ]
+        matcher = TitleMatcher(titles, lambda t: t)
+
+        for query in titles + ["Communication Breakdwn", "Good Times, Bad Times"]:
+            key = normalize_title(query)
+            expected = {t for t in titles if titles_similar(key, normalize_title(t), threshold=0.92)}
+            found = {t for _, t in matcher.similar(key)}
+            assert found == expected, query
+
+
+class TestNormalization:
+    """Test the compiled, memoized normalization helpers"""
+
+    def test_normalize_many_matches_normalize_title(self):
+        titles = ["Hey Jude - Remastered 2015", "", None, "Beyoncé & Friends", "Hey Jude - Remastered 2015"]
+
+        assert normalize_many(titles) == [normalize_title(t) for t in titles]
+        assert normalize_many(titles)[3] == "beyonce and friends"
+
+    def test_chained_suffixes_still_stripped_in_order(self):
+        # Removing "- 2010" exposes "- 1999 Version", which is stripped next
+        assert clean_string("Song - 1999 Version - 2010") == "Song"
+        assert clean_string("Song [2015 Remaster] (50th Anniversary Edition)") == "Song"
+        assert clean_string("  Plain Title ") == "Plain Title"
@@ -0,0 +1,200 @@
+"""
+Micro-benchmark for title normalization.
+
+Compares the previous uncompiled clean_string/normalize_title implementation
+with utils.normalization on a synthetic corpus of realistic Spotify-style
+titles (remaster/edition suffixes, accents, featured artists, repeats), and
+checks both produce identical output.
+
+Usage:
+  cd trackflow/backend
+  python tools/benchmark_normalization.py [--size 20000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import normalization
+from utils.normalization import normalize_many, normalize_title
+
+BASE_TITLES = [
+    "Stairway to Heaven", "Bohemian Rhapsody", "Hotel California", "Sweet Child O' Mine",
+    "Smells Like Teen Spirit", "Don’t Stop Me Now", "Paranoid", "Back in Black",
+    "Comfortably Numb", "Enter Sandman", "Livin' on a Prayer", "Dream On",
+    "Beyoncé & Jay-Z Crazy in Love", "Motörhead Ace of Spades", "Wish You Were Here",
+    "Purple Haze", "Whole Lotta Love", "Black Dog", "Highway to Hell", "Born to Run",
+    "Under Pressure", "Light My Fire", "Free Bird", "Iron Man", "Baba O'Riley",
+]
+
+SUFFIXES = [
+    "", "", "", " - Remastered 2011", " (2015 Remaster)", " - 2009 Remaster",
+    " (Deluxe Edition)", " [2015 Remaster]", " - Live", " (feat. Someone)",
+    " - 2010", " (50th Anniversary Edition)", " Remastered", " - 2008 re-mastered version",
+    " (Live at Wembley", " - Single Version", " (2010 Re-Mastered)",
+]
+
+
+def legacy_clean_string(title: str) -> str:
+    # 1. Remove edition/version-related tags in parentheses
+    title = re.sub(
+        r"\s*\((Deluxe( (Edition|Version))?|Super Deluxe( Edition)?|Remastered Deluxe Box Set|Expanded( (Edition|Version))?|Extended Edition|10( Year)? Anniversary Edition|40( Year)? Anniversary Edition|The Ultimate Collection|Re-?Master(ed)?(\s*\d{4})?|Remastered(\s+\d{4})?|Special Edition|Collector's Edition|Deluxe Edition \d{4} Remaster|[12][0-9]{3}( Version| Remaster(ed)?| Mix)?)\)",
+        "",
+        title,
+        flags=re.IGNORECASE,
+    )
+
+    # 2. Remove broken/incomplete parentheses
+    title = re.sub(r"\s*\([^)]*$", "", title)
+
+    # 3. Remove no-paren trailing edition/version suffixes
+    title = re.sub(
+        r"\s+(Re-?Master(ed)?|Remaster(ed)?|[1-9]{1,2}(st|nd|rd|th) Anniversary|10( Year)? Anniversary( Edition)?|Expanded( Edition| Version)?|Deluxe( Edition| Version)?)$",
+        "", title, flags=re.IGNORECASE
+    )
+
+    # 4. Remove things like "- 2010"
+    title = re.sub(r"\s*-\s*\d{4}$", "", title)
+
+    # 5. Remove patterns like "- 2010 Version", "- 2011 Remaster", "- 2012 Remastered", "- 2013 Mix"
+    title = re.sub(
+        r"\s*-\s*[12][0-9]{3}( Version| Remaster(ed)?| Mix)?$",
+        "", title, flags=re.IGNORECASE
+    )
+
+    # 6. Remove patterns like "- Remastered 2009" or "- Remaster 2009"
+    title = re.sub(
+        r"\s*-\s*Remaster(ed)?\s*[12][0-9]{3}$",
+        "", title, flags=re.IGNORECASE
+    )
+
+    # 7. Remove patterns like "[2015 Remaster]"
+    title = re.sub(
+        r"\s*\[[12][0-9]{3}\s*Remaster(ed)?\]",
+        "", title, flags=re.IGNORECASE
+    )
+
+    # 8. Remove patterns like "- 2008 re-mastered version"
+    title = re.sub(
+        r"\s*-\s*[12][0-9]{3}\s*re-mastered\s+version",
+        "", title, flags=re.IGNORECASE
+    )
+
+    # 9. Remove patterns like "(2010 Re-Mastered)"
+    title = re.sub(
+        r"\s*\([12][0-9]{3}\s*Re-Mastered\)",
+        "", title, flags=re.IGNORECASE
+    )
+
+    # 10. Remove patterns like "(50th Anniversary Edition)"
+    title = re.sub(
+        r"\s*\([1-9][0-9]?(st|nd|rd|th)\s+Anniversary\s+Edition\)",
+        "", title, flags=re.IGNORECASE
+    )
+
+    # 11. Remove patterns like "[25th Anniversary Edition]"
+    title = re.sub(
+        r"\s*\[[0-9]+(st|nd|rd|th)\s+Anniversary\s+Edition\]",
+        "", title, flags=re.IGNORECASE
+    )
+
+    # 12. Remove patterns like "- 2011 Remastered Version"
+    title = re.sub(
+        r"\s*-\s*[12][0-9]{3}\s+Remastered\s+Version$",
+        "", title, flags=re.IGNORECASE
+    )
+
+    return title.strip()
+
+
+def legacy_normalize_title(title: str) -> str:
+    """Robust normalization for matching song titles across sources.
+    - Cleans remaster/version tags
+    - Converts to ascii (strip diacritics)
+    - Lowercases
+    - Normalizes punctuation/quotes/dashes
+    - Replaces & with 'and'
+    - Removes non-alphanumeric characters
+    - Collapses whitespace
+    """
+    if not title:
+        return ""
+    t = legacy_clean_string(title)
+    # Unicode normalize and strip accents
+    t = unicodedata.normalize("NFKD", t)
+    t = t.encode("ascii", "ignore").decode("ascii")
+    # Standardize symbols
+    t = t.replace("&", " and ")
+    t = t.replace("’", "'").replace("‘", "'").replace("“", '"').replace("”", '"')
+    t = t.replace("–", "-").replace("—", "-")
+    # Lowercase
+    t = t.lower()
+    # Remove punctuation
+    t = re.sub(r"[^a-z0-9\s]", " ", t)
+    # Collapse whitespace
+    t = re.sub(r"\s+", " ", t).strip()
+    return t
+
+
+def build_corpus(size, seed=7):
+    rng = random.Random(seed)
+    distinct = [f"{title}{suffix}" for title in BASE_TITLES for suffix in SUFFIXES]
+    distinct += [f"Track {n}{rng.choice(SUFFIXES)}" for n in range(size // 4)]
+    # Real workloads repeat titles (same album across tracklist views, DLC checks)
+    return [rng.choice(distinct) for _ in range(size)]
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size)
+    print(f"Corpus: {len(corpus)} titles, {len(set(corpus))} distinct")
+
+    mismatches = [
+        t for t in set(corpus)
+        if legacy_normalize_title(t) != normalize_title(t)
+        or legacy_clean_string(t) != normalization.clean_string(t)
+    ]
+    if mismatches:
+        print(f"❌ {len(mismatches)} titles normalize differently, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+
+    def cold():
+        normalization.clean_string.cache_clear()
+        normalization._normalize.cache_clear()
+        for title in corpus:
+            normalize_title(title)
+
+    results = [
+        ("legacy", timed(lambda: [legacy_normalize_title(t) for t in corpus], args.repeat)),
+        ("compiled, cold cache", timed(cold, args.repeat)),
+        ("compiled, warm cache", timed(lambda: [normalize_title(t) for t in corpus], args.repeat)),
+        ("normalize_many", timed(lambda: normalize_many(corpus), args.repeat)),
+    ]
+
+    baseline = results[0][1]
+    for name, elapsed in results:
+        rate = len(corpus) / elapsed if elapsed else float("inf")
+        print(f"{name:<22} {elapsed * 1000:8.1f} ms  {rate:12,.0f} titles/s  {baseline / elapsed:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,13 @@ Run this script when:
 
 Usage:
     python tools/retroactive_achievements.py [user_id]
+    python tools/retroactive_achievements.py --bulk [--dry-run] [--chunk-size N]
     
 If user_id is provided, only check that specific user.
 If no user_id is provided, check all users.
+--bulk backfills all users with grouped queries, a chunk of users per
+transaction (see api/achievements/services/achievement_backfill.py); use it
+on large databases. --dry-run reports what would be awarded without writing.
 """
 
 import sys
@@ -25,12 +29,14 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import SessionLocal
 from models import User, Achievement, UserAchievement
-from api.achievements import (
-    update_user_stats, check_all_achievements_unified, 
-    award_achievement, _calculate_metric_value, get_or_create_user_stats
-)
+from api.achievements import service as achievements_service, get_or_create_user_stats
+from api.achievements.services.achievement_backfill import BACKFILL_CHUNK_SIZE, backfill_achievements
 from sqlalchemy import func
 
+update_user_stats = achievements_service.update_user_stats
+check_all_achievements_unified = achievements_service.check_all_achievements_unified
+_calculate_metric_value = achievements_service._calculate_metric_value
+
 
 def check_user_retroactive_achievements(db_session, user_id: int, verbose: bool = True) -> List[str]:
     """
@@ -145,12 +151,6 @@ def get_user_stats_summary(db_session, user_id: int) -> dict:
     try:
         stats = get_or_create_user_stats(db_session, user_id)
         
-        # Calculate additional metrics that aren't stored in stats
-        from api.achievements import (
-            _get_wip_completion_count, _get_completed_songs_optimized, 
-            _get_completed_packs_optimized, _calculate_metric_value
-        )
-        
         summary = {
             "basic_stats": {
                 "total_songs": stats.total_songs,
@@ -277,8 +277,36 @@ def show_missing_achievements(db_session, user_id: int):
         traceback.print_exc()
 
 
+def run_bulk_backfill(db_session, dry_run: bool = False, chunk_size: int = BACKFILL_CHUNK_SIZE) -> dict:
+    """Backfill every user with set-based queries and print a summary."""
+    mode = "DRY RUN - nothing will be written" if dry_run else "writing awards"
+    print(f"🚀 Bulk achievement backfill ({mode}, {chunk_size} users per chunk)...")
+    result = backfill_achievements(db_session, dry_run=dry_run, chunk_size=chunk_size)
+    verb = "would be awarded" if dry_run else "awarded"
+    print(f"\n🎉 Summary: {result['awards']} achievements ({result['points']} pts) {verb} "
+          f"across {len(result['awarded'])} of {result['users']} users in {result['chunks']} chunks")
+    return result
+
+
 def main():
     """Main function to handle command line arguments and run the appropriate check."""
+    if "--bulk" in sys.argv:
+        chunk_size = BACKFILL_CHUNK_SIZE
+        if "--chunk-size" in sys.argv:
+            try:
+                chunk_size = int(sys.argv[sys.argv.index("--chunk-size") + 1])
+            except (ValueError, IndexError):
+                print("Usage: python tools/retroactive_achievements.py --bulk [--dry-run] [--chunk-size N]")
+                return
+        db = SessionLocal()
+        try:
+            run_bulk_backfill(db, dry_run="--dry-run" in sys.argv, chunk_size=chunk_size)
+        except KeyboardInterrupt:
+            print("\n⏹️  Process interrupted by user (completed chunks are committed)")
+        finally:
+            db.close()
+        return
+    
     if len(sys.argv) > 1:
         try:
             user_id = int(sys.argv[1])
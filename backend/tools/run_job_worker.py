@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Background job worker.
+
+Runs queued jobs (see services/job_queue.py) outside the API process. Start the
+API with JOB_WORKER_MODE=external so only this process runs jobs, or leave the
+default and use this to add capacity.
+
+Usage:
+    python tools/run_job_worker.py [--once]
+
+With --once, runs every due job and exits (handy for cron or debugging).
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.job_queue import JobWorker, run_pending_jobs
+
+
+def main():
+    if "--once" in sys.argv[1:]:
+        total = 0
+        while True:
+            processed = run_pending_jobs()
+            if not processed:
+                break
+            total += processed
+        print(f"✅ Ran {total} jobs")
+        return
+
+    print("🧵 Job worker running (Ctrl+C to stop)")
+    try:
+        JobWorker().run_forever()
+    except KeyboardInterrupt:
+        print("👋 Job worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,96 +1,354 @@
 """
 Simple in-memory cache for expensive database operations.
+
+Entries live in a bounded LRU (by entry count and approximate memory) and can be
+tagged at ``set()`` time (e.g. ``user:42``, ``leaderboard``) so related entries
+can be invalidated together without scanning every key.
+
+``SingleFlight`` coalesces concurrent computations of the same key so only one
+caller hits the database when an expensive entry is missing or expired.
+
+``invalidate_after_commit()`` defers invalidation from flush-time hooks until
+the session's transaction commits.
 """
 
+import sys
 import time
-from typing import Any, Optional, Dict, Callable
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Dict, Callable, Hashable, Iterable, Set, Tuple, Union
 from functools import wraps
 import hashlib
 import json
 
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from utils.metrics import CACHE_REQUESTS_TOTAL
+
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+# Tag names used by the invalidate_* helpers below
+LEADERBOARD_TAG = "leaderboard"
+ACHIEVEMENTS_PROGRESS_TAG = "achievements_progress"
+
+
+def user_tag(user_id: int) -> str:
+    """Tag attached to every cache entry that belongs to a single user."""
+    return f"user:{user_id}"
+
+
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """Rough, cheap estimate of the memory held by a cached value."""
+    size = sys.getsizeof(value, 64)
+    if _depth >= 4:
+        return size
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(
+            _estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(_estimate_size(item, _depth + 1) for item in value)
+    # Pydantic models / plain objects
+    attrs = getattr(value, "__dict__", None)
+    if attrs:
+        return size + _estimate_size(attrs, _depth + 1)
+    return size
+
 
 class SimpleCache:
-    """Thread-safe in-memory cache with TTL support."""
-    
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._default_ttl = 300  # 5 minutes default
-    
+    """Thread-safe, size-bounded LRU cache with TTL and tag support."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: int = 300,
+    ):
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self._default_ttl = default_ttl  # 5 minutes default
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._current_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
     def _is_expired(self, entry: Dict[str, Any]) -> bool:
         """Check if cache entry is expired."""
         return time.time() > entry['expires_at']
-    
+
+    def _is_dead(self, entry: Dict[str, Any], now: float) -> bool:
+        """Check if cache entry is past its stale window and can be dropped."""
+        return now > entry['stale_until']
+
+    def _remove(self, key: str) -> Optional[Dict[str, Any]]:
+        """Remove a key and its tag references. Caller must hold the lock."""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return None
+        self._current_bytes -= entry['size']
+        for tag in entry['tags']:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return entry
+
+    def _evict_if_needed(self) -> None:
+        """Evict least recently used entries until within bounds. Caller must hold the lock."""
+        while self._cache and (
+            len(self._cache) > self._max_entries or self._current_bytes > self._max_bytes
+        ):
+            oldest_key = next(iter(self._cache))
+            self._remove(oldest_key)
+            self._evictions += 1
+
     def _cleanup_expired(self):
         """Remove expired entries (basic cleanup)."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, entry in self._cache.items() 
-            if current_time > entry['expires_at']
-        ]
-        for key in expired_keys:
-            del self._cache[key]
-    
+        with self._lock:
+            current_time = time.time()
+            expired_keys = [
+                key for key, entry in self._cache.items()
+                if self._is_dead(entry, current_time)
+            ]
+            for key in expired_keys:
+                self._remove(key)
+
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired."""
-        if key not in self._cache:
-            return None
-        
-        entry = self._cache[key]
-        if self._is_expired(entry):
-            del self._cache[key]
-            return None
-        
-        entry['last_accessed'] = time.time()
-        return entry['value']
-    
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Set value in cache with TTL."""
+        value, is_fresh = self.get_with_staleness(key)
+        return value if is_fresh else None
+
+    def get_with_staleness(self, key: str) -> Tuple[Optional[Any], bool]:
+        """
+        Get value from cache, including entries inside their stale window.
+
+        Returns ``(value, is_fresh)``; ``(None, False)`` when nothing usable is cached.
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._misses += 1
+                return None, False
+
+            current_time = time.time()
+            if self._is_dead(entry, current_time):
+                self._remove(key)
+                self._misses += 1
+                return None, False
+
+            self._cache.move_to_end(key)
+            entry['last_accessed'] = current_time
+            if current_time > entry['expires_at']:
+                self._misses += 1
+                return entry['value'], False
+
+            self._hits += 1
+            return entry['value'], True
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
+        stale_ttl: int = 0,
+    ) -> None:
+        """
+        Set value in cache with TTL and optional invalidation tags.
+
+        ``stale_ttl`` keeps the entry around for that many seconds after it
+        expires so ``get_with_staleness()`` can still serve it while it is refreshed.
+        """
         if ttl is None:
             ttl = self._default_ttl
-        
+
         current_time = time.time()
-        self._cache[key] = {
+        entry = {
             'value': value,
             'expires_at': current_time + ttl,
+            'stale_until': current_time + ttl + stale_ttl,
             'created_at': current_time,
-            'last_accessed': current_time
+            'last_accessed': current_time,
+            'tags': frozenset(tags or ()),
+            'size': _estimate_size(value) + sys.getsizeof(key),
         }
-        
-        # Cleanup expired entries occasionally
-        if len(self._cache) % 100 == 0:  # Every 100 inserts
-            self._cleanup_expired()
-    
+
+        with self._lock:
+            self._remove(key)
+            self._cache[key] = entry
+            self._current_bytes += entry['size']
+            for tag in entry['tags']:
+                self._tags.setdefault(tag, set()).add(key)
+
+            # Cleanup expired entries occasionally
+            if len(self._cache) % 100 == 0:  # Every 100 inserts
+                self._cleanup_expired()
+            self._evict_if_needed()
+
     def delete(self, key: str) -> None:
         """Remove key from cache."""
-        self._cache.pop(key, None)
-    
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Remove every entry carrying ``tag``. Returns the number of entries removed."""
+        with self._lock:
+            keys = self._tags.pop(tag, None)
+            if not keys:
+                return 0
+            for key in list(keys):
+                self._remove(key)
+            return len(keys)
+
     def clear(self) -> None:
         """Clear all cache entries."""
-        self._cache.clear()
-    
+        with self._lock:
+            self._cache.clear()
+            self._tags.clear()
+            self._current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        current_time = time.time()
-        valid_entries = sum(1 for entry in self._cache.values() if not self._is_expired(entry))
-        
-        return {
-            'total_entries': len(self._cache),
-            'valid_entries': valid_entries,
-            'expired_entries': len(self._cache) - valid_entries
-        }
+        with self._lock:
+            valid_entries = sum(1 for entry in self._cache.values() if not self._is_expired(entry))
+
+            return {
+                'total_entries': len(self._cache),
+                'valid_entries': valid_entries,
+                'expired_entries': len(self._cache) - valid_entries,
+                'approx_bytes': self._current_bytes,
+                'max_entries': self._max_entries,
+                'max_bytes': self._max_bytes,
+                'tags': len(self._tags),
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+            }
+
+
+class _InFlightCall:
+    """A computation that other callers for the same key can wait on."""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key.
+
+    The first caller for a key runs the computation; callers arriving while it
+    is running wait for it and receive the same result (or exception).
+    """
+
+    def __init__(self, wait_timeout: float = 30.0):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._wait_timeout = wait_timeout
+        self.coalesced = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Check whether a computation for ``key`` is currently running."""
+        with self._lock:
+            return key in self._calls
+
+    def _run(self, key: Hashable, call: _InFlightCall, fn: Callable[[], Any]) -> Any:
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` for ``key`` unless it is already running, then share its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if is_leader:
+            return self._run(key, call, fn)
+
+        if not call.event.wait(self._wait_timeout):
+            # Leader is stuck; don't hold this request hostage
+            return fn()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def try_do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[bool, Any]:
+        """
+        Run ``fn`` only if nobody else is computing ``key``.
+
+        Returns ``(True, result)`` when this caller ran it, ``(False, None)`` otherwise.
+        """
+        with self._lock:
+            if key in self._calls:
+                return False, None
+            call = _InFlightCall()
+            self._calls[key] = call
+        return True, self._run(key, call, fn)
 
 
 # Global cache instance
 cache = SimpleCache()
+_cache_flight = SingleFlight()
+
+CACHE_REQUESTS_TOTAL.add_collector(
+    lambda: [(("app", "hit"), cache._hits), (("app", "miss"), cache._misses)]
+)
+
+
+TagsArg = Optional[Union[Iterable[str], Callable[..., Iterable[str]]]]
 
 
-def cached(ttl: int = 300, key_func: Optional[Callable] = None):
+def cached(
+    ttl: int = 300,
+    key_func: Optional[Callable] = None,
+    tags: TagsArg = None,
+    single_flight: bool = False,
+    stale_ttl: int = 0,
+):
     """
     Decorator for caching function results.
-    
+
     Args:
         ttl: Time to live in seconds
         key_func: Optional function to generate cache key from args
+        tags: Optional tags for the entry, either a static iterable or a
+            function receiving the same args as the wrapped function
+        single_flight: Only one concurrent caller computes a missing key;
+            the others wait for its result
+        stale_ttl: Seconds an expired value may still be served while a
+            single caller refreshes it (stale-while-revalidate). The refresh
+            runs in the calling request, since wrapped functions usually take
+            a request-scoped DB session. Implies single_flight.
     """
     def decorator(func):
         @wraps(func)
@@ -106,21 +364,32 @@ def cached(ttl: int = 300, key_func: Optional[Callable] = None):
                 if kwargs:
                     key_parts.append(json.dumps(sorted(kwargs.items()), default=str))
                 cache_key = hashlib.md5('|'.join(key_parts).encode()).hexdigest()
-            
+
             # Check cache first
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
+            cached_result, is_fresh = cache.get_with_staleness(cache_key)
+            if cached_result is not None and is_fresh:
                 return cached_result
-            
-            # Execute function and cache result
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
-            return result
-        
+
+            def compute():
+                # Execute function and cache result
+                result = func(*args, **kwargs)
+                entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+                cache.set(cache_key, result, ttl, tags=entry_tags, stale_ttl=stale_ttl)
+                return result
+
+            if cached_result is not None:
+                # Stale hit: one caller refreshes, everyone else keeps the old value
+                refreshed, result = _cache_flight.try_do(cache_key, compute)
+                return result if refreshed else cached_result
+
+            if single_flight or stale_ttl:
+                return _cache_flight.do(cache_key, compute)
+            return compute()
+
         # Add cache control methods
         wrapper.cache_clear = lambda: cache.clear()
         wrapper.cache_stats = lambda: cache.stats()
-        
+
         return wrapper
     return decorator
 
@@ -139,7 +408,7 @@ def cache_key_for_public_songs(search: str = "", status: str = "", limit: int =
     """Generate cache key for public songs queries."""
     key_parts = [
         f"search:{search}",
-        f"status:{status}", 
+        f"status:{status}",
         f"limit:{limit}",
         f"offset:{offset}"
     ]
@@ -148,35 +417,50 @@ def cache_key_for_public_songs(search: str = "", status: str = "", limit: int =
 
 def invalidate_user_caches(user_id: int) -> None:
     """Invalidate all cached data for a specific user."""
-    patterns_to_clear = [
-        cache_key_for_user_data(user_id, "achievements_progress"),
-        f"shared_connections:{user_id}",
-        f"user:{user_id}:*"  # Pattern for any user-specific cache
-    ]
-    
-    for pattern in patterns_to_clear:
-        if '*' in pattern:
-            # Clear all keys matching pattern
-            prefix = pattern.replace('*', '')
-            keys_to_delete = [key for key in cache._cache.keys() if key.startswith(prefix)]
-            for key in keys_to_delete:
-                cache.delete(key)
-        else:
-            cache.delete(pattern)
+    cache.invalidate_tag(user_tag(user_id))
 
 
 def invalidate_leaderboard_cache() -> None:
     """Invalidate leaderboard cache when user points change."""
-    # Clear all leaderboard entries
-    keys_to_delete = [key for key in cache._cache.keys() if key.startswith('leaderboard:')]
-    for key in keys_to_delete:
-        cache.delete(key)
+    cache.invalidate_tag(LEADERBOARD_TAG)
 
 
 def invalidate_achievement_caches() -> None:
     """Invalidate achievement-related caches globally."""
-    patterns = ['achievements_progress', 'leaderboard:']
-    for pattern in patterns:
-        keys_to_delete = [key for key in cache._cache.keys() if pattern in key]
-        for key in keys_to_delete:
-            cache.delete(key)
\ No newline at end of file
+    cache.invalidate_tag(ACHIEVEMENTS_PROGRESS_TAG)
+    cache.invalidate_tag(LEADERBOARD_TAG)
+
+
+# Invalidations deferred until the session commits, keyed in Session.info
+_PENDING_INVALIDATIONS = "pending_cache_invalidations"
+
+
+def invalidate_after_commit(session, tags: Iterable[str] = (), keys: Iterable[str] = ()) -> None:
+    """
+    Drop cache ``tags`` and ``keys`` once ``session`` commits (now if there is no session).
+
+    For flush-time hooks such as mapper events: invalidating before the commit
+    lets a concurrent request re-cache the old rows for a full TTL.
+    """
+    if session is None:
+        for tag in tags:
+            cache.invalidate_tag(tag)
+        for key in keys:
+            cache.delete(key)
+        return
+    pending_tags, pending_keys = session.info.setdefault(_PENDING_INVALIDATIONS, (set(), set()))
+    pending_tags.update(tags)
+    pending_keys.update(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_pending_invalidations(session) -> None:
+    # A rolled-back transaction's entries ride along to the next commit: at worst an extra miss
+    pending = session.info.pop(_PENDING_INVALIDATIONS, None)
+    if pending is None:
+        return
+    pending_tags, pending_keys = pending
+    for tag in pending_tags:
+        cache.invalidate_tag(tag)
+    for key in pending_keys:
+        cache.delete(key)
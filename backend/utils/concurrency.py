@@ -0,0 +1,93 @@
+"""
+Bounded fan-out helpers for outbound API calls.
+
+``TokenBucket`` caps the request rate across threads, ``rate_limited`` wraps a
+client so every method call takes a token first, and ``map_concurrent`` runs a
+function over items on a bounded worker pool, yielding results as they finish.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Args:
+        rate: Tokens added per second
+        capacity: Maximum burst size
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until ``tokens`` are available, then take them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _RateLimitedProxy:
+    def __init__(self, client, bucket: TokenBucket):
+        self._client = client
+        self._bucket = bucket
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self._bucket.acquire()
+            return attr(*args, **kwargs)
+
+        return call
+
+
+def rate_limited(client, bucket: TokenBucket):
+    """Proxy ``client`` so each method call first takes a token from ``bucket``."""
+    return _RateLimitedProxy(client, bucket)
+
+
+def map_concurrent(
+    fn: Callable[[T], R], items: Iterable[T], max_workers: int = 8
+) -> Iterator[Tuple[T, Optional[R], Optional[Exception]]]:
+    """
+    Run ``fn`` over ``items`` on a bounded thread pool.
+
+    Yields ``(item, result, error)`` in completion order; an exception raised
+    by ``fn`` is returned as ``error`` instead of stopping the batch.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fn, item): item for item in items}
+        try:
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+        finally:
+            # Consumer went away early (e.g. client disconnected): drop queued work
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,275 @@
+"""
+Lightweight Prometheus-style metrics.
+
+A tiny in-process registry of counters, gauges and histograms rendered in the
+Prometheus text exposition format, so we get latency percentiles and pool
+saturation without adding a client library dependency. Recording a sample is a
+dict lookup and a few additions under a lock.
+"""
+
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+Collector = Callable[[], Iterable[Tuple[LabelValues, float]]]
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _ValueMetric(_Metric):
+    """A single value per label set, optionally supplemented by collector callbacks."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._collectors: List[Collector] = []
+
+    def add_collector(self, collect: Collector) -> None:
+        """Register a callback returning ``(label_values, value)`` pairs at scrape time."""
+        self._collectors.append(collect)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = []
+        for collect in self._collectors:
+            try:
+                for key, value in collect():
+                    values[tuple(str(v) for v in key)] = value
+            except Exception as e:
+                lines.append(f"# {self.name} collection failed: {_escape(e)}")
+        lines.extend(
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(values.items())
+        )
+        return lines
+
+
+class Counter(_ValueMetric):
+    """Monotonically increasing value per label set."""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_ValueMetric):
+    """Point-in-time value per label set."""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self._series[key] = series
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "trackflow_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route"),
+)
+HTTP_REQUESTS_TOTAL = registry.counter(
+    "trackflow_http_requests_total",
+    "HTTP requests by route template and status class",
+    ("method", "route", "status"),
+)
+HTTP_ERRORS_TOTAL = registry.counter(
+    "trackflow_http_errors_total",
+    "HTTP requests that failed with a 5xx or an unhandled exception",
+    ("method", "route"),
+)
+DB_POOL_CHECKOUT_SECONDS = registry.histogram(
+    "trackflow_db_pool_checkout_seconds",
+    "Time spent waiting for a pooled DB connection (includes pre-ping and connects)",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+DB_POOL_CONNECTIONS = registry.gauge(
+    "trackflow_db_pool_connections",
+    "DB pool connections by state (in_use, idle, overflow, size)",
+    ("state",),
+)
+CACHE_REQUESTS_TOTAL = registry.counter(
+    "trackflow_cache_requests_total",
+    "Cache lookups by cache and result",
+    ("cache", "result"),
+)
+
+
+def record_cache_lookup(cache_name: str, hit: bool) -> None:
+    """Count a hit or miss for caches that don't keep their own stats."""
+    CACHE_REQUESTS_TOTAL.inc(cache=cache_name, result="hit" if hit else "miss")
+
+
+def _route_label(scope) -> str:
+    """Route template (not the raw path) so label cardinality stays bounded."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, status and error counts."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            method = scope.get("method", "")
+            route = _route_label(scope)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method, route=route)
+            HTTP_REQUESTS_TOTAL.inc(method=method, route=route, status=f"{status_code // 100}xx")
+            if status_code >= 500:
+                HTTP_ERRORS_TOTAL.inc(method=method, route=route)
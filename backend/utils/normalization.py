@@ -0,0 +1,142 @@
+"""
+Title and artist normalization shared by matching code.
+
+Kept free of app imports so models and services can use it without pulling in
+the API routers. Patterns are compiled once at import, and ``clean_string`` /
+``normalize_title`` are memoized with a bounded LRU since the same titles are
+normalized over and over (tracklists, DLC checks, bulk cleanup, playlist
+imports). Batch callers should use ``normalize_many``.
+
+Outputs must stay stable: ``song_fingerprint`` values are stored in the
+database, so changing what these functions return needs a fingerprint backfill.
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Iterable, List
+
+NORMALIZE_CACHE_SIZE = 50_000
+
+CLEANUP_PATTERNS = [
+    r"[-–]?\s*\(?Remaster(ed)?(\s*\d{4})?\)?",
+    r"[-–]?\s*\(?\d{4}\s*Remaster\)?",
+    r"[-–]?\s*\(?Special Edition\)?",
+    r"[-–]?\s*\(?Deluxe Edition\)?",
+    r"\[?\d{4}\s*Remaster\]?",
+]
+
+# clean_string steps, applied in order. The end-anchored steps must stay
+# separate: stripping one suffix can expose another.
+_CLEAN_STEPS = [
+    # 1. Remove edition/version-related tags in parentheses
+    re.compile(
+        r"\s*\((Deluxe( (Edition|Version))?|Super Deluxe( Edition)?|Remastered Deluxe Box Set|Expanded( (Edition|Version))?|Extended Edition|10( Year)? Anniversary Edition|40( Year)? Anniversary Edition|The Ultimate Collection|Re-?Master(ed)?(\s*\d{4})?|Remastered(\s+\d{4})?|Special Edition|Collector's Edition|Deluxe Edition \d{4} Remaster|[12][0-9]{3}( Version| Remaster(ed)?| Mix)?)\)",
+        re.IGNORECASE,
+    ),
+    # 2. Remove broken/incomplete parentheses
+    re.compile(r"\s*\([^)]*$"),
+    # 3. Remove no-paren trailing edition/version suffixes
+    re.compile(
+        r"\s+(Re-?Master(ed)?|Remaster(ed)?|[1-9]{1,2}(st|nd|rd|th) Anniversary|10( Year)? Anniversary( Edition)?|Expanded( Edition| Version)?|Deluxe( Edition| Version)?)$",
+        re.IGNORECASE,
+    ),
+    # 4. Remove things like "- 2010"
+    re.compile(r"\s*-\s*\d{4}$"),
+    # 5. Remove patterns like "- 2010 Version", "- 2011 Remaster", "- 2012 Remastered", "- 2013 Mix"
+    re.compile(r"\s*-\s*[12][0-9]{3}( Version| Remaster(ed)?| Mix)?$", re.IGNORECASE),
+    # 6. Remove patterns like "- Remastered 2009" or "- Remaster 2009"
+    re.compile(r"\s*-\s*Remaster(ed)?\s*[12][0-9]{3}$", re.IGNORECASE),
+    # 7-11. Self-contained tags anywhere in the title, merged into one pass:
+    # "[2015 Remaster]", "- 2008 re-mastered version", "(2010 Re-Mastered)",
+    # "(50th Anniversary Edition)", "[25th Anniversary Edition]"
+    re.compile(
+        r"\s*\[[12][0-9]{3}\s*Remaster(ed)?\]"
+        r"|\s*-\s*[12][0-9]{3}\s*re-mastered\s+version"
+        r"|\s*\([12][0-9]{3}\s*Re-Mastered\)"
+        r"|\s*\([1-9][0-9]?(st|nd|rd|th)\s+Anniversary\s+Edition\)"
+        r"|\s*\[[0-9]+(st|nd|rd|th)\s+Anniversary\s+Edition\]",
+        re.IGNORECASE,
+    ),
+    # 12. Remove patterns like "- 2011 Remastered Version"
+    re.compile(r"\s*-\s*[12][0-9]{3}\s+Remastered\s+Version$", re.IGNORECASE),
+]
+
+# Every step needs one of these characters or an edition keyword to match
+_CLEAN_TRIGGER = re.compile(r"[(\[\-]|remaster|master|anniversary|expanded|deluxe", re.IGNORECASE)
+
+_NON_ALNUM = re.compile(r"[^a-z0-9\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def clean_string(title: str) -> str:
+    """Strip remaster/edition/version tags from a title."""
+    if not _CLEAN_TRIGGER.search(title):
+        return title.strip()
+    for pattern in _CLEAN_STEPS:
+        title = pattern.sub("", title)
+    return title.strip()
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize(title: str) -> str:
+    t = clean_string(title)
+    # Unicode normalize and strip accents; the ASCII encode also drops curly
+    # quotes and long dashes, so no separate punctuation mapping is needed
+    if not t.isascii():
+        t = unicodedata.normalize("NFKD", t)
+        t = t.encode("ascii", "ignore").decode("ascii")
+    # Standardize symbols
+    t = t.replace("&", " and ")
+    # Lowercase
+    t = t.lower()
+    # Remove punctuation
+    t = _NON_ALNUM.sub(" ", t)
+    # Collapse whitespace
+    return _WHITESPACE.sub(" ", t).strip()
+
+
+def normalize_title(title: str) -> str:
+    """Robust normalization for matching song titles across sources.
+    - Cleans remaster/version tags
+    - Converts to ascii (strip diacritics)
+    - Lowercases
+    - Normalizes punctuation/quotes/dashes
+    - Replaces & with 'and'
+    - Removes non-alphanumeric characters
+    - Collapses whitespace
+    """
+    if not title:
+        return ""
+    return _normalize(title)
+
+
+def normalize_many(titles: Iterable[str]) -> List[str]:
+    """``normalize_title`` for a batch, normalizing each distinct title once."""
+    seen = {}
+    result = []
+    for title in titles:
+        if not title:
+            result.append("")
+            continue
+        normalized = seen.get(title)
+        if normalized is None:
+            normalized = seen[title] = _normalize(title)
+        result.append(normalized)
+    return result
+
+
+def titles_similar(a: str, b: str, threshold: float = 0.9) -> bool:
+    """Return True if titles are similar enough after normalization."""
+    na, nb = normalize_title(a), normalize_title(b)
+    if not na or not nb:
+        return False
+    ratio = SequenceMatcher(None, na, nb).ratio()
+    return ratio >= threshold
+
+
+def song_fingerprint(title: str, artist: str) -> str:
+    """Stable matching key for a song: normalized artist and title."""
+    return f"{normalize_title(artist or '')}|{normalize_title(title or '')}"
@@ -0,0 +1,144 @@
+"""
+Per-request SQL query profiling and N+1 detection.
+
+Opt-in (``QUERY_PROFILER_ENABLED=1``). Engine cursor events count every
+statement executed while a request is in flight, time it, and group statements
+by shape so the same query issued once per row stands out. Results are added
+to the response as ``X-DB-*`` headers and a warning is logged when a route goes
+over its query budget.
+"""
+
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+QUERY_PROFILER_ENABLED = os.environ.get("QUERY_PROFILER_ENABLED", "").lower() in ("1", "true", "yes")
+QUERY_BUDGET = int(os.environ.get("QUERY_BUDGET", "30"))
+# A statement shape seen this many times in one request is reported as a likely N+1
+QUERY_REPEAT_THRESHOLD = int(os.environ.get("QUERY_REPEAT_THRESHOLD", "5"))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|:\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in parameters compare equal."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _BIND_PARAM.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("IN (?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class RequestQueryStats:
+    """Queries executed while handling one request."""
+
+    __slots__ = ("query_count", "total_time", "shapes")
+
+    def __init__(self):
+        self.query_count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.total_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_shapes(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least ``threshold`` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats for the request being handled, or None outside a profiled request."""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    stats.record(statement, time.perf_counter() - start_times.pop())
+
+
+def install_query_listeners(engine) -> None:
+    """Attach the profiling cursor events to an engine (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryProfilerMiddleware:
+    """
+    ASGI middleware that profiles the SQL issued by each HTTP request.
+
+    Adds ``X-DB-Query-Count``, ``X-DB-Time-Ms`` and ``X-DB-Repeated-Queries``
+    response headers and logs routes over ``budget`` queries or with repeated
+    statement shapes.
+    """
+
+    def __init__(self, app, budget: int = QUERY_BUDGET, repeat_threshold: int = QUERY_REPEAT_THRESHOLD):
+        self.app = app
+        self.budget = budget
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+        reported = False
+
+        async def send_with_headers(message):
+            nonlocal reported
+            if message["type"] == "http.response.start" and not reported:
+                reported = True
+                repeated = stats.repeated_shapes(self.repeat_threshold)
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.query_count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_time * 1000:.1f}".encode()))
+                headers.append((b"x-db-repeated-queries", str(len(repeated)).encode()))
+                message = {**message, "headers": headers}
+                self._report(scope, stats, repeated)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+
+    def _report(self, scope, stats: RequestQueryStats, repeated: List[Tuple[str, int]]) -> None:
+        route = f"{scope.get('method', '')} {scope.get('path', '')}"
+        if stats.query_count > self.budget:
+            logger.warning(
+                "Query budget exceeded: %s ran %d queries (budget %d) in %.1fms",
+                route, stats.query_count, self.budget, stats.total_time * 1000,
+            )
+        for shape, count in repeated:
+            logger.warning("Possible N+1 on %s: %d x %s", route, count, shape[:300])
+
@@ -0,0 +1,106 @@
+"""
+Indexed fuzzy title matching.
+
+``TitleMatcher`` normalizes every candidate once and keeps a character-trigram
+inverted index, so a lookup only runs ``SequenceMatcher`` on candidates that
+share trigrams with the query and pass the cheap length / quick-ratio bounds,
+instead of re-normalizing and comparing against every candidate.
+"""
+
+from difflib import SequenceMatcher
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from utils.normalization import normalize_many, normalize_title
+
+T = TypeVar("T")
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.92
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleMatcher(Generic[T]):
+    """
+    Match query titles against a fixed set of candidates.
+
+    Args:
+        items: Candidates to match against
+        title_of: Returns the raw title of a candidate
+        threshold: Default similarity ratio for fuzzy matches
+    """
+
+    def __init__(
+        self,
+        items: Iterable[T],
+        title_of: Callable[[T], Optional[str]],
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ):
+        self.threshold = threshold
+        self._entries: List[Tuple[str, T]] = []
+        self._exact: Dict[str, T] = {}
+        self._postings: Dict[str, List[int]] = {}
+
+        items = list(items)
+        keys = normalize_many(title_of(item) for item in items)
+        for item, key in zip(items, keys):
+            if not key:
+                continue
+            position = len(self._entries)
+            self._entries.append((key, item))
+            self._exact.setdefault(key, item)
+            for gram in _trigrams(key):
+                self._postings.setdefault(gram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def exact(self, key: str) -> Optional[T]:
+        """Candidate whose normalized title equals ``key`` (already normalized)."""
+        return self._exact.get(key)
+
+    def similar(self, key: str, threshold: Optional[float] = None) -> List[Tuple[float, T]]:
+        """
+        Candidates with similarity >= threshold to ``key`` (already normalized),
+        best first; ties keep candidate order.
+        """
+        if not key:
+            return []
+        threshold = self.threshold if threshold is None else threshold
+        length = len(key)
+
+        shared: Dict[int, int] = {}
+        for gram in _trigrams(key):
+            for position in self._postings.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        matches = []
+        matcher = SequenceMatcher(None, b=key)
+        for position in sorted(shared):
+            cand_key, item = self._entries[position]
+            # ratio <= 2 * min(len) / (len_a + len_b), so skip hopeless lengths
+            if 2 * min(length, len(cand_key)) / (length + len(cand_key)) < threshold:
+                continue
+            matcher.set_seq1(cand_key)
+            if matcher.quick_ratio() < threshold:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= threshold:
+                matches.append((ratio, position, item))
+
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return [(ratio, item) for ratio, _, item in matches]
+
+    def match(self, key: str, threshold: Optional[float] = None) -> Optional[T]:
+        """Exact match for ``key`` (already normalized), else the most similar candidate."""
+        found = self.exact(key)
+        if found is not None:
+            return found
+        similar = self.similar(key, threshold)
+        return similar[0][1] if similar else None
+
+    def match_title(self, title: str, threshold: Optional[float] = None) -> Optional[T]:
+        """Like ``match`` but normalizes a raw title first."""
+        return self.match(normalize_title(title or ""), threshold)
@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useRef } from "react";
-import { apiGet, apiPut, apiDelete } from "../../utils/api";
+import { apiGet, apiPost, apiPut, apiDelete } from "../../utils/api";
+import { API_BASE_URL } from "../../config";
 import NotificationDropdown from "./NotificationDropdown";
 
 const NotificationIcon = () => {
@@ -155,14 +156,84 @@ const NotificationIcon = () => {
     };
   }, [showDropdown]);
 
-  // Fetch notification count on mount and set up polling
+  // Fetch notification count on mount, then follow the server-sent event
+  // stream; fall back to polling if the stream is unavailable
   useEffect(() => {
     fetchNotificationCount();
 
-    // Poll for new notifications every 30 seconds
-    const interval = setInterval(fetchNotificationCount, 30000);
+    let interval = null;
+    const startPolling = () => {
+      if (!interval) {
+        // Poll for new notifications every 30 seconds
+        interval = setInterval(fetchNotificationCount, 30000);
+      }
+    };
+
+    const token = localStorage.getItem("token");
+    if (!window.EventSource || !token) {
+      startPolling();
+      return () => clearInterval(interval);
+    }
 
-    return () => clearInterval(interval);
+    let stream = null;
+    let retryTimer = null;
+    let closed = false;
+    let lastEventId = null;
+    let failures = 0;
+
+    // Stream tickets are single-use, so every (re)connect fetches a fresh one
+    // rather than letting EventSource retry the same URL
+    const connect = async () => {
+      let ticket;
+      try {
+        ({ ticket } = await apiPost("/notifications/stream-ticket", {}));
+      } catch (error) {
+        startPolling();
+        return;
+      }
+      if (closed) return;
+
+      const params = new URLSearchParams({ ticket });
+      if (lastEventId) {
+        params.set("last_event_id", lastEventId);
+      }
+      let streamUrl = `${API_BASE_URL}/notifications/stream?${params}`;
+      if (window.location.protocol === "https:" && streamUrl.startsWith("http:")) {
+        streamUrl = streamUrl.replace("http:", "https:");
+      }
+      stream = new EventSource(streamUrl);
+
+      stream.addEventListener("count", (event) => {
+        failures = 0;
+        if (event.lastEventId) lastEventId = event.lastEventId;
+        const data = JSON.parse(event.data);
+        setUnreadCount(data.unread_count);
+        setTotalCount(data.total_count);
+      });
+      stream.addEventListener("notification", (event) => {
+        if (event.lastEventId) lastEventId = event.lastEventId;
+        // Refetch the list next time the dropdown opens
+        setHasLoadedOnce(false);
+      });
+      stream.onerror = () => {
+        stream.close();
+        failures += 1;
+        // Keep failing (refused or unreachable): fall back to polling
+        if (failures >= 3) {
+          startPolling();
+          return;
+        }
+        retryTimer = setTimeout(connect, 5000);
+      };
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      if (stream) stream.close();
+      clearTimeout(retryTimer);
+      clearInterval(interval);
+    };
   }, []);
 
   // Listen for real-time notification events
@@ -1,17 +1,23 @@
-import { useState, useCallback } from "react";
+import { useState, useCallback, useMemo } from "react";
 import { apiGet } from "../../utils/api";
 
 /**
  * Custom hook for managing decade details (hover popup data)
+ *
+ * @param {Object} preloadedDecadeDetails - Details already loaded with the stats bundle, keyed by decade
  */
-export const useDecadeDetails = () => {
+export const useDecadeDetails = (preloadedDecadeDetails) => {
   const [hoveredDecade, setHoveredDecade] = useState(null);
   const [decadeDetails, setDecadeDetails] = useState({});
   const [loadingDecade, setLoadingDecade] = useState(null);
 
   const handleDecadeHover = useCallback(
     async (decadeValue) => {
-      if (!decadeDetails[decadeValue] && !loadingDecade) {
+      if (
+        !decadeDetails[decadeValue] &&
+        !preloadedDecadeDetails?.[decadeValue] &&
+        !loadingDecade
+      ) {
         setLoadingDecade(decadeValue);
         try {
           const response = await apiGet(`/stats/decade/${decadeValue}/details`);
@@ -25,16 +31,21 @@ export const useDecadeDetails = () => {
       }
       setHoveredDecade(decadeValue);
     },
-    [decadeDetails, loadingDecade]
+    [decadeDetails, loadingDecade, preloadedDecadeDetails]
   );
 
   const handleDecadeLeave = useCallback(() => {
     setHoveredDecade(null);
   }, []);
 
+  const allDecadeDetails = useMemo(
+    () => ({ ...preloadedDecadeDetails, ...decadeDetails }),
+    [preloadedDecadeDetails, decadeDetails]
+  );
+
   return {
     hoveredDecade,
-    decadeDetails,
+    decadeDetails: allDecadeDetails,
     loadingDecade,
     handleDecadeHover,
     handleDecadeLeave,
@@ -11,7 +11,8 @@ export const useStatsData = () => {
   useEffect(() => {
     const fetchStats = async () => {
       try {
-        const data = await apiGet("/stats/");
+        // Dashboard, top lists and year/decade details in one response
+        const data = await apiGet("/stats/bundle");
         setStats(data);
       } catch (error) {
         console.error("Failed to fetch stats:", error);
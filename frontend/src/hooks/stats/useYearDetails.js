@@ -1,17 +1,23 @@
-import { useState, useCallback } from "react";
+import { useState, useCallback, useMemo } from "react";
 import { apiGet } from "../../utils/api";
 
 /**
  * Custom hook for managing year details (hover popup data)
+ *
+ * @param {Object} preloadedYearDetails - Details already loaded with the stats bundle, keyed by year
  */
-export const useYearDetails = () => {
+export const useYearDetails = (preloadedYearDetails) => {
   const [hoveredYear, setHoveredYear] = useState(null);
   const [yearDetails, setYearDetails] = useState({});
   const [loadingYear, setLoadingYear] = useState(null);
 
   const handleYearHover = useCallback(
     async (year) => {
-      if (!yearDetails[year] && !loadingYear) {
+      if (
+        !yearDetails[year] &&
+        !preloadedYearDetails?.[year] &&
+        !loadingYear
+      ) {
         setLoadingYear(year);
         try {
           const response = await apiGet(`/stats/year/${year}/details`);
@@ -25,16 +31,21 @@ export const useYearDetails = () => {
       }
       setHoveredYear(year);
     },
-    [yearDetails, loadingYear]
+    [yearDetails, loadingYear, preloadedYearDetails]
   );
 
   const handleYearLeave = useCallback(() => {
     setHoveredYear(null);
   }, []);
 
+  const allYearDetails = useMemo(
+    () => ({ ...preloadedYearDetails, ...yearDetails }),
+    [preloadedYearDetails, yearDetails]
+  );
+
   return {
     hoveredYear,
-    yearDetails,
+    yearDetails: allYearDetails,
     loadingYear,
     handleYearHover,
     handleYearLeave,
@@ -15,14 +15,14 @@ export default function StatsPage() {
     loadingYear,
     handleYearHover,
     handleYearLeave,
-  } = useYearDetails();
+  } = useYearDetails(stats?.year_details);
   const {
     hoveredDecade,
     decadeDetails,
     loadingDecade,
     handleDecadeHover,
     handleDecadeLeave,
-  } = useDecadeDetails();
+  } = useDecadeDetails(stats?.decade_details);
 
   // Filter out empty/null packs
   const filteredTopPacks = useMemo(() => {